@@ -9,8 +9,24 @@ __version__ = "1.0.0"
 __author__ = "znaxh"
 __email__ = "anurag.ps.contact@gmail.com"
 
-from .providers.provider_manager import ProviderManager
-from .config import Config
+import importlib
+
+# Public names are resolved on first access (PEP 562) so importing the
+# package, e.g. for __version__, does not pull in the provider stack
+_LAZY_EXPORTS = {
+    "ProviderManager": ".providers.provider_manager",
+    "Config": ".config",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "ProviderManager",
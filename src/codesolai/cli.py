@@ -5,33 +5,73 @@ Main CLI interface for CodeSolAI
 import sys
 import asyncio
 import signal
+import importlib
 from typing import Optional, List, Dict, Any
 import click
-from rich.console import Console
 
-from .config import Config
+from .config import Config, _VALID_PROVIDERS
 from .utils import Utils
-from .providers.provider_manager import ProviderManager
-from .spinner_manager import SpinnerManager
-from .setup import Setup
-from .interactive_session import InteractiveSession
-from .core.enhanced_agent import EnhancedAgent
 from . import __version__
 
-console = Console()
+# Heavy collaborators are imported on first use so that cheap invocations
+# (--version, --help, --config) don't pay for the provider/agent stacks
+_LAZY_IMPORTS = {
+    'ProviderManager': '.providers.provider_manager',
+    'SpinnerManager': '.spinner_manager',
+    'Setup': '.setup',
+    'InteractiveSession': '.interactive_session',
+    'EnhancedAgent': '.core.enhanced_agent',
+}
+
+_console_instance = None
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve lazily imported names on module attribute access (PEP 562)"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str) -> Any:
+    """Get a lazily imported name, honouring any value already bound in this module"""
+    try:
+        return globals()[name]
+    except KeyError:
+        return __getattr__(name)
+
+
+def _console():
+    """Get the shared Rich console, creating it on first use"""
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+        _console_instance = Console()
+    return _console_instance
+
+
+# Detected once; piped output skips Rich's markup and terminal rendering
+_IS_TTY = sys.stdout.isatty()
+
+
+def _out(message: str = '') -> None:
+    """Write a line of user-facing output, using Rich only on a terminal"""
+    if _IS_TTY:
+        _console().print(message)
+    else:
+        sys.stdout.write(f'{message}\n')
 
 
 def handle_sigint(signum, frame):
     """Handle Ctrl+C gracefully"""
-    console.print("\n")
+    _console().print("\n")
     Utils.log_info("Operation cancelled by user")
     sys.exit(0)
 
 
-# Set up signal handler
-signal.signal(signal.SIGINT, handle_sigint)
-
-
 @click.command()
 @click.option('--provider', '-p', help='LLM provider (claude, gemini, gpt)')
 @click.option('--api-key', '-k', help='API key for the provider')
@@ -46,48 +86,67 @@ signal.signal(signal.SIGINT, handle_sigint)
 @click.option('--max-iterations', type=int, help='Maximum iterations for autonomous mode')
 @click.option('--debug', is_flag=True, help='Enable debug logging')
 @click.option('--trace', is_flag=True, help='Enable execution tracing')
+@click.option('--stream', is_flag=True, help='Stream responses and start read-only actions before they finish')
 @click.option('--config', 'show_config', is_flag=True, help='Show current configuration')
 @click.option('--config-example', is_flag=True, help='Create example configuration file')
 @click.option('--config-reset', is_flag=True, help='Reset configuration to defaults')
 @click.option('--test-key', is_flag=True, help='Test API key validity')
-@click.option('--version', is_flag=True, help='Show version information')
+@click.version_option(__version__, '--version', message='%(version)s', help='Show version information')
 @click.option('--setup', is_flag=True, help='Run interactive setup')
 @click.option('--interactive', '-i', is_flag=True, help='Start interactive chat mode')
+@click.option('--batch', is_flag=True, help='Treat each line of piped input as a separate prompt')
+@click.option('--concurrency', type=click.IntRange(min=1), default=4,
+              help='Maximum concurrent requests in batch mode')
 @click.argument('prompt', nargs=-1)
 def main(**kwargs):
     """CodeSolAI - A fully autonomous agentic CLI tool for interacting with large language models"""
+    _install_event_loop_policy()
+
+    # A plain handler also interrupts blocking prompts such as input(); asyncio.run
+    # leaves a handler installed here in place
+    signal.signal(signal.SIGINT, handle_sigint)
+
+    # One event loop for the whole invocation so pooled connections survive
+    asyncio.run(_dispatch(**kwargs))
+
+
+def _install_event_loop_policy() -> None:
+    """Use uvloop's event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+async def _dispatch(**kwargs):
+    """Route the invocation to setup or the main command flow"""
     # Handle special commands first
     if kwargs.get('setup'):
-        async def run_setup():
-            setup_wizard = Setup()
-            await setup_wizard.run()
-        asyncio.run(run_setup())
+        setup_wizard = _lazy('Setup')()
+        await setup_wizard.run()
         return
 
-    asyncio.run(async_main(**kwargs))
+    await async_main(**kwargs)
+
+
+# Configuration commands that run and exit before any prompt handling
+_EARLY_HANDLERS = (
+    ('show_config', lambda config: config.display()),
+    ('config_example', lambda config: config.create_example()),
+    ('config_reset', lambda config: config.reset()),
+)
 
 
 async def async_main(**kwargs):
     """Async main function"""
-    # Handle version command
-    if kwargs.get('version'):
-        console.print(__version__)
-        return
-
     # Handle configuration commands
     config = Config()
 
-    if kwargs.get('show_config'):
-        config.display()
-        return
-
-    if kwargs.get('config_example'):
-        config.create_example()
-        return
-
-    if kwargs.get('config_reset'):
-        config.reset()
-        return
+    for flag, handler in _EARLY_HANDLERS:
+        if kwargs.get(flag):
+            handler(config)
+            return
 
     # Get prompt from arguments
     prompt_args = list(kwargs.get('prompt', []))
@@ -100,7 +159,6 @@ async def async_main(**kwargs):
 
     if should_enter_interactive_mode:
         # Load config for interactive mode
-        config = Config()
         app_config = config.get_config(kwargs)
 
         # Need provider and API key for interactive mode
@@ -110,14 +168,14 @@ async def async_main(**kwargs):
             Utils.log_info('Run "codesolai --setup" to configure your first provider.')
             sys.exit(1)
 
-        api_key = kwargs.get('api_key') or config.get_api_key(provider)
+        api_key = kwargs.get('api_key') or config.get_api_key(provider, app_config)
         if not api_key:
             Utils.log_error(f'No API key found for {provider}')
             Utils.log_info('Run "codesolai --setup" to configure your API key.')
             sys.exit(1)
 
         # Start interactive session
-        session = InteractiveSession(app_config, provider, api_key, kwargs)
+        session = _lazy('InteractiveSession')(app_config, provider, api_key, kwargs)
         await session.start()
         return
 
@@ -144,7 +202,7 @@ async def async_main(**kwargs):
         Utils.log_info('  codesolai --help  # for more options')
         sys.exit(1)
 
-    if not prompt or not prompt.strip():
+    if not prompt or prompt.isspace():
         Utils.log_error('Prompt cannot be empty')
         sys.exit(1)
 
@@ -163,14 +221,13 @@ async def async_main(**kwargs):
         sys.exit(1)
 
     # Validate provider
-    valid_providers = ['claude', 'gemini', 'gpt']
-    if provider not in valid_providers:
+    if provider not in _VALID_PROVIDERS:
         Utils.log_error(f'Invalid provider: {provider}')
-        Utils.log_info(f'Supported providers: {", ".join(valid_providers)}')
+        Utils.log_info(f'Supported providers: {", ".join(sorted(_VALID_PROVIDERS))}')
         sys.exit(1)
 
     # Get API key
-    api_key = kwargs.get('api_key') or config.get_api_key(provider)
+    api_key = kwargs.get('api_key') or config.get_api_key(provider, app_config)
     if not api_key:
         Utils.log_error(f'No API key found for {provider}')
         Utils.log_info('Set up your API key using one of these methods:')
@@ -182,11 +239,14 @@ async def async_main(**kwargs):
 
     # Test API key if requested
     if kwargs.get('test_key'):
-        spinner = SpinnerManager()
+        spinner = _lazy('SpinnerManager')()
         spinner.start('Testing API key')
 
-        provider_manager = ProviderManager(app_config)
-        is_valid = await provider_manager.test_api_key(provider, api_key)
+        provider_manager = _lazy('ProviderManager')(app_config)
+        try:
+            is_valid = await provider_manager.test_api_key(provider, api_key)
+        finally:
+            await provider_manager.aclose()
 
         if is_valid:
             spinner.succeed(f'{provider.upper()} API key is valid and working')
@@ -216,6 +276,12 @@ async def async_main(**kwargs):
 
     max_iterations = kwargs.get('max_iterations') or app_config.get('agent', {}).get('maxIterations', 10)
 
+    # Batch mode fans the prompt lines out as independent simple requests
+    if kwargs.get('batch'):
+        prompts = [line.strip() for line in prompt.splitlines() if line.strip()]
+        await handle_batch_prompts(provider, api_key, prompts, kwargs, app_config)
+        return
+
     # Use agent mode if enabled
     if agent_enabled:
         await handle_agent_prompt(provider, api_key, prompt, kwargs, app_config, effort_level, max_iterations, autonomous_mode)
@@ -223,10 +289,56 @@ async def async_main(**kwargs):
         await handle_simple_prompt(provider, api_key, prompt, kwargs, app_config)
 
 
+def _provider_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Map CLI options to provider call options, leaving unset values to provider defaults"""
+    provider_options = {
+        'model': options.get('model'),
+        'maxTokens': options.get('max_tokens'),
+        'temperature': options.get('temperature')
+    }
+    return {key: value for key, value in provider_options.items() if value is not None}
+
+
+async def handle_batch_prompts(provider: str, api_key: str, prompts: List[str],
+                               options: Dict[str, Any], config: Dict[str, Any]):
+    """Handle several prompts concurrently, printing responses in submission order"""
+    semaphore = asyncio.Semaphore(options.get('concurrency') or 4)
+    provider_manager = _lazy('ProviderManager')(config)
+    call_options = _provider_options(options)
+
+    async def run_one(batch_prompt: str) -> str:
+        async with semaphore:
+            return await provider_manager.call(provider, api_key, batch_prompt, call_options)
+
+    try:
+        results = await asyncio.gather(*(run_one(p) for p in prompts), return_exceptions=True)
+    finally:
+        await provider_manager.aclose()
+
+    failures = 0
+    for index, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            failures += 1
+            Utils.log_error(f'Prompt {index} failed: {result}')
+        else:
+            _out(f'\n{result}\n')
+
+    if failures:
+        sys.exit(1)
+
+
+async def _rotate_spinner_messages(spinner, messages, interval: float = 1.0):
+    """Advance the spinner through messages on a timer until cancelled"""
+    for message in messages:
+        await asyncio.sleep(interval)
+        if spinner.is_running():
+            spinner.update_message(message)
+
+
 async def handle_simple_prompt(provider: str, api_key: str, prompt: str, 
                               options: Dict[str, Any], config: Dict[str, Any]):
     """Handle simple prompt without agent mode"""
-    spinner = SpinnerManager()
+    spinner = _lazy('SpinnerManager')()
     
     # Start with random thinking message
     thinking_messages = ['Thinking', 'Processing', 'Analyzing', 'Reasoning', 'Computing']
@@ -234,28 +346,26 @@ async def handle_simple_prompt(provider: str, api_key: str, prompt: str,
     random_message = random.choice(thinking_messages)
     spinner.start(random_message)
 
+    provider_manager = _lazy('ProviderManager')(config)
+    # Rotate the spinner text in the background so the request starts immediately
+    rotator = asyncio.create_task(_rotate_spinner_messages(spinner, ('Processing', 'Generating')))
     try:
-        # Update message during processing
-        await asyncio.sleep(1)
-        if spinner.is_running():
-            spinner.update_message('Processing')
-
-        await asyncio.sleep(1)
-        if spinner.is_running():
-            spinner.update_message('Generating')
-
-        provider_manager = ProviderManager(config)
-        response = await provider_manager.call(provider, api_key, prompt, {
-            'model': options.get('model'),
-            'maxTokens': options.get('max_tokens'),
-            'temperature': options.get('temperature')
-        })
-        
-        # Success with timing
-        spinner.succeed(f'Response generated in {spinner.get_elapsed_time()}s')
-        
-        # Clean output without technical artifacts
-        console.print(f'\n{response}\n')
+        # Write chunks as they arrive instead of holding the whole response
+        streaming = False
+        async for chunk in provider_manager.stream(provider, api_key, prompt, _provider_options(options)):
+            if not streaming:
+                streaming = True
+                rotator.cancel()
+                spinner.succeed(f'Response started in {spinner.get_elapsed_time()}s')
+                sys.stdout.write('\n')
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+
+        if streaming:
+            sys.stdout.write('\n\n')
+            sys.stdout.flush()
+        else:
+            spinner.succeed(f'Response generated in {spinner.get_elapsed_time()}s')
         
     except Exception as error:
         # Error with timing
@@ -273,13 +383,16 @@ async def handle_simple_prompt(provider: str, api_key: str, prompt: str,
             Utils.log_info('Check your internet connection and try again')
         
         sys.exit(1)
+    finally:
+        rotator.cancel()
+        await provider_manager.aclose()
 
 
 async def handle_agent_prompt(provider: str, api_key: str, prompt: str,
                              options: Dict[str, Any], config: Dict[str, Any],
                              effort_level: str, max_iterations: int, autonomous_mode: bool):
     """Handle prompt using the enhanced agent system"""
-    spinner = SpinnerManager()
+    spinner = _lazy('SpinnerManager')()
 
     try:
         # Initialize the enhanced agent
@@ -296,11 +409,12 @@ async def handle_agent_prompt(provider: str, api_key: str, prompt: str,
             'confirmation_required': not autonomous_mode,
             'autonomous': autonomous_mode,  # Explicitly pass autonomous flag
             'log_level': 'debug' if options.get('debug') else 'warning',  # Set log level based on debug flag
-            'enable_tracing': options.get('trace', False)
+            'enable_tracing': options.get('trace', False),
+            'stream': options.get('stream', False)
         }
 
         spinner.start('Initializing agent')
-        agent = EnhancedAgent(agent_options)
+        agent = _lazy('EnhancedAgent')(agent_options)
 
         # Process the prompt through the agent
         spinner.update_message('Agent processing')
@@ -318,18 +432,22 @@ async def handle_agent_prompt(provider: str, api_key: str, prompt: str,
 
             # Display the response
             response = result.get('response', '')
-            console.print(f'\n{response}\n')
+            _out(f'\n{response}\n')
 
             # Show execution results if any
             execution_results = result.get('execution_results', [])
             if execution_results:
-                console.print("🔧 [bold blue]Agent Actions Executed:[/bold blue]")
+                if _IS_TTY:
+                    heading, succeeded, failed = "🔧 [bold blue]Agent Actions Executed:[/bold blue]", '✅', '❌'
+                else:
+                    heading, succeeded, failed = 'Agent Actions Executed:', 'ok', 'failed'
+                _out(heading)
                 for i, exec_result in enumerate(execution_results, 1):
                     if exec_result.get('success'):
-                        console.print(f"  {i}. ✅ {exec_result.get('tool', 'Unknown')}")
+                        _out(f"  {i}. {succeeded} {exec_result.get('tool', 'Unknown')}")
                     else:
-                        console.print(f"  {i}. ❌ {exec_result.get('tool', 'Unknown')}: {exec_result.get('error', 'Failed')}")
-                console.print()
+                        _out(f"  {i}. {failed} {exec_result.get('tool', 'Unknown')}: {exec_result.get('error', 'Failed')}")
+                _out()
         else:
             # Agent processing failed
             spinner.fail(f'Agent processing failed after {spinner.get_elapsed_time()}s')
@@ -339,7 +457,7 @@ async def handle_agent_prompt(provider: str, api_key: str, prompt: str,
             # Fallback to simple response if available
             response = result.get('response', '')
             if response:
-                console.print(f'\n{response}\n')
+                _out(f'\n{response}\n')
 
             sys.exit(1)
 
@@ -358,7 +476,7 @@ def cli():
     try:
         main()
     except KeyboardInterrupt:
-        console.print("\n")
+        _console().print("\n")
         Utils.log_info("Operation cancelled by user")
         sys.exit(0)
     except Exception as error:
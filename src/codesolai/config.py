@@ -2,78 +2,142 @@
 Configuration management for .codesolairc files
 """
 
+import copy
+import functools
 import json
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
 from .utils import Utils
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+
+# Resolved once per process
+_CONFIG_PATH = Path.home() / '.codesolairc'
+
+_VALID_PROVIDERS = frozenset(('claude', 'gemini', 'gpt'))
+_VALID_OUTPUT_FORMATS = frozenset(('text', 'json', 'markdown'))
+
+# Environment variables consulted when no API key is stored in the config file
+_ENV_VAR = {
+    'claude': 'CLAUDE_API_KEY',
+    'gemini': 'GEMINI_API_KEY',
+    'gpt': 'GPT_API_KEY',
+}
+
+
+# Default configuration template, built once at import time
+_DEFAULT_CONFIG: Dict[str, Any] = {
+    "defaultProvider": None,
+    "timeout": 30000,
+    "maxRetries": 3,
+    "outputFormat": "text",
+    # Agent-specific settings
+    "agent": {
+        "enabled": False,  # Changed default to false
+        "confirmationEnabled": False,  # No confirmation required for tool execution
+        "autoApprove": True,  # Always auto-approve tool and command execution
+        "maxActionsPerPrompt": 10,
+        "autonomous": False,
+        "effort": "medium",
+        "maxIterations": 10,
+        "toolSecurity": {
+            "allowedCommands": [
+                "npm", "node", "git", "ls", "pwd", "cat", "echo", "mkdir", "touch",
+                "grep", "find", "curl", "wget", "which", "whereis", "ps", "python",
+                "pip", "poetry", "uv", "pytest", "black", "isort", "mypy"
+            ],
+            "blockedCommands": [
+                "rm", "rmdir", "del", "format", "fdisk", "mkfs", "dd", "sudo", "su",
+                "chmod", "chown", "passwd", "shutdown", "reboot", "halt", "init"
+            ],
+            "maxExecutionTime": 30000,
+            "maxOutputSize": 1048576
+        }
+    },
+    # API keys (optional - can use env vars instead)
+    "apiKeys": {}
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _split_key(key: str) -> tuple:
+    """Split a dotted config key (e.g. 'agent.enabled') into its path segments"""
+    return tuple(key.split('.'))
+
 
 class Config:
     """Configuration management for CodeSolAI"""
 
     def __init__(self):
-        self.config_path = Path.home() / '.codesolairc'
-        self.default_config = {
-            "defaultProvider": None,
-            "timeout": 30000,
-            "maxRetries": 3,
-            "outputFormat": "text",
-            # Agent-specific settings
-            "agent": {
-                "enabled": False,  # Changed default to false
-                "confirmationEnabled": False,  # No confirmation required for tool execution
-                "autoApprove": True,  # Always auto-approve tool and command execution
-                "maxActionsPerPrompt": 10,
-                "autonomous": False,
-                "effort": "medium",
-                "maxIterations": 10,
-                "toolSecurity": {
-                    "allowedCommands": [
-                        "npm", "node", "git", "ls", "pwd", "cat", "echo", "mkdir", "touch",
-                        "grep", "find", "curl", "wget", "which", "whereis", "ps", "python",
-                        "pip", "poetry", "uv", "pytest", "black", "isort", "mypy"
-                    ],
-                    "blockedCommands": [
-                        "rm", "rmdir", "del", "format", "fdisk", "mkfs", "dd", "sudo", "su",
-                        "chmod", "chown", "passwd", "shutdown", "reboot", "halt", "init"
-                    ],
-                    "maxExecutionTime": 30000,
-                    "maxOutputSize": 1048576
-                }
-            },
-            # API keys (optional - can use env vars instead)
-            "apiKeys": {}
-        }
+        self.config_path = _CONFIG_PATH
+        # Shared template; copy before handing out anything callers may mutate
+        self.default_config = _DEFAULT_CONFIG
+
+        # Parsed config cached against the file's stat signature
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_key: Optional[tuple] = None
 
     def deep_merge(self, target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
         """Deep merge two dictionaries"""
-        result = target.copy()
-        
-        for key, value in source.items():
-            if (key in result and 
-                isinstance(result[key], dict) and 
-                isinstance(value, dict)):
-                result[key] = self.deep_merge(result[key], value)
-            else:
-                result[key] = value
-        
+        result = copy.deepcopy(target)
+
+        # Walk nested levels with an explicit stack, merging into the copy in place
+        stack = [(result, source)]
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                existing = dst.get(key)
+                if isinstance(existing, dict) and isinstance(value, dict):
+                    stack.append((existing, value))
+                else:
+                    dst[key] = value
+
         return result
 
     def load(self) -> Dict[str, Any]:
         """Load configuration from .codesolairc file"""
         try:
-            if self.config_path.exists():
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    user_config = json.load(f)
-                
-                # Deep merge with defaults to preserve nested default values
-                config = self.deep_merge(self.default_config, user_config)
-                
-                # Validate configuration
-                self.validate_config(config)
-                
-                return config
+            # A single stat doubles as the existence check and the cache key
+            stat = self.config_path.stat()
+        except FileNotFoundError:
+            return copy.deepcopy(self.default_config)
+        except Exception as error:
+            Utils.log_warning(f"Could not read config file: {error}")
+            Utils.log_info("Using default configuration")
+            return copy.deepcopy(self.default_config)
+
+        try:
+            cache_key = (str(self.config_path), stat.st_mtime_ns, stat.st_size)
+
+            # Serve repeated loads from memory while the file is unchanged
+            if self._cache is not None and self._cache_key == cache_key:
+                return copy.deepcopy(self._cache)
+
+            user_config = _loads(self.config_path.read_bytes())
+            
+            # Deep merge with defaults to preserve nested default values
+            config = self.deep_merge(self.default_config, user_config)
+            
+            # Validate configuration
+            self.validate_config(config)
+
+            self._cache = copy.deepcopy(config)
+            self._cache_key = cache_key
+            
+            return config
         except json.JSONDecodeError:
             Utils.log_warning(f"Invalid JSON in config file: {self.config_path}")
             Utils.log_info("Using default configuration")
@@ -81,7 +145,7 @@ class Config:
             Utils.log_warning(f"Could not read config file: {error}")
             Utils.log_info("Using default configuration")
         
-        return self.default_config.copy()
+        return copy.deepcopy(self.default_config)
 
     def save(self, config: Dict[str, Any]) -> bool:
         """Save configuration to .codesolairc file"""
@@ -89,8 +153,9 @@ class Config:
             config_to_save = self.deep_merge(self.default_config, config)
             self.validate_config(config_to_save)
             
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_to_save, f, indent=2)
+            self.config_path.write_bytes(_dumps(config_to_save))
+
+            self._invalidate_cache()
             
             Utils.log_success(f"Configuration saved to {self.config_path}")
             return True
@@ -98,14 +163,16 @@ class Config:
             Utils.log_error(f"Could not save config file: {error}")
             return False
 
+    def _invalidate_cache(self) -> None:
+        """Drop the in-memory copy of the parsed config file"""
+        self._cache = None
+        self._cache_key = None
+
     def validate_config(self, config: Dict[str, Any]) -> None:
         """Validate configuration object"""
-        valid_providers = ['claude', 'gemini', 'gpt']
-        valid_output_formats = ['text', 'json', 'markdown']
-
-        if config.get('defaultProvider') and config['defaultProvider'] not in valid_providers:
+        if config.get('defaultProvider') and config['defaultProvider'] not in _VALID_PROVIDERS:
             raise ValueError(f"Invalid default provider: {config['defaultProvider']}. "
-                           f"Must be one of: {', '.join(valid_providers)}")
+                           f"Must be one of: {', '.join(sorted(_VALID_PROVIDERS))}")
 
         if config.get('timeout') and (not isinstance(config['timeout'], int) or config['timeout'] < 1000):
             raise ValueError('Timeout must be an integer >= 1000 milliseconds')
@@ -113,9 +180,9 @@ class Config:
         if config.get('maxRetries') and (not isinstance(config['maxRetries'], int) or config['maxRetries'] < 0):
             raise ValueError('Max retries must be a non-negative integer')
 
-        if config.get('outputFormat') and config['outputFormat'] not in valid_output_formats:
+        if config.get('outputFormat') and config['outputFormat'] not in _VALID_OUTPUT_FORMATS:
             raise ValueError(f"Invalid output format: {config['outputFormat']}. "
-                           f"Must be one of: {', '.join(valid_output_formats)}")
+                           f"Must be one of: {', '.join(sorted(_VALID_OUTPUT_FORMATS))}")
 
         # Validate agent settings
         if config.get('agent'):
@@ -184,7 +251,7 @@ class Config:
             if value is None:
                 display_value = 'not set'
             elif isinstance(value, dict):
-                display_value = json.dumps(value, indent=2)
+                display_value = _dumps(value).decode('utf-8')
             else:
                 display_value = str(value)
             print(f"{key}: {display_value}")
@@ -202,6 +269,7 @@ class Config:
 
     def reset(self) -> bool:
         """Reset configuration to defaults"""
+        self._invalidate_cache()
         try:
             if self.config_path.exists():
                 self.config_path.unlink()
@@ -219,7 +287,7 @@ class Config:
             config = self.load()
 
             # Handle nested keys (e.g., 'agent.enabled')
-            keys = key.split('.')
+            keys = _split_key(key)
             current = config
 
             for i in range(len(keys) - 1):
@@ -242,7 +310,7 @@ class Config:
             config = self.load()
 
             # Handle nested keys
-            keys = key.split('.')
+            keys = _split_key(key)
             current = config
 
             for k in keys:
@@ -262,7 +330,7 @@ class Config:
 
             # Apply all settings
             for key, value in settings.items():
-                keys = key.split('.')
+                keys = _split_key(key)
                 current = config
 
                 for i in range(len(keys) - 1):
@@ -281,10 +349,8 @@ class Config:
 
     def set_api_key(self, provider: str, api_key: str) -> bool:
         """Set API key for provider"""
-        valid_providers = ['claude', 'gemini', 'gpt']
-
-        if provider not in valid_providers:
-            Utils.log_error(f"Invalid provider: {provider}. Must be one of: {', '.join(valid_providers)}")
+        if provider not in _VALID_PROVIDERS:
+            Utils.log_error(f"Invalid provider: {provider}. Must be one of: {', '.join(sorted(_VALID_PROVIDERS))}")
             return False
 
         if not Utils.validate_api_key(api_key, provider):
@@ -293,12 +359,16 @@ class Config:
 
         return self.set(f"apiKeys.{provider}", api_key)
 
-    def get_api_key(self, provider: str) -> Optional[str]:
+    def get_api_key(self, provider: str, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Get API key for provider"""
-        # First check config file
-        config_key = self.get(f"apiKeys.{provider}")
+        # First check config file, reusing an already loaded config when given
+        if config is not None:
+            config_key = (config.get('apiKeys') or {}).get(provider)
+        else:
+            config_key = self.get(f"apiKeys.{provider}")
         if config_key:
             return config_key
 
         # Fall back to environment variables
-        return os.environ.get(f"{provider.upper()}_API_KEY")
+        env_var = _ENV_VAR.get(provider) or f"{provider.upper()}_API_KEY"
+        return os.environ.get(env_var)
@@ -3,10 +3,14 @@ Core Agent class implementing sophisticated reasoning and tool execution
 """
 
 import asyncio
+import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
 from ..utils import Utils
@@ -17,6 +21,21 @@ from .reasoning_engine import ReasoningEngine
 from .context_manager import ContextManager
 
 
+# Parameters naming the filesystem paths each tool reads and writes; actions only
+# wait for earlier actions touching an overlapping path
+_PATH_READS = {
+    'read_file': ('path',), 'list_directory': ('path',), 'search_files': ('path',),
+    'get_stats': ('path',), 'analyze_file': ('path',), 'copy_file': ('source',)
+}
+_PATH_WRITES = {
+    'write_file': ('path',), 'create_directory': ('path',), 'delete_file': ('path',),
+    'copy_file': ('destination',), 'move_file': ('source', 'destination')
+}
+# Tools that never touch the filesystem; any tool not listed here or above, such as
+# execute_command, runs alone after everything before it
+_PATH_FREE_TOOLS = frozenset(('analyze_code', 'http_request', 'ping'))
+
+
 class AgentState(Enum):
     """Agent state enumeration"""
     IDLE = "idle"
@@ -32,7 +51,23 @@ class AgentMetrics:
     tool_calls: int = 0
     errors: int = 0
     total_thinking_time: float = 0.0
-    average_response_time: float = 0.0
+    total_response_time: float = 0.0
+
+    @property
+    def average_response_time(self) -> float:
+        """Mean response time, derived on read from the running total"""
+        return self.total_response_time / max(self.conversations, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Detached copy of the current values, safe to hand to callers"""
+        return {
+            'conversations': self.conversations,
+            'tool_calls': self.tool_calls,
+            'errors': self.errors,
+            'total_thinking_time': self.total_thinking_time,
+            'total_response_time': self.total_response_time,
+            'average_response_time': self.average_response_time
+        }
 
 
 @dataclass
@@ -63,6 +98,8 @@ class AgentConfig:
     max_context_size: int = 100000
     compression_threshold: float = 0.8
     retention_strategy: str = "importance"  # fifo, importance, recency
+    summarize_history: bool = False  # Fold old history into a provider-written summary
+    conversation_archive_path: Optional[str] = None  # SQLite file for completed conversations
     
     # Security settings
     allowed_paths: List[str] = field(default_factory=lambda: ["./"])
@@ -81,25 +118,88 @@ class AgentConfig:
     enable_tracing: bool = False
 
 
+def _action_paths(parameters: Dict[str, Any], names: tuple) -> list:
+    """Absolute paths named by the given parameters, defaulting to the working directory"""
+    return [os.path.abspath(str(parameters.get(name) or '.')) for name in names]
+
+
+def _paths_overlap(first: list, second: list) -> bool:
+    """Check whether any path in one list equals or contains a path in the other"""
+    for a in first:
+        for b in second:
+            if a == b or a.startswith(b.rstrip(os.sep) + os.sep) or b.startswith(a.rstrip(os.sep) + os.sep):
+                return True
+    return False
+
+
+def _action_dependencies(actions: list) -> list:
+    """For each action, the indices of earlier actions it must wait for"""
+    dependencies = []
+    accesses = []  # (reads, writes) per action; None marks a barrier
+    barrier = None
+    for index, action in enumerate(actions):
+        tool_name = action.get('tool')
+        parameters = action.get('parameters') or {}
+        after_barrier = [] if barrier is None else [barrier]
+
+        if tool_name in _PATH_FREE_TOOLS:
+            accesses.append(([], []))
+            dependencies.append(after_barrier)
+        elif tool_name in _PATH_READS or tool_name in _PATH_WRITES:
+            reads = _action_paths(parameters, _PATH_READS.get(tool_name, ()))
+            writes = _action_paths(parameters, _PATH_WRITES.get(tool_name, ()))
+            accesses.append((reads, writes))
+            start = 0 if barrier is None else barrier + 1
+            dependencies.append(after_barrier + [
+                earlier for earlier in range(start, index)
+                if _paths_overlap(writes, accesses[earlier][0] + accesses[earlier][1])
+                or _paths_overlap(reads, accesses[earlier][1])
+            ])
+        else:
+            # Unknown effects: wait for everything since the previous barrier
+            start = 0 if barrier is None else barrier + 1
+            accesses.append(None)
+            dependencies.append(after_barrier + list(range(start, index)))
+            barrier = index
+    return dependencies
+
+
+def _config_key(config: AgentConfig) -> tuple:
+    """Hashable fingerprint of an agent config, ignoring its generated id"""
+    return tuple(
+        (f.name, tuple(value) if isinstance(value, list) else value)
+        for f in fields(config) if f.name != 'id'
+        for value in (getattr(config, f.name),)
+    )
+
+
 class Agent:
     """
     Core Agent class implementing sophisticated reasoning and tool execution
     This is the main orchestrator that coordinates all agent activities
     """
 
+    # Idle agents available for reuse, keyed by config fingerprint
+    POOL_MAX_IDLE_SECONDS = 300.0
+    POOL_MAX_SIZE = 8
+    _pool: 'OrderedDict[tuple, List[tuple]]' = OrderedDict()
+    _pool_lock = threading.Lock()
+
     def __init__(self, config: Optional[AgentConfig] = None):
         """Initialize the agent with configuration"""
         self.config = config or AgentConfig()
         
         # Generate ID if not provided
         if not self.config.id:
-            self.config.id = str(uuid.uuid4())
+            self.config.id = uuid.uuid4().hex
         
         # Initialize core properties
         self.id = self.config.id
         self.name = self.config.name
         self.state = AgentState.IDLE
         self.start_time = datetime.now()
+        # Uptime is measured on the monotonic clock, immune to wall-clock adjustments
+        self._start_monotonic = time.monotonic()
         self.metrics = AgentMetrics()
         
         # Initialize core components
@@ -124,11 +224,6 @@ class Agent:
             max_concurrent=self.config.max_concurrent_tools
         )
         
-        self.conversation_manager = ConversationManager(
-            logger=self.logger,
-            agent_id=self.id
-        )
-        
         self.reasoning_engine = ReasoningEngine(
             logger=self.logger,
             effort=self.config.reasoning_effort,
@@ -137,21 +232,33 @@ class Agent:
             enable_planning=self.config.enable_planning
         )
         
+        self._create_session_components()
+        
+        # Setup event handlers
+        self.setup_event_handlers()
+        
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Agent initialized', {
+                'id': self.id,
+                'name': self.name,
+                'config': self.config.__dict__
+            })
+
+    def _create_session_components(self):
+        """Build the components holding per-session state (conversations and context)"""
+        self.conversation_manager = ConversationManager(
+            logger=self.logger,
+            agent_id=self.id,
+            archive_path=self.config.conversation_archive_path
+        )
+        
         self.context_manager = ContextManager(
             logger=self.logger,
             max_size=self.config.max_context_size,
             compression_threshold=self.config.compression_threshold,
-            retention_strategy=self.config.retention_strategy
+            retention_strategy=self.config.retention_strategy,
+            summarize_history=self.config.summarize_history
         )
-        
-        # Setup event handlers
-        self.setup_event_handlers()
-        
-        self.logger.debug('Agent initialized', {
-            'id': self.id,
-            'name': self.name,
-            'config': self.config.__dict__
-        })
 
     def setup_event_handlers(self):
         """Setup event handlers for component coordination"""
@@ -167,6 +274,9 @@ class Agent:
         # Conversation events
         self.conversation_manager.on_conversation_start = self._on_conversation_start
         self.conversation_manager.on_conversation_end = self._on_conversation_end
+        
+        # Context compression summarizes older history through the reasoning engine
+        self.context_manager.summarizer = self.reasoning_engine.summarize_history
 
     def _on_tool_start(self, data: Dict[str, Any]):
         """Handle tool start event"""
@@ -208,8 +318,8 @@ class Agent:
         Main entry point for processing user input
         This implements the core agent reasoning loop
         """
-        start_time = datetime.now()
-        conversation_id = str(uuid.uuid4())
+        start_time = time.perf_counter()
+        conversation_id = uuid.uuid4().hex
         options = options or {}
 
         try:
@@ -227,6 +337,9 @@ class Agent:
                 'agent_id': self.id
             })
 
+            # Downstream components take the conversation as a plain dict
+            conversation = conversation.to_dict()
+
             # Build context for reasoning
             context = await self.context_manager.build_context({
                 'input': input_text,
@@ -258,12 +371,8 @@ class Agent:
             })
 
             # Calculate metrics
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            self.metrics.average_response_time = (
-                (self.metrics.average_response_time * (self.metrics.conversations - 1) + duration) /
-                self.metrics.conversations
-            )
+            duration = time.perf_counter() - start_time
+            self.metrics.total_response_time += duration
 
             return {
                 'conversation_id': conversation_id,
@@ -272,7 +381,7 @@ class Agent:
                 'execution_results': execution_results,
                 'reasoning': reasoning_result,
                 'duration': duration,
-                'metrics': self.metrics.__dict__
+                'metrics': self.metrics_snapshot
             }
 
         except Exception as error:
@@ -286,60 +395,170 @@ class Agent:
 
     async def _execute_actions(self, actions: List[Dict[str, Any]], conversation_id: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Execute planned actions using the tool registry"""
-        results = []
-        
-        for action in actions:
+        async def execute_action(action: Dict[str, Any]) -> Dict[str, Any]:
             try:
                 if not self.config.auto_approve and self.config.confirmation_required:
                     # In a real implementation, this would prompt the user
                     # For now, we'll assume approval
                     pass
                 
-                result = await self.tool_registry.execute_tool(
+                return await self.tool_registry.execute_tool(
                     action['tool'],
                     action.get('parameters', {}),
                     conversation_id
                 )
-                results.append(result)
                 
             except Exception as error:
                 self.logger.error('Action execution failed', {
                     'action': action,
                     'error': str(error)
                 })
-                results.append({
+                return {
                     'action': action,
                     'success': False,
                     'error': str(error)
-                })
+                }
+        
+        async def run_after(prerequisites: list, action: Dict[str, Any]) -> Dict[str, Any]:
+            if prerequisites:
+                await asyncio.wait(prerequisites)
+            return await execute_action(action)
         
-        return results
+        # Each action starts once the earlier actions it conflicts with have finished;
+        # the registry's semaphore caps how many run at once at max_concurrent_tools
+        tasks = []
+        for action, dependencies in zip(actions, _action_dependencies(actions)):
+            tasks.append(asyncio.ensure_future(run_after([tasks[earlier] for earlier in dependencies], action)))
+        
+        return list(await asyncio.gather(*tasks))
 
-    async def shutdown(self):
-        """Shutdown the agent and cleanup resources"""
-        self.logger.debug('Shutting down agent', {'id': self.id})
+    @classmethod
+    async def acquire(cls, config: Optional[AgentConfig] = None) -> 'Agent':
+        """Get an idle pooled agent built from an equivalent config, or create one"""
+        config = config or AgentConfig()
+        key = (cls, _config_key(config))
+        
+        agent = None
+        with cls._pool_lock:
+            evicted = cls._evict_idle_agents()
+            idle = cls._pool.get(key)
+            if idle:
+                agent, _ = idle.pop()
+                if not idle:
+                    del cls._pool[key]
+        await cls._shutdown_agents(evicted)
+        
+        if agent is None:
+            agent = cls(config)
+            agent._pool_key = key
+        return agent
+
+    async def release(self):
+        """Clear all per-session state and return the agent to the pool"""
+        key = getattr(self, '_pool_key', None)
+        if key is None:
+            return
+        
+        await self._reset_session()
         
-        # Cleanup components
-        if hasattr(self.tool_registry, 'shutdown'):
-            await self.tool_registry.shutdown()
+        with self._pool_lock:
+            self._pool.setdefault(key, []).append((self, time.monotonic()))
+            self._pool.move_to_end(key)
+            evicted = self._evict_idle_agents()
+        await self._shutdown_agents(evicted)
+
+    async def _reset_session(self):
+        """Replace conversations, context and metrics so nothing carries over to the next user;
+        shutting the old conversation manager down also deletes its archived rows"""
+        results = await asyncio.gather(
+            self.conversation_manager.shutdown(),
+            self.context_manager.shutdown(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error('Component shutdown failed', {'id': self.id, 'error': str(result)})
+        
+        self._create_session_components()
+        self.setup_event_handlers()
+        self.logger.clear_trace()
+        self.state = AgentState.IDLE
+        self.metrics = AgentMetrics()
+
+    @classmethod
+    def _evict_idle_agents(cls) -> List['Agent']:
+        """Remove pooled agents idle for too long, then the oldest beyond the size cap;
+        returns them so the caller can shut them down outside the lock"""
+        evicted = []
+        cutoff = time.monotonic() - cls.POOL_MAX_IDLE_SECONDS
+        for key in list(cls._pool):
+            idle = []
+            for entry in cls._pool[key]:
+                (idle if entry[1] >= cutoff else evicted).append(entry)
+            if idle:
+                cls._pool[key] = idle
+            else:
+                del cls._pool[key]
+        
+        while sum(len(idle) for idle in cls._pool.values()) > cls.POOL_MAX_SIZE:
+            oldest_key = next(iter(cls._pool))
+            evicted.append(cls._pool[oldest_key].pop(0))
+            if not cls._pool[oldest_key]:
+                del cls._pool[oldest_key]
         
-        if hasattr(self.conversation_manager, 'shutdown'):
-            await self.conversation_manager.shutdown()
+        return [agent for agent, _ in evicted]
+
+    @staticmethod
+    async def _shutdown_agents(agents: List['Agent']):
+        """Shut down agents removed from the pool, logging rather than raising failures"""
+        results = await asyncio.gather(*(agent.shutdown() for agent in agents), return_exceptions=True)
+        for agent, result in zip(agents, results):
+            if isinstance(result, Exception):
+                agent.logger.error('Pooled agent shutdown failed', {'id': agent.id, 'error': str(result)})
+
+    @classmethod
+    async def drain_pool(cls):
+        """Shut down and discard every idle pooled agent"""
+        with cls._pool_lock:
+            agents = [agent for idle in cls._pool.values() for agent, _ in idle]
+            cls._pool.clear()
         
-        if hasattr(self.reasoning_engine, 'shutdown'):
-            await self.reasoning_engine.shutdown()
+        await cls._shutdown_agents(agents)
+
+    async def shutdown(self):
+        """Shutdown the agent and cleanup resources"""
+        self.logger.debug('Shutting down agent', {'id': self.id})
         
-        if hasattr(self.context_manager, 'shutdown'):
-            await self.context_manager.shutdown()
+        # Cleanup components concurrently; one failing component does not block the rest
+        results = await asyncio.gather(
+            self.tool_registry.shutdown(),
+            self.conversation_manager.shutdown(),
+            self.reasoning_engine.shutdown(),
+            self.context_manager.shutdown(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error('Component shutdown failed', {'id': self.id, 'error': str(result)})
         
         self.state = AgentState.IDLE
 
+    @property
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """Detached copy of the current metrics, safe to hand to callers"""
+        return self.metrics.snapshot()
+
+    @property
+    def uptime(self) -> float:
+        """Seconds since the agent was created"""
+        return time.monotonic() - self._start_monotonic
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get current agent metrics"""
         return {
             'id': self.id,
             'name': self.name,
             'state': self.state.value,
-            'uptime': (datetime.now() - self.start_time).total_seconds(),
-            'metrics': self.metrics.__dict__
+            'uptime': self.uptime,
+            'metrics': self.metrics_snapshot
         }
@@ -2,91 +2,206 @@
 Context Manager for handling agent context and memory
 """
 
+import asyncio
+import heapq
 import json
+import sys
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from operator import itemgetter
+from typing import Dict, Any, Optional, List, Deque, Callable, Awaitable, Mapping
 
 from .logger import Logger
 
+# Slotted dataclasses where supported (Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    # Bytes added between list items / dict entries (',')
+    _SEPARATOR_SIZE = 1
+except ImportError:
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, default=str).encode('utf-8')
+
+    # Bytes added between list items / dict entries (', ')
+    _SEPARATOR_SIZE = 2
+
+
+def _json_size(value: Any) -> int:
+    """Serialized JSON size of a value in bytes"""
+    return len(_dumps(value))
+
+
+def _entry_size(key: Any, value: Any) -> int:
+    """Serialized size of one dict entry plus its separator, without the enclosing braces"""
+    return _json_size({key: value}) - 2 + _SEPARATOR_SIZE
+
+# Shared read-only default for lookups whose result is only read, never stored
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+# Conversation history retention limit
+MAX_HISTORY_ITEMS = 100
+
+# Supported retention strategies; none scores items yet, so all of them keep
+# the most recent MAX_HISTORY_ITEMS entries
+RETENTION_STRATEGIES = ('fifo', 'importance', 'recency')
+
+# Context sections that count towards the context size
+_SIZED_SECTIONS = ('current_session', 'conversation_history', 'user_preferences', 'system_state', 'knowledge_base')
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class HistoryItem:
+    """Single conversation history entry"""
+    conversation_id: Optional[str]
+    input: str
+    timestamp: datetime
+    metadata: Dict[str, Any]
+    tokens: frozenset = frozenset()
+    size_bytes: int = 0
+    seq: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public dictionary form of the entry"""
+        return {
+            'conversation_id': self.conversation_id,
+            'input': self.input,
+            'timestamp': self.timestamp,
+            'metadata': self.metadata
+        }
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class ContextData:
+    """Context storage for the agent"""
+    current_session: Dict[str, Any] = field(default_factory=dict)
+    conversation_history: Deque[HistoryItem] = field(default_factory=lambda: deque(maxlen=MAX_HISTORY_ITEMS))
+    user_preferences: Dict[str, Any] = field(default_factory=dict)
+    system_state: Dict[str, Any] = field(default_factory=dict)
+    knowledge_base: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
 
 class ContextManager:
     """Manager for agent context and memory"""
 
     def __init__(self, logger: Logger, max_size: int = 100000, 
-                 compression_threshold: float = 0.8, retention_strategy: str = "importance"):
+                 compression_threshold: float = 0.8, retention_strategy: str = "importance",
+                 summarize_history: bool = False):
         self.logger = logger
         self.max_size = max_size
         self.compression_threshold = compression_threshold
+        if retention_strategy not in RETENTION_STRATEGIES:
+            logger.warn('Unsupported retention strategy, falling back to fifo', {
+                'retention_strategy': retention_strategy,
+                'supported': list(RETENTION_STRATEGIES)
+            })
+            retention_strategy = 'fifo'
         self.retention_strategy = retention_strategy
         
         # Context storage
-        self.context_data = {
-            'current_session': {},
-            'conversation_history': [],
-            'user_preferences': {},
-            'system_state': {},
-            'knowledge_base': {},
-            'metadata': {
-                'created': datetime.now(),
-                'last_updated': datetime.now(),
-                'size_bytes': 0
-            }
-        }
+        now = datetime.now()
+        self.context_data = ContextData(metadata={
+            'created': now,
+            'last_updated': now,
+            'size_bytes': 0
+        })
+        
+        # Serialized size per section, kept current by the mutators; a full
+        # recompute only happens when a section is replaced wholesale
+        self._section_sizes: Dict[str, int] = {}
+        self._size_dirty = True
+        
+        # Inverted index of history tokens to item sequence numbers, so relevance
+        # scoring only visits items sharing at least one word with the input
+        self._postings: Dict[str, set] = defaultdict(set)
+        self._history_by_seq: Dict[int, HistoryItem] = {}
+        self._next_seq = 0
+        
+        # Rolling summary of history folded away once the context grows past the
+        # compression threshold; produced in the background by the summarizer.
+        # Each summary is a provider call, so it only runs when enabled
+        self.summarize_history = summarize_history
+        self.summarizer: Optional[Callable[[List[str], Dict[str, Any], str], Awaitable[str]]] = None
+        self._compressed_summary = ''
+        self._summary_task: Optional[asyncio.Task] = None
         
         self.logger.debug('Context manager initialized', {
             'max_size': max_size,
             'compression_threshold': compression_threshold,
-            'retention_strategy': retention_strategy
+            'retention_strategy': retention_strategy,
+            'summarize_history': summarize_history
         })
 
     async def build_context(self, context_request: Dict[str, Any]) -> Dict[str, Any]:
         """Build context for reasoning based on current input and history"""
         input_text = context_request.get('input', '')
-        conversation = context_request.get('conversation', {})
+        conversation = context_request.get('conversation', _EMPTY_DICT)
         options = context_request.get('options', {})
         
+        # One wall-clock read serves every timestamp for this turn
+        now = datetime.now()
+        
         # Update current session context
-        await self._update_current_session(input_text, conversation, options)
+        await self._update_current_session(input_text, conversation, options, now)
         
         # Build comprehensive context
         context = {
             'current_input': input_text,
             'conversation_id': conversation.get('id'),
-            'session_context': self.context_data['current_session'],
+            'session_context': self.context_data.current_session,
             'relevant_history': await self._get_relevant_history(input_text),
-            'user_preferences': self.context_data['user_preferences'],
-            'system_state': self.context_data['system_state'],
+            'user_preferences': self.context_data.user_preferences,
+            'system_state': self.context_data.system_state,
             'knowledge_snippets': await self._get_relevant_knowledge(input_text),
             'metadata': {
                 'context_size': self._calculate_context_size(),
-                'timestamp': datetime.now()
+                'timestamp': now
             }
         }
         
+        if self._compressed_summary:
+            context['compressed_context'] = self._compressed_summary
+        
         # Compress if needed
         if self._should_compress():
-            context = await self._compress_context(context)
+            await self._compress_context_inplace(context)
+            self._schedule_history_summary(options)
         
-        self.logger.debug('Context built', {
-            'input_length': len(input_text),
-            'context_size': len(json.dumps(context, default=str)),
-            'conversation_id': conversation.get('id')
-        })
+        # Serializing the context just for a size figure is only worth it when debugging
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Context built', {
+                'input_length': len(input_text),
+                'context_size': _json_size(context),
+                'conversation_id': conversation.get('id')
+            })
         
         return context
 
-    async def _update_current_session(self, input_text: str, conversation: Dict[str, Any], options: Dict[str, Any]):
+    async def _update_current_session(self, input_text: str, conversation: Mapping[str, Any], options: Dict[str, Any],
+                                      now: Optional[datetime] = None):
         """Update current session context"""
+        now = now or datetime.now()
+        session = self.context_data.current_session
         session_update = {
             'last_input': input_text,
-            'last_input_time': datetime.now(),
+            'last_input_time': now,
             'conversation_id': conversation.get('id'),
             'options': options,
-            'input_count': self.context_data['current_session'].get('input_count', 0) + 1
+            'input_count': session.get('input_count', 0) + 1
         }
         
-        self.context_data['current_session'].update(session_update)
-        self.context_data['metadata']['last_updated'] = datetime.now()
+        session.update(session_update)
+        self.context_data.metadata['last_updated'] = now
+        self._refresh_section_size('current_session')
 
     async def _get_relevant_history(self, input_text: str, max_items: int = 5) -> List[Dict[str, Any]]:
         """Get relevant conversation history based on input"""
@@ -94,22 +209,25 @@ class ContextManager:
         # In a real implementation, this could use embeddings or other NLP techniques
         
         relevant_items = []
-        input_words = set(input_text.lower().split())
+        input_words = frozenset(input_text.lower().split())
+        input_count = len(input_words)
+        postings = self._postings
+        candidates = set().union(*(postings[word] for word in input_words if word in postings))
         
-        for item in self.context_data['conversation_history']:
-            if 'input' in item:
-                item_words = set(item['input'].lower().split())
-                relevance_score = len(input_words.intersection(item_words)) / len(input_words.union(item_words))
+        # Visit candidates oldest first so ties rank as they did in a full history scan
+        for seq in sorted(candidates):
+            item = self._history_by_seq[seq]
+            # Jaccard score with the union size derived from counts instead of building the union set
+            overlap = len(input_words & item.tokens)
+            if overlap:
+                relevance_score = overlap / (input_count + len(item.tokens) - overlap)
                 
                 if relevance_score > 0.1:  # Minimum relevance threshold
-                    relevant_items.append({
-                        'item': item,
-                        'relevance_score': relevance_score
-                    })
+                    relevant_items.append((relevance_score, item))
         
-        # Sort by relevance and return top items
-        relevant_items.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return [item['item'] for item in relevant_items[:max_items]]
+        # Select the top items without sorting every candidate
+        top_items = heapq.nlargest(max_items, relevant_items, key=itemgetter(0))
+        return [item.to_dict() for _, item in top_items]
 
     async def _get_relevant_knowledge(self, input_text: str, max_items: int = 3) -> List[Dict[str, Any]]:
         """Get relevant knowledge base snippets"""
@@ -120,87 +238,159 @@ class ContextManager:
     def _calculate_context_size(self) -> int:
         """Calculate current context size in bytes"""
         try:
-            context_json = json.dumps(self.context_data, default=str)
-            size = len(context_json.encode('utf-8'))
-            self.context_data['metadata']['size_bytes'] = size
+            if self._size_dirty:
+                for section in _SIZED_SECTIONS:
+                    self._refresh_section_size(section)
+                self._size_dirty = False
+            
+            size = sum(self._section_sizes.values())
+            self.context_data.metadata['size_bytes'] = size
             return size
         except Exception as error:
             self.logger.error('Error calculating context size', {'error': str(error)})
             return 0
 
+    def _refresh_section_size(self, section: str):
+        """Re-measure one context section after it has been mutated"""
+        if section == 'conversation_history':
+            value = [item.to_dict() for item in self.context_data.conversation_history]
+        else:
+            value = getattr(self.context_data, section)
+        self._section_sizes[section] = _json_size(value)
+
+    def _adjust_section_size(self, section: str, delta: int):
+        """Apply an incremental size change to a context section"""
+        if not self._size_dirty:
+            self._section_sizes[section] = self._section_sizes.get(section, 0) + delta
+
+    def _adjust_collection_size(self, section: str, delta: int, count_before: int, count_after: int):
+        """Apply a size change to a list or dict section whose entries are sized with a
+        trailing separator; the first entry has none, so correct at the empty boundary"""
+        if not count_before and count_after:
+            delta -= _SEPARATOR_SIZE
+        elif count_before and not count_after:
+            delta += _SEPARATOR_SIZE
+        self._adjust_section_size(section, delta)
+
     def _should_compress(self) -> bool:
         """Determine if context should be compressed"""
         current_size = self._calculate_context_size()
         threshold_size = self.max_size * self.compression_threshold
         return current_size > threshold_size
 
-    async def _compress_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Compress context to reduce size"""
-        compressed_context = context.copy()
+    async def _compress_context_inplace(self, context: Dict[str, Any]):
+        """Compress context in place to reduce size"""
+        original_size = _json_size(context) if self.logger.is_debug_enabled() else None
         
         # Reduce history items
-        if 'relevant_history' in compressed_context:
-            compressed_context['relevant_history'] = compressed_context['relevant_history'][:3]
+        if 'relevant_history' in context:
+            del context['relevant_history'][3:]
         
         # Summarize session context
-        if 'session_context' in compressed_context:
-            session = compressed_context['session_context']
-            compressed_context['session_context'] = {
+        if 'session_context' in context:
+            session = context['session_context']
+            context['session_context'] = {
                 'input_count': session.get('input_count', 0),
                 'last_input_time': session.get('last_input_time'),
                 'conversation_id': session.get('conversation_id')
             }
         
-        self.logger.debug('Context compressed', {
-            'original_size': len(json.dumps(context, default=str)),
-            'compressed_size': len(json.dumps(compressed_context, default=str))
-        })
+        if original_size is not None:
+            self.logger.debug('Context compressed', {
+                'original_size': original_size,
+                'compressed_size': _json_size(context)
+            })
+
+    def _schedule_history_summary(self, options: Dict[str, Any]):
+        """Start a background summary of older history unless one is running"""
+        if not self.summarize_history or self.summarizer is None:
+            return
+        if self._summary_task and not self._summary_task.done():
+            return
+        if len(self.context_data.conversation_history) < 2:
+            return
+        
+        self._summary_task = asyncio.create_task(self._summarize_old_history(options))
+
+    async def _summarize_old_history(self, options: Dict[str, Any]):
+        """Fold the oldest half of history into the compressed summary"""
+        history = self.context_data.conversation_history
+        old_items = [history[i] for i in range(len(history) // 2)]
+        
+        summary = await self.summarizer([item.input for item in old_items], options, self._compressed_summary)
+        if not summary:
+            return
+        
+        # History may have moved on while summarizing; drop only what was summarized
+        last_seq = old_items[-1].seq
+        history = self.context_data.conversation_history
+        count_before = len(history)
+        removed_size = 0
+        while history and history[0].seq <= last_seq:
+            item = history.popleft()
+            self._unindex_history_item(item)
+            removed_size += item.size_bytes
+        self._adjust_collection_size('conversation_history', -removed_size, count_before, len(history))
         
-        return compressed_context
+        self._compressed_summary = summary
+        self.context_data.metadata['last_updated'] = datetime.now()
+        
+        self.logger.debug('History summarized', {
+            'summarized_items': len(old_items),
+            'history_size': len(history)
+        })
 
     async def add_to_history(self, conversation_data: Dict[str, Any]):
         """Add conversation data to history"""
-        history_item = {
-            'conversation_id': conversation_data.get('id'),
-            'input': conversation_data.get('input', ''),
-            'timestamp': datetime.now(),
-            'metadata': conversation_data.get('metadata', {})
-        }
+        history_item = HistoryItem(
+            conversation_id=conversation_data.get('id'),
+            input=conversation_data.get('input', ''),
+            timestamp=datetime.now(),
+            metadata=conversation_data.get('metadata', {})
+        )
+        history_item.tokens = frozenset(history_item.input.lower().split())
+        history_item.size_bytes = _json_size(history_item.to_dict()) + _SEPARATOR_SIZE
+        history_item.seq = self._next_seq
+        self._next_seq += 1
         
-        self.context_data['conversation_history'].append(history_item)
+        # The bounded deque drops its oldest entry on append once full; account for it
+        # first. Every entry of RETENTION_STRATEGIES keeps the most recent items.
+        history = self.context_data.conversation_history
+        count_before = len(history)
+        if count_before == history.maxlen:
+            self._unindex_history_item(history[0])
+            self._adjust_section_size('conversation_history', -history[0].size_bytes)
         
-        # Apply retention strategy
-        await self._apply_retention_strategy()
+        history.append(history_item)
+        self._index_history_item(history_item)
+        self._adjust_collection_size('conversation_history', history_item.size_bytes, count_before, len(history))
         
         self.logger.debug('Added to conversation history', {
             'conversation_id': conversation_data.get('id'),
-            'history_size': len(self.context_data['conversation_history'])
+            'history_size': len(self.context_data.conversation_history)
         })
 
-    async def _apply_retention_strategy(self):
-        """Apply retention strategy to manage history size"""
-        max_history_items = 100  # Configurable limit
-        
-        if len(self.context_data['conversation_history']) <= max_history_items:
-            return
-        
-        if self.retention_strategy == 'fifo':
-            # Keep most recent items
-            self.context_data['conversation_history'] = self.context_data['conversation_history'][-max_history_items:]
-        
-        elif self.retention_strategy == 'importance':
-            # Keep items with higher importance (placeholder logic)
-            # In a real implementation, this would use more sophisticated scoring
-            self.context_data['conversation_history'] = self.context_data['conversation_history'][-max_history_items:]
-        
-        elif self.retention_strategy == 'recency':
-            # Keep most recent items (same as FIFO for now)
-            self.context_data['conversation_history'] = self.context_data['conversation_history'][-max_history_items:]
+    def _index_history_item(self, item: HistoryItem):
+        """Register a history item's tokens in the inverted index"""
+        self._history_by_seq[item.seq] = item
+        for word in item.tokens:
+            self._postings[word].add(item.seq)
+
+    def _unindex_history_item(self, item: HistoryItem):
+        """Remove an evicted history item from the inverted index"""
+        self._history_by_seq.pop(item.seq, None)
+        for word in item.tokens:
+            seqs = self._postings.get(word)
+            if seqs is not None:
+                seqs.discard(item.seq)
+                if not seqs:
+                    del self._postings[word]
 
     async def update_user_preferences(self, preferences: Dict[str, Any]):
         """Update user preferences"""
-        self.context_data['user_preferences'].update(preferences)
-        self.context_data['metadata']['last_updated'] = datetime.now()
+        self.context_data.user_preferences.update(preferences)
+        self.context_data.metadata['last_updated'] = datetime.now()
+        self._refresh_section_size('user_preferences')
         
         self.logger.debug('User preferences updated', {
             'preferences': list(preferences.keys())
@@ -208,8 +398,9 @@ class ContextManager:
 
     async def update_system_state(self, state_updates: Dict[str, Any]):
         """Update system state"""
-        self.context_data['system_state'].update(state_updates)
-        self.context_data['metadata']['last_updated'] = datetime.now()
+        self.context_data.system_state.update(state_updates)
+        self.context_data.metadata['last_updated'] = datetime.now()
+        self._refresh_section_size('system_state')
         
         self.logger.debug('System state updated', {
             'updates': list(state_updates.keys())
@@ -217,43 +408,60 @@ class ContextManager:
 
     async def add_knowledge(self, knowledge_item: Dict[str, Any]):
         """Add item to knowledge base"""
-        item_id = knowledge_item.get('id', str(datetime.now().timestamp()))
-        self.context_data['knowledge_base'][item_id] = {
+        now = datetime.now()
+        item_id = knowledge_item.get('id', str(now.timestamp()))
+        knowledge_base = self.context_data.knowledge_base
+        count_before = len(knowledge_base)
+        delta = 0
+        if item_id in knowledge_base:
+            delta -= _entry_size(item_id, knowledge_base[item_id])
+        
+        knowledge_base[item_id] = {
             'content': knowledge_item.get('content', ''),
             'metadata': knowledge_item.get('metadata', {}),
-            'timestamp': datetime.now()
+            'timestamp': now
         }
+        delta += _entry_size(item_id, knowledge_base[item_id])
+        self._adjust_collection_size('knowledge_base', delta, count_before, len(knowledge_base))
         
         self.logger.debug('Knowledge added', {'item_id': item_id})
 
     def get_context_summary(self) -> Dict[str, Any]:
         """Get summary of current context"""
         return {
-            'session_inputs': self.context_data['current_session'].get('input_count', 0),
-            'history_items': len(self.context_data['conversation_history']),
-            'knowledge_items': len(self.context_data['knowledge_base']),
-            'context_size_bytes': self.context_data['metadata']['size_bytes'],
-            'last_updated': self.context_data['metadata']['last_updated'],
+            'session_inputs': self.context_data.current_session.get('input_count', 0),
+            'history_items': len(self.context_data.conversation_history),
+            'knowledge_items': len(self.context_data.knowledge_base),
+            'context_size_bytes': self.context_data.metadata['size_bytes'],
+            'last_updated': self.context_data.metadata['last_updated'],
             'retention_strategy': self.retention_strategy
         }
 
     async def clear_session(self):
         """Clear current session context"""
-        self.context_data['current_session'] = {}
-        self.context_data['metadata']['last_updated'] = datetime.now()
+        self.context_data.current_session = {}
+        self.context_data.metadata['last_updated'] = datetime.now()
+        self._size_dirty = True
         
         self.logger.info('Session context cleared')
 
     async def clear_history(self):
         """Clear conversation history"""
-        self.context_data['conversation_history'] = []
-        self.context_data['metadata']['last_updated'] = datetime.now()
+        self.context_data.conversation_history = deque(maxlen=MAX_HISTORY_ITEMS)
+        self._postings.clear()
+        self._history_by_seq.clear()
+        self._compressed_summary = ''
+        self.context_data.metadata['last_updated'] = datetime.now()
+        self._size_dirty = True
         
         self.logger.info('Conversation history cleared')
 
     async def shutdown(self):
         """Shutdown the context manager"""
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
+        
         self.logger.info('Shutting down context manager', {
             'final_context_size': self._calculate_context_size(),
-            'history_items': len(self.context_data['conversation_history'])
+            'history_items': len(self.context_data.conversation_history)
         })
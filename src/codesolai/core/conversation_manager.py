@@ -2,20 +2,125 @@
 Conversation Manager for handling agent conversations and context
 """
 
-import uuid
-from datetime import datetime
-from typing import Dict, Any, Optional, List, Callable
+import asyncio
+import heapq
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Tuple
 
 from .logger import Logger
+from .conversation_store import ConversationStore, dumps_json
+
+# Slotted dataclasses where supported (Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Message:
+    """Single message within a conversation"""
+    role: str
+    content: str
+    timestamp: float
+    metadata: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form of the message"""
+        message = {'role': self.role, 'content': self.content, 'timestamp': self.timestamp}
+        if self.metadata is not None:
+            message['metadata'] = self.metadata
+        return message
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Conversation:
+    """Conversation record tracked by the manager"""
+    id: str
+    agent_id: str
+    start_time: float
+    input: str
+    options: Dict[str, Any]
+    messages: List[Message] = field(default_factory=list)
+    context: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    status: str = 'active'
+    end_time: Optional[float] = None
+    duration: Optional[float] = None
+    final_data: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form of the conversation for external callers"""
+        data = {
+            'id': self.id,
+            'agent_id': self.agent_id,
+            'start_time': self.start_time,
+            'input': self.input,
+            'options': self.options,
+            'messages': [message.to_dict() for message in self.messages],
+            'context': self.context,
+            'metadata': self.metadata,
+            'status': self.status
+        }
+        if self.end_time is not None:
+            data['end_time'] = self.end_time
+            data['duration'] = self.duration
+        if self.final_data is not None:
+            data['final_data'] = self.final_data
+        return data
+
+    def to_json_bytes(self) -> bytes:
+        """JSON encoding of the conversation, via orjson when available"""
+        return dumps_json(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Conversation':
+        """Rebuild a conversation from its dictionary form"""
+        return cls(
+            id=data['id'],
+            agent_id=data['agent_id'],
+            start_time=data['start_time'],
+            input=data['input'],
+            options=data['options'],
+            messages=[Message(**message) for message in data['messages']],
+            context=data['context'],
+            metadata=data['metadata'],
+            status=data['status'],
+            end_time=data.get('end_time'),
+            duration=data.get('duration'),
+            final_data=data.get('final_data')
+        )
 
 
 class ConversationManager:
     """Manager for agent conversations and context"""
 
-    def __init__(self, logger: Logger, agent_id: str):
+    # Archived conversations kept hydrated in memory
+    ARCHIVE_CACHE_SIZE = 128
+
+    def __init__(self, logger: Logger, agent_id: str, archive_path: Optional[str] = None):
         self.logger = logger
         self.agent_id = agent_id
-        self.conversations: Dict[str, Dict[str, Any]] = {}
+        self.conversations: Dict[str, Conversation] = {}
+        
+        # With an archive, completed conversations move to disk and only active
+        # ones (plus a small LRU of recently read archived ones) stay in memory.
+        # Rows are owned by this manager instance alone, so managers sharing the
+        # file (including a pooled agent's next session) never see them
+        self._archive: Optional[ConversationStore] = (
+            ConversationStore(archive_path, secrets.token_hex(8)) if archive_path else None
+        )
+        self._archive_cache: 'OrderedDict[str, Conversation]' = OrderedDict()
+        
+        # Status indexes so status queries avoid scanning every conversation
+        self._active_ids: set = set()
+        self._completed_ids: set = set()
+        self._total_messages = 0
+        
+        # (end_time, conversation_id) min-heap so cleanup only visits expired entries;
+        # entries go stale when a conversation is restarted or ended again
+        self._completion_heap: List[tuple] = []
         
         # Event handlers
         self.on_conversation_start: Optional[Callable] = None
@@ -23,44 +128,52 @@ class ConversationManager:
         
         self.logger.debug('Conversation manager initialized', {'agent_id': agent_id})
 
-    async def start_conversation(self, conversation_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def start_conversation(self, conversation_data: Dict[str, Any]) -> Conversation:
         """Start a new conversation"""
-        conversation_id = conversation_data.get('id', str(uuid.uuid4()))
+        conversation_id = conversation_data.get('id')
+        if conversation_id is None:
+            # 64 random bits is ample for ids scoped to one agent
+            conversation_id = secrets.token_hex(8)
         
-        conversation = {
-            'id': conversation_id,
-            'agent_id': self.agent_id,
-            'start_time': datetime.now(),
-            'input': conversation_data.get('input', ''),
-            'options': conversation_data.get('options', {}),
-            'messages': [],
-            'context': {},
-            'metadata': {},
-            'status': 'active'
-        }
+        conversation = Conversation(
+            id=conversation_id,
+            agent_id=self.agent_id,
+            start_time=time.time(),
+            input=conversation_data.get('input', ''),
+            options=conversation_data.get('options', {})
+        )
         
         # Add initial user message
-        conversation['messages'].append({
-            'role': 'user',
-            'content': conversation['input'],
-            'timestamp': conversation['start_time']
-        })
+        conversation.messages.append(Message('user', conversation.input, conversation.start_time))
+        
+        # Restarting an existing id replaces its record
+        previous = self.conversations.get(conversation_id)
+        if previous is not None:
+            self._total_messages -= len(previous.messages)
+        elif self._archive and conversation_id in self._completed_ids:
+            self._total_messages -= await asyncio.to_thread(self._archive.delete, conversation_id)
+            self._archive_cache.pop(conversation_id, None)
+        self._total_messages += 1
         
         # Store conversation
         self.conversations[conversation_id] = conversation
+        self._completed_ids.discard(conversation_id)
+        self._active_ids.add(conversation_id)
         
         # Notify start
+        input_length = len(conversation.input)
         if self.on_conversation_start:
             self.on_conversation_start({
                 'conversation_id': conversation_id,
                 'agent_id': self.agent_id,
-                'input_length': len(conversation['input'])
+                'input_length': input_length
             })
         
-        self.logger.info('Conversation started', {
-            'conversation_id': conversation_id,
-            'input_length': len(conversation['input'])
-        })
+        if self.logger.is_info_enabled():
+            self.logger.info('Conversation started', {
+                'conversation_id': conversation_id,
+                'input_length': input_length
+            })
         
         return conversation
 
@@ -70,20 +183,42 @@ class ConversationManager:
             self.logger.error('Conversation not found', {'conversation_id': conversation_id})
             return False
         
-        message = {
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now(),
-            'metadata': metadata or {}
-        }
+        # Roles come from a handful of values; share one string object per role
+        message = Message(sys.intern(role), content, time.time(), metadata)
         
-        self.conversations[conversation_id]['messages'].append(message)
+        self.conversations[conversation_id].messages.append(message)
+        self._total_messages += 1
         
-        self.logger.debug('Message added to conversation', {
-            'conversation_id': conversation_id,
-            'role': role,
-            'content_length': len(content)
-        })
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Message added to conversation', {
+                'conversation_id': conversation_id,
+                'role': role,
+                'content_length': len(content)
+            })
+        
+        return True
+
+    async def add_messages(self, conversation_id: str,
+                           items: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> bool:
+        """Add several (role, content, metadata) messages to the conversation at once"""
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            self.logger.error('Conversation not found', {'conversation_id': conversation_id})
+            return False
+        
+        timestamp = time.time()
+        new_messages = [
+            Message(sys.intern(role), content, timestamp, metadata)
+            for role, content, metadata in items
+        ]
+        conversation.messages.extend(new_messages)
+        self._total_messages += len(new_messages)
+        
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Messages added to conversation', {
+                'conversation_id': conversation_id,
+                'count': len(new_messages)
+            })
         
         return True
 
@@ -93,12 +228,13 @@ class ConversationManager:
             self.logger.error('Conversation not found', {'conversation_id': conversation_id})
             return False
         
-        self.conversations[conversation_id]['context'].update(context_updates)
+        self.conversations[conversation_id].context.update(context_updates)
         
-        self.logger.debug('Conversation context updated', {
-            'conversation_id': conversation_id,
-            'updates': list(context_updates.keys())
-        })
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Conversation context updated', {
+                'conversation_id': conversation_id,
+                'updates': list(context_updates.keys())
+            })
         
         return True
 
@@ -108,106 +244,156 @@ class ConversationManager:
             self.logger.error('Conversation not found', {'conversation_id': conversation_id})
             return False
         
-        self.conversations[conversation_id]['metadata'].update(metadata_updates)
+        self.conversations[conversation_id].metadata.update(metadata_updates)
         
-        self.logger.debug('Conversation metadata updated', {
-            'conversation_id': conversation_id,
-            'updates': list(metadata_updates.keys())
-        })
+        if self.logger.is_debug_enabled():
+            self.logger.debug('Conversation metadata updated', {
+                'conversation_id': conversation_id,
+                'updates': list(metadata_updates.keys())
+            })
         
         return True
 
     async def end_conversation(self, conversation_id: str, final_data: Optional[Dict[str, Any]] = None) -> bool:
         """End a conversation"""
+        return await self._end_conversation(conversation_id, final_data, log_end=True)
+
+    async def _end_conversation(self, conversation_id: str, final_data: Optional[Dict[str, Any]], log_end: bool) -> bool:
+        """End a conversation, optionally leaving the end log line to the caller"""
         if conversation_id not in self.conversations:
             self.logger.error('Conversation not found', {'conversation_id': conversation_id})
             return False
         
         conversation = self.conversations[conversation_id]
-        conversation['end_time'] = datetime.now()
-        conversation['duration'] = (conversation['end_time'] - conversation['start_time']).total_seconds()
-        conversation['status'] = 'completed'
+        conversation.end_time = time.time()
+        conversation.duration = conversation.end_time - conversation.start_time
+        conversation.status = 'completed'
+        self._active_ids.discard(conversation_id)
+        self._completed_ids.add(conversation_id)
         
         if final_data:
-            conversation['final_data'] = final_data
+            conversation.final_data = final_data
+        
+        if self._archive:
+            await asyncio.to_thread(self._archive.save, conversation.to_dict())
+            del self.conversations[conversation_id]
+            self._cache_archived(conversation)
+        else:
+            heapq.heappush(self._completion_heap, (conversation.end_time, conversation_id))
         
         # Notify end
         if self.on_conversation_end:
             self.on_conversation_end({
                 'conversation_id': conversation_id,
                 'agent_id': self.agent_id,
-                'duration': conversation['duration'],
-                'message_count': len(conversation['messages'])
+                'duration': conversation.duration,
+                'message_count': len(conversation.messages)
             })
         
-        self.logger.info('Conversation ended', {
-            'conversation_id': conversation_id,
-            'duration': conversation['duration'],
-            'message_count': len(conversation['messages'])
-        })
+        if log_end and self.logger.is_info_enabled():
+            self.logger.info('Conversation ended', {
+                'conversation_id': conversation_id,
+                'duration': conversation.duration,
+                'message_count': len(conversation.messages)
+            })
         
         return True
 
-    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
-        """Get conversation by ID"""
-        return self.conversations.get(conversation_id)
+    def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
+        """
+        Get conversation by ID
+        Archived conversations missing from the LRU cache are read from SQLite
+        synchronously; this is a single primary-key lookup, kept blocking so the
+        accessors built on it stay synchronous
+        """
+        conversation = self.conversations.get(conversation_id)
+        if conversation is not None or not self._archive:
+            return conversation
+        
+        conversation = self._archive_cache.get(conversation_id)
+        if conversation is not None:
+            self._archive_cache.move_to_end(conversation_id)
+            return conversation
+        
+        data = self._archive.load(conversation_id)
+        if data is None:
+            return None
+        conversation = Conversation.from_dict(data)
+        self._cache_archived(conversation)
+        return conversation
 
-    def get_conversation_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+    def dump_conversation(self, conversation_id: str) -> Optional[bytes]:
+        """Get a conversation serialized as JSON bytes"""
+        conversation = self.get_conversation(conversation_id)
+        return conversation.to_json_bytes() if conversation else None
+
+    def _cache_archived(self, conversation: Conversation):
+        """Keep an archived conversation hydrated, evicting the least recently used"""
+        self._archive_cache[conversation.id] = conversation
+        self._archive_cache.move_to_end(conversation.id)
+        while len(self._archive_cache) > self.ARCHIVE_CACHE_SIZE:
+            self._archive_cache.popitem(last=False)
+
+    def get_conversation_messages(self, conversation_id: str) -> List[Message]:
         """Get messages from a conversation"""
-        conversation = self.conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return []
-        return conversation.get('messages', [])
+        return conversation.messages
 
     def get_conversation_context(self, conversation_id: str) -> Dict[str, Any]:
         """Get context from a conversation"""
-        conversation = self.conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return {}
-        return conversation.get('context', {})
+        return conversation.context
 
     def get_active_conversations(self) -> List[str]:
         """Get list of active conversation IDs"""
-        return [
-            conv_id for conv_id, conv in self.conversations.items()
-            if conv.get('status') == 'active'
-        ]
+        return list(self._active_ids)
 
     def get_conversation_stats(self) -> Dict[str, Any]:
         """Get conversation statistics"""
-        total_conversations = len(self.conversations)
-        active_conversations = len(self.get_active_conversations())
-        completed_conversations = sum(
-            1 for conv in self.conversations.values()
-            if conv.get('status') == 'completed'
-        )
-        
-        total_messages = sum(
-            len(conv.get('messages', []))
-            for conv in self.conversations.values()
-        )
+        total_conversations = len(self._active_ids) + len(self._completed_ids)
+        active_conversations = len(self._active_ids)
+        completed_conversations = len(self._completed_ids)
         
         return {
             'total_conversations': total_conversations,
             'active_conversations': active_conversations,
             'completed_conversations': completed_conversations,
-            'total_messages': total_messages,
+            'total_messages': self._total_messages,
             'agent_id': self.agent_id
         }
 
     async def cleanup_old_conversations(self, max_age_hours: int = 24):
         """Cleanup old conversations"""
-        cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
+        cutoff_time = time.time() - (max_age_hours * 3600)
+        
+        if self._archive:
+            removed_ids, removed_messages = await asyncio.to_thread(self._archive.delete_older_than, cutoff_time)
+            self._total_messages -= removed_messages
+            for conv_id in removed_ids:
+                self._completed_ids.discard(conv_id)
+                self._archive_cache.pop(conv_id, None)
+            if removed_ids:
+                self.logger.info('Cleaned up old conversations', {
+                    'removed_count': len(removed_ids),
+                    'max_age_hours': max_age_hours
+                })
+            return
         
         conversations_to_remove = []
-        for conv_id, conv in self.conversations.items():
-            if conv.get('status') == 'completed':
-                end_time = conv.get('end_time')
-                if end_time and end_time.timestamp() < cutoff_time:
-                    conversations_to_remove.append(conv_id)
+        heap = self._completion_heap
+        while heap and heap[0][0] < cutoff_time:
+            end_time, conv_id = heapq.heappop(heap)
+            conv = self.conversations.get(conv_id)
+            if conv is not None and conv.status == 'completed' and conv.end_time == end_time:
+                conversations_to_remove.append(conv_id)
         
         for conv_id in conversations_to_remove:
-            del self.conversations[conv_id]
+            self._total_messages -= len(self.conversations.pop(conv_id).messages)
+            self._completed_ids.discard(conv_id)
         
         if conversations_to_remove:
             self.logger.info('Cleaned up old conversations', {
@@ -221,7 +407,23 @@ class ConversationManager:
             'total_conversations': len(self.conversations)
         })
         
-        # End any active conversations
+        # End any active conversations together, logging once for the batch
         active_conversations = self.get_active_conversations()
-        for conv_id in active_conversations:
-            await self.end_conversation(conv_id, {'reason': 'shutdown'})
+        results = await asyncio.gather(
+            *(self._end_conversation(conv_id, {'reason': 'shutdown'}, log_end=False)
+              for conv_id in active_conversations),
+            return_exceptions=True
+        )
+        failures = [str(result) for result in results if isinstance(result, Exception)]
+        if active_conversations:
+            self.logger.info('Ended active conversations', {
+                'ended_count': len(active_conversations) - len(failures),
+                'failed_count': len(failures)
+            })
+        for failure in failures:
+            self.logger.error('Failed to end conversation on shutdown', {'error': failure})
+        
+        if self._archive:
+            # No later manager can read this owner's rows, so don't leave them behind
+            await asyncio.to_thread(self._archive.delete_all)
+            self._archive.close()
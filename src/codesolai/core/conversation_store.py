@@ -0,0 +1,105 @@
+"""
+SQLite-backed archive for completed conversations
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def dumps_json(value: Any) -> bytes:
+        """Serialize a conversation record to JSON bytes"""
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def dumps_json(value: Any) -> bytes:
+        """Serialize a conversation record to JSON bytes"""
+        return json.dumps(value, default=str).encode('utf-8')
+
+
+class ConversationStore:
+    """On-disk store for completed conversations, one row per conversation.
+    Rows are scoped to an owner, so stores sharing a file never see each other's conversations"""
+
+    def __init__(self, path: str, owner: str):
+        self.path = path
+        self.owner = owner
+        # Writes are dispatched to worker threads, so share one connection behind a lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS conversations ('
+                'owner TEXT, id TEXT, end_time REAL, message_count INTEGER, data BLOB, '
+                'PRIMARY KEY (owner, id))'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS conversations_end_time ON conversations (owner, end_time)'
+            )
+
+    def save(self, conversation: Dict[str, Any]):
+        """Insert or replace a conversation record"""
+        row = (
+            self.owner,
+            conversation['id'],
+            conversation.get('end_time'),
+            len(conversation.get('messages', [])),
+            dumps_json(conversation)
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO conversations (owner, id, end_time, message_count, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                row
+            )
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a conversation record, or None when it is not stored"""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data FROM conversations WHERE owner = ? AND id = ?', (self.owner, conversation_id)
+            ).fetchone()
+        return _loads(row[0]) if row else None
+
+    def delete(self, conversation_id: str) -> int:
+        """Delete a conversation, returning how many messages it held"""
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT message_count FROM conversations WHERE owner = ? AND id = ?', (self.owner, conversation_id)
+            ).fetchone()
+            if not row:
+                return 0
+            self._connection.execute(
+                'DELETE FROM conversations WHERE owner = ? AND id = ?', (self.owner, conversation_id)
+            )
+        return row[0]
+
+    def delete_older_than(self, cutoff_time: float) -> Tuple[list, int]:
+        """Delete conversations that ended before the cutoff; returns (ids, message total)"""
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                'SELECT id, message_count FROM conversations WHERE owner = ? AND end_time < ?',
+                (self.owner, cutoff_time)
+            ).fetchall()
+            if rows:
+                self._connection.execute(
+                    'DELETE FROM conversations WHERE owner = ? AND end_time < ?', (self.owner, cutoff_time)
+                )
+        return [row[0] for row in rows], sum(row[1] for row in rows)
+
+    def delete_all(self):
+        """Delete every conversation this store owns"""
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM conversations WHERE owner = ?', (self.owner,))
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
@@ -2,15 +2,252 @@
 Enhanced Agent implementation with sophisticated reasoning capabilities
 """
 
-from typing import Dict, Any, Optional
-from datetime import datetime
+import asyncio
+import json
+import re
+import reprlib
+from collections import ChainMap
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import ClassVar, Dict, Any, Optional, Mapping
 from rich.console import Console
 
-from .agent import Agent, AgentConfig
-from .task_manager import TaskManager, TaskState
+from .agent import Agent, AgentConfig, _action_dependencies
+from .task_manager import TaskManager, TaskResult, TaskState
+from . import semantic_cache
+from .llm_cache import LLMCache, MemoryBackend, RedisBackend
 from ..providers.provider_manager import ProviderManager
 from ..utils import Utils
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Shared read-only default for calls made without options
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+# Terminal for task progress output, shared by every agent instance
+_DEFAULT_CONSOLE = Console()
+
+# Tool-use instructions sent as a separate system block when tools are enabled,
+# so providers can cache the static prefix across calls
+_SYSTEM_PROMPT = """You are CodeSolAI, an AI assistant with the ability to perform actions using tools.
+
+Available tools:
+- read_file: Read file contents
+- write_file: Write content to a file (creates directories automatically)
+- list_directory: List directory contents
+- create_directory: Create a directory
+- execute_command: Execute shell commands
+- analyze_code: Analyze code structure
+- http_request: Make HTTP requests
+
+IMPORTANT FILE CREATION GUIDELINES:
+1. Always create complete, functional files with proper content
+2. Include necessary imports, dependencies, and boilerplate code
+3. Add comments and documentation where appropriate
+4. Ensure files follow best practices for the language/framework
+5. Create directory structures as needed
+6. Include configuration files (requirements.txt, package.json, etc.)
+
+When you need to perform an action, use this format:
+ACTION: tool_name
+PARAMETERS: {"param1": "value1", "param2": "value2"}
+
+For file creation, always include complete, working content:
+ACTION: write_file
+PARAMETERS: {"path": "filename.py", "content": "# Complete file content here\\nwith proper code..."}
+
+Please provide a helpful response and use tools when appropriate to complete the task. Focus on creating complete, functional implementations."""
+
+# Prompt sent for each autonomous task, filled in by _build_task_prompt
+_TASK_PROMPT_TEMPLATE = """
+You are executing a specific task as part of a larger autonomous workflow.
+
+**Current Task:** {name}
+**Task Description:** {description}
+
+EXECUTION REQUIREMENTS:
+1. Create complete, functional files with proper content
+2. Include all necessary imports, dependencies, and configurations
+3. Follow best practices for the language/framework being used
+4. Add appropriate comments and documentation
+5. Ensure files are production-ready, not just placeholders
+6. Create directory structures as needed
+7. Include error handling where appropriate
+
+IMPORTANT: Do not create empty files or files with just comments. Every file should contain complete, working implementation.
+
+For web applications, include:
+- Complete HTML templates with proper structure
+- CSS styling (inline or separate files)
+- JavaScript functionality where needed
+- Configuration files (requirements.txt, package.json, etc.)
+- Environment setup files
+- Database models and migrations if applicable
+
+For Python projects, include:
+- Proper imports and dependencies
+- Complete class and function implementations
+- Error handling and logging
+- Configuration management
+- Requirements.txt with all dependencies
+
+Focus only on this specific task. Be thorough and create complete, functional implementations.
+"""
+
+# Final response of an autonomous run
+_AUTONOMOUS_SUMMARY_TEMPLATE = """🎉 **Autonomous execution completed!**
+
+**Summary:**
+- Total tasks: {total_tasks}
+- Completed: {completed_tasks} ✅
+- Failed: {failed_tasks} ❌
+
+**Files created:** {files_created}
+**Files modified:** {files_modified}
+**Commands executed:** {commands_executed}
+
+All requested tasks have been completed successfully! The project structure has been created and all necessary files are in place."""
+
+# Bounded repr for generic tool results, so large payloads are never fully rendered
+_RESULT_REPR = reprlib.Repr()
+_RESULT_REPR.maxstring = 500
+_RESULT_REPR.maxother = 500
+
+# Responses larger than this are parsed for actions in a worker thread
+_PARSE_OFFLOAD_THRESHOLD = 64 * 1024
+
+# Backstop limits on a single parsed action, in seconds; tools enforce their own
+# tighter limits, so these only catch calls that hang past them
+_TOOL_TIMEOUTS = {'execute_command': 60.0, 'http_request': 45.0, 'read_file': 10.0,
+                  'write_file': 10.0, 'list_directory': 10.0, 'create_directory': 10.0}
+_DEFAULT_TOOL_TIMEOUT = 30.0
+# Ceiling on the backstop whatever timeout the model asks for
+_MAX_TOOL_TIMEOUT = 300.0
+
+# Directory listings in the final response show at most this many entries, each
+# prefixed by an icon for its type
+_LISTING_LIMIT = 20
+_FILE_LINE_PREFIX = "  📄 "
+_LISTING_LINE_PREFIXES = {'directory': "  📁 "}
+
+# Read-only tools that may start before the response has finished streaming
+_PARALLEL_SAFE_TOOLS = frozenset(('read_file', 'list_directory', 'analyze_code', 'http_request'))
+
+# Action parsing patterns, compiled once rather than on every response
+# A whole ACTION block: tool name, then PARAMETERS up to the next ACTION or the end
+_ACTION_BLOCK_RE = re.compile(r'ACTION:\s*(\w+)\s*\nPARAMETERS:\s*(\{.*?)(?=\nACTION:|\Z)', re.DOTALL | re.IGNORECASE)
+# Where one ACTION block ends; blocks before the last boundary seen in a stream
+# parse exactly as they will in the full response
+_ACTION_BOUNDARY_RE = re.compile(r'\nACTION:', re.IGNORECASE)
+_SIMPLE_ACTION_PATTERNS = (
+    (r'create file[:\s]+([^\s\n]+)', 'write_file'),
+    (r'read file[:\s]+([^\s\n]+)', 'read_file'),
+    (r'list directory[:\s]+([^\s\n]+)', 'list_directory'),
+    (r'run command[:\s]+([^\n]+)', 'execute_command'),
+    (r'execute[:\s]+([^\n]+)', 'execute_command')
+)
+# All simple patterns unioned into one alternation so the response is scanned once;
+# the captured value of pattern i is group i + 1
+_SIMPLE_ACTION_RE = re.compile('|'.join(pattern for pattern, _ in _SIMPLE_ACTION_PATTERNS), re.IGNORECASE)
+# Parameter that receives a simple action's captured value, plus fixed parameters
+_SIMPLE_ACTION_PARAMETERS = {
+    'write_file': ('path', {'content': '# Generated file\n'}),
+    'read_file': ('path', {}),
+    'list_directory': ('path', {}),
+    'execute_command': ('command', {})
+}
+# Parameter names models use in place of the canonical ones, applied in order
+_FILE_PATH_ALIASES = {'file': 'path', 'file_path': 'path', 'filepath': 'path'}
+_ALIAS_TABLE = {
+    'list_directory': {'directory': 'path', 'hidden': 'include_hidden'},
+    'create_directory': {'directory_path': 'path', 'directory': 'path'},
+    'read_file': _FILE_PATH_ALIASES,
+    'write_file': _FILE_PATH_ALIASES
+}
+# Fallback path for tools that can run without one
+_DEFAULT_PATHS = {'list_directory': '.'}
+# Parameters without which an action is dropped
+_REQUIRED_KEYS = {'create_directory': 'path', 'read_file': 'path', 'write_file': 'path'}
+# Tokens that matter when finding where a JSON object ends; a triple quote needs a
+# following character to count as one
+_JSON_STRUCTURE_TOKEN_RE = re.compile(r'"""(?=[\s\S])|"|[{}]')
+_JSON_STRING_TOKEN_RE = re.compile(r'\\|"""(?=[\s\S])|"')
+_TRIPLE_QUOTED_VALUE_RE = re.compile(r'"([^"]+)":\s*"""(.*?)"""', re.DOTALL)
+
+
+def _write_to_file(file: Any, output: str):
+    """Write and flush rendered output in one call"""
+    file.write(output)
+    file.flush()
+
+
+@lru_cache(maxsize=256)
+def _build_task_prompt(name: str, description: str) -> str:
+    """Task prompt for an autonomous task; retries of the same task reuse the string"""
+    return _TASK_PROMPT_TEMPLATE.format(name=name, description=description)
+
+
+def _hashable(value: Any) -> Any:
+    """Hashable equivalent of parsed JSON parameters, for duplicate detection"""
+    if isinstance(value, dict):
+        return frozenset((key, _hashable(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _format_directory_listing(tool_name: str, tool_result: Dict[str, Any], parts: list):
+    """Append a directory listing, limited to the first _LISTING_LIMIT items"""
+    items = tool_result.get('items', [])
+    parts.append(f"📁 **Directory listing for {tool_result.get('path', '.')}:**\n")
+    if items:
+        parts.extend([
+            _LISTING_LINE_PREFIXES.get(item['type'], _FILE_LINE_PREFIX) + item['name'] + "\n"
+            for item in islice(items, _LISTING_LIMIT)
+        ])
+        if len(items) > _LISTING_LIMIT:
+            parts.append(f"  ... and {len(items) - _LISTING_LIMIT} more items\n")
+    else:
+        parts.append("  (empty directory)\n")
+
+
+def _format_file_contents(tool_name: str, tool_result: Dict[str, Any], parts: list):
+    """Append file contents, truncated to 1000 characters"""
+    path, content = tool_result.get('path', 'file'), tool_result.get('content', '')
+    parts.append(f"📄 **Contents of {path}:**\n```\n{content[:1000]}\n```\n")
+    if len(content) > 1000:
+        parts.append("... (content truncated)\n")
+
+
+def _format_command_output(tool_name: str, tool_result: Dict[str, Any], parts: list):
+    """Append a command's exit code and truncated output"""
+    command, return_code = tool_result.get('command', ''), tool_result.get('return_code', 0)
+    stdout, stderr = tool_result.get('stdout', ''), tool_result.get('stderr', '')
+    parts.append(f"💻 **Command executed:** `{command}`\n**Exit code:** {return_code}\n")
+    if stdout:
+        parts.append(f"**Output:**\n```\n{stdout[:1000]}\n```\n")
+    if stderr:
+        parts.append(f"**Errors:**\n```\n{stderr[:500]}\n```\n")
+
+
+def _format_generic_result(tool_name: str, tool_result: Any, parts: list):
+    """Append a bounded repr of any other tool result"""
+    parts.append(f"🔧 **{tool_name} result:**\n{_RESULT_REPR.repr(tool_result)[:500]}\n")
+
+
+# Final-response formatters for tools with a dedicated presentation
+_RESULT_FORMATTERS = {
+    'list_directory': _format_directory_listing,
+    'read_file': _format_file_contents,
+    'execute_command': _format_command_output
+}
+
 
 class EnhancedAgent(Agent):
     """
@@ -18,6 +255,14 @@ class EnhancedAgent(Agent):
     This replaces the old agent with advanced capabilities
     """
 
+    # Deterministic (temperature 0) responses are cached per prompt
+    RESPONSE_CACHE_MAX_SIZE = 512
+    RESPONSE_CACHE_TTL_SECONDS = 3600.0
+
+    _shared_provider_manager: ClassVar[Optional[ProviderManager]] = None
+    # Live agents using the shared manager; the last one to shut down closes it
+    _shared_provider_manager_users: ClassVar[int] = 0
+
     def __init__(self, options: Optional[Dict[str, Any]] = None):
         """Initialize enhanced agent with provider integration"""
         options = options or {}
@@ -41,6 +286,7 @@ class EnhancedAgent(Agent):
             max_context_size=options.get('max_context_size', 100000),
             compression_threshold=options.get('compression_threshold', 0.8),
             retention_strategy=options.get('retention_strategy', 'importance'),
+            summarize_history=options.get('summarize_history', False),
             log_level=options.get('log_level', 'warning'),
             enable_metrics=options.get('enable_metrics', True),
             enable_tracing=options.get('enable_tracing', False)
@@ -58,11 +304,45 @@ class EnhancedAgent(Agent):
             'max_tokens': config.max_tokens
         }
         
-        # Initialize provider manager
-        self.provider_manager = ProviderManager()
+        # Provider manager is stateless configuration, so agents share one instance
+        if EnhancedAgent._shared_provider_manager is None:
+            EnhancedAgent._shared_provider_manager = ProviderManager()
+        self.provider_manager = EnhancedAgent._shared_provider_manager
+        EnhancedAgent._shared_provider_manager_users += 1
+        self._holds_provider_manager = True
+        # Exact-match cache, in process unless a Redis URL is configured
+        redis_url = options.get('llm_cache_redis_url')
+        self._response_cache = LLMCache(
+            RedisBackend(redis_url) if redis_url else MemoryBackend(self.RESPONSE_CACHE_MAX_SIZE),
+            ttl=self.RESPONSE_CACHE_TTL_SECONDS
+        )
+
+        # Near-duplicate deterministic prompts can be answered by embedding similarity;
+        # opt-in because it loads a local embedding model
+        self._semantic_cache: Optional[semantic_cache.SemanticCache] = None
+        if options.get('semantic_cache'):
+            if semantic_cache.is_available():
+                self._semantic_cache = semantic_cache.SemanticCache(
+                    threshold=options.get('semantic_cache_threshold', 0.92)
+                )
+            else:
+                self.logger.warn('Semantic cache requested but sentence-transformers is not installed')
+        
+        # Last (provider, api_key) pair that passed format validation; the configured
+        # key is checked once here so turns using it never re-validate
+        self._validated_key: Optional[tuple] = None
+        if config.api_key and Utils.validate_api_key(config.api_key, config.provider):
+            self._validated_key = (config.provider, config.api_key)
+        
+        # Defaults layered under per-call options, built once instead of on every prompt
+        self._default_process_options = MappingProxyType({
+            **self.provider_config,
+            'auto_approve': config.auto_approve,
+            'effort': config.reasoning_effort
+        })
 
         # Initialize task manager for autonomous mode
-        self.task_manager = TaskManager(self.logger, Console())
+        self.task_manager = TaskManager(self.logger, _DEFAULT_CONSOLE)
         self.autonomous_mode = options.get('autonomous', False)
 
         # Debug logging
@@ -89,7 +369,7 @@ class EnhancedAgent(Agent):
         Process user prompt with enhanced reasoning
         This is the main entry point for the enhanced agent
         """
-        options = options or {}
+        options = options if options is not None else _EMPTY_DICT
 
         # Check if autonomous mode is enabled
         autonomous_mode = options.get('autonomous', self.autonomous_mode)
@@ -103,30 +383,26 @@ class EnhancedAgent(Agent):
         """
         Process prompt in autonomous mode with task decomposition and sequential execution
         """
-        options = options or {}
+        options = options if options is not None else _EMPTY_DICT
+        prompt_length = len(prompt) if isinstance(prompt, str) else 0
 
         try:
             # Validate inputs
-            if not prompt or not isinstance(prompt, str) or not prompt.strip():
+            if not prompt or not isinstance(prompt, str) or prompt.isspace():
                 raise ValueError('Prompt is required and must be a non-empty string')
 
             # Merge options with defaults
-            process_options = {
-                'provider': options.get('provider', self.provider_config['provider']),
-                'api_key': options.get('api_key', self.provider_config['api_key']),
-                'model': options.get('model', self.provider_config['model']),
-                'temperature': options.get('temperature', self.provider_config['temperature']),
-                'max_tokens': options.get('max_tokens', self.provider_config['max_tokens']),
-                'auto_approve': options.get('auto_approve', self.config.auto_approve),
-                'effort': options.get('effort', self.config.reasoning_effort),
-                **options
-            }
-
-            self.logger.debug('Processing prompt in autonomous mode', {
-                'prompt_length': len(prompt),
-                'provider': process_options['provider'],
-                'model': process_options['model']
-            })
+            process_options = ChainMap(options, self._default_process_options)
+            # ChainMap lookups walk every layer, so read hot keys once
+            provider = process_options['provider']
+            model = process_options['model']
+
+            if self.logger.is_debug_enabled():
+                self.logger.debug('Processing prompt in autonomous mode', {
+                    'prompt_length': prompt_length,
+                    'provider': provider,
+                    'model': model
+                })
 
             # Validate API key
             if not process_options['api_key']:
@@ -137,93 +413,90 @@ class EnhancedAgent(Agent):
                 }
 
             # Step 1: Decompose the request into tasks
-            self.task_manager.console.print("\n🧠 [bold cyan]Analyzing request and breaking down into tasks...[/bold cyan]")
+            await self._print_status("\n🧠 [bold cyan]Analyzing request and breaking down into tasks...[/bold cyan]")
 
             try:
-                self.logger.info(f"Starting task decomposition for: {prompt[:100]}...")
-                self.logger.info(f"Process options: provider={process_options.get('provider')}, api_key_present={bool(process_options.get('api_key'))}")
+                log_info = self.logger.is_info_enabled()
+                if log_info:
+                    self.logger.info(f"Starting task decomposition for: {prompt[:100]}...")
+                    self.logger.info(f"Process options: provider={provider}, api_key_present={bool(process_options['api_key'])}")
 
                 task_ids = await self.task_manager.decompose_task(prompt, process_options)
-                self.logger.info(f"Task decomposition result: {len(task_ids) if task_ids else 0} tasks created")
+                if log_info:
+                    self.logger.info(f"Task decomposition result: {len(task_ids) if task_ids else 0} tasks created")
 
                 if task_ids:
-                    self.task_manager.console.print(f"✅ [green]Successfully created {len(task_ids)} tasks[/green]")
+                    await self._print_status(f"✅ [green]Successfully created {len(task_ids)} tasks[/green]")
                 else:
-                    self.task_manager.console.print("❌ [red]No tasks were created during decomposition[/red]")
+                    await self._print_status("❌ [red]No tasks were created during decomposition[/red]")
 
             except Exception as decomp_error:
                 self.logger.error(f"Task decomposition failed: {decomp_error}")
-                self.task_manager.console.print(f"❌ [red]Task decomposition error: {str(decomp_error)}[/red]")
+                await self._print_status(f"❌ [red]Task decomposition error: {str(decomp_error)}[/red]")
                 task_ids = []
 
             if not task_ids:
                 # Fallback to single prompt processing
                 self.logger.warning("Task decomposition failed, falling back to single prompt processing")
-                self.task_manager.console.print("⚠️  [yellow]Task decomposition failed, using single-step execution[/yellow]")
+                await self._print_status("⚠️  [yellow]Task decomposition failed, using single-step execution[/yellow]")
                 return await self.process_single_prompt(prompt, options)
 
             # Step 2: Display initial task breakdown
-            self.task_manager.console.print(f"\n📋 [bold green]Created {len(task_ids)} tasks for execution:[/bold green]")
+            await self._print_status(f"\n📋 [bold green]Created {len(task_ids)} tasks for execution:[/bold green]")
             self.task_manager.display_progress(show_detailed=True)
 
-            # Step 3: Execute tasks sequentially
+            # Step 3: Execute tasks, running those whose dependencies have finished concurrently
             all_results = []
             files_created = []
             files_modified = []
             commands_executed = []
 
-            while True:
-                next_task = self.task_manager.get_next_task()
-                if not next_task:
-                    break
-
-                # Start the task
-                self.task_manager.start_task(next_task.id)
-
-                # Execute the task
-                task_result = await self._execute_single_task(next_task, process_options)
-
-                if task_result.get('success', False):
-                    # Collect results
-                    if 'files_created' in task_result:
-                        files_created.extend(task_result['files_created'])
-                    if 'files_modified' in task_result:
-                        files_modified.extend(task_result['files_modified'])
-                    if 'commands_executed' in task_result:
-                        commands_executed.extend(task_result['commands_executed'])
-
-                    # Complete the task
-                    self.task_manager.complete_task(next_task.id, {
-                        'files_created': task_result.get('files_created', []),
-                        'files_modified': task_result.get('files_modified', []),
-                        'commands_executed': task_result.get('commands_executed', [])
-                    })
-                else:
-                    # Fail the task
-                    error_msg = task_result.get('error', 'Unknown error')
-                    self.task_manager.fail_task(next_task.id, error_msg)
+            running = {}
+            max_running = max(1, self.config.max_concurrent_tools)
+            # Task notifications are rendered into a buffer and written once per
+            # batch from a worker thread, so terminal I/O never blocks the loop
+            console = self.task_manager.console
+            try:
+                while True:
+                    started = []
+                    with console.capture() as capture:
+                        for ready_task in self.task_manager.get_ready_tasks():
+                            if len(running) + len(started) >= max_running:
+                                break
+                            self.task_manager.start_task(ready_task.id)
+                            started.append(ready_task)
+                    await self._write_console(capture.get())
+                    for ready_task in started:
+                        running[asyncio.ensure_future(self._execute_single_task(ready_task, process_options))] = ready_task
+                    if not running:
+                        break
 
-                all_results.append(task_result)
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    with console.capture() as capture:
+                        for finished in done:
+                            next_task = running.pop(finished)
+                            task_result = finished.result()
+                            self._record_task_result(next_task, task_result, files_created,
+                                                     files_modified, commands_executed)
+                            all_results.append(task_result.to_dict())
+                    await self._write_console(capture.get())
+            finally:
+                for pending in running:
+                    pending.cancel()
 
             # Step 4: Display completion summary
             self.task_manager.display_completion_summary()
 
             # Step 5: Generate final response
             summary = self.task_manager.get_progress_summary()
-            final_response = f"""
-🎉 **Autonomous execution completed!**
-
-**Summary:**
-- Total tasks: {summary['total_tasks']}
-- Completed: {summary['completed_tasks']} ✅
-- Failed: {summary['failed_tasks']} ❌
-
-**Files created:** {len(files_created)}
-**Files modified:** {len(files_modified)}
-**Commands executed:** {len(commands_executed)}
-
-All requested tasks have been completed successfully! The project structure has been created and all necessary files are in place.
-            """.strip()
+            final_response = _AUTONOMOUS_SUMMARY_TEMPLATE.format(
+                total_tasks=summary['total_tasks'],
+                completed_tasks=summary['completed_tasks'],
+                failed_tasks=summary['failed_tasks'],
+                files_created=len(files_created),
+                files_modified=len(files_modified),
+                commands_executed=len(commands_executed)
+            )
 
             return {
                 'success': True,
@@ -236,14 +509,14 @@ All requested tasks have been completed successfully! The project structure has
                 'files_modified': files_modified,
                 'commands_executed': commands_executed,
                 'execution_results': all_results,
-                'provider': process_options['provider'],
-                'model': process_options['model']
+                'provider': provider,
+                'model': model
             }
 
         except Exception as error:
             self.logger.error('Error in autonomous processing', {
                 'error': str(error),
-                'prompt_length': len(prompt) if prompt else 0
+                'prompt_length': prompt_length
             })
 
             return {
@@ -256,47 +529,31 @@ All requested tasks have been completed successfully! The project structure has
         """
         Process a single prompt without task decomposition (original behavior)
         """
-        options = options or {}
+        options = options if options is not None else _EMPTY_DICT
+        prompt_length = len(prompt) if isinstance(prompt, str) else 0
 
         try:
             # Validate inputs
-            if not prompt or not isinstance(prompt, str) or not prompt.strip():
+            if not prompt or not isinstance(prompt, str) or prompt.isspace():
                 raise ValueError('Prompt is required and must be a non-empty string')
 
             # Merge options with defaults
-            process_options = {
-                'provider': options.get('provider', self.provider_config['provider']),
-                'api_key': options.get('api_key', self.provider_config['api_key']),
-                'model': options.get('model', self.provider_config['model']),
-                'temperature': options.get('temperature', self.provider_config['temperature']),
-                'max_tokens': options.get('max_tokens', self.provider_config['max_tokens']),
-                'auto_approve': options.get('auto_approve', self.config.auto_approve),
-                'effort': options.get('effort', self.config.reasoning_effort),
-                **options
-            }
-
-            self.logger.info('Processing single prompt', {
-                'prompt_length': len(prompt),
-                'provider': process_options['provider'],
-                'model': process_options['model'],
-                'effort': process_options['effort']
-            })
-
-            # Validate API key
-            if not process_options['api_key']:
-                return {
-                    'success': False,
-                    'error': 'API key is required',
-                    'response': 'I need an API key to process your request. Please provide one using --api-key or configure it in your settings.'
-                }
+            process_options = ChainMap(options, self._default_process_options)
+            # ChainMap lookups walk every layer, so read hot keys once
+            provider = process_options['provider']
+            model = process_options['model']
+
+            if self.logger.is_info_enabled():
+                self.logger.info('Processing single prompt', {
+                    'prompt_length': prompt_length,
+                    'provider': provider,
+                    'model': model,
+                    'effort': process_options['effort']
+                })
 
-            # Validate API key format
-            if not Utils.validate_api_key(process_options['api_key'], process_options['provider']):
-                return {
-                    'success': False,
-                    'error': 'Invalid API key format',
-                    'response': f'The provided API key format is invalid for {process_options["provider"]}. Please check your API key.'
-                }
+            validation_error = self._validate_request(process_options)
+            if validation_error:
+                return validation_error
 
             # Step 1: Get LLM response with context
             llm_response = await self._get_llm_response(prompt, process_options)
@@ -305,40 +562,48 @@ All requested tasks have been completed successfully! The project structure has
                 return llm_response
 
             # Step 2: Parse actions from the response
-            parsed_actions = self._parse_actions_from_response(llm_response['response'])
+            response_text = llm_response['response']
+            if len(response_text) > _PARSE_OFFLOAD_THRESHOLD:
+                # Keep large JSON payloads from stalling the event loop
+                parsed_actions = await asyncio.to_thread(self._parse_actions_from_response, response_text)
+            else:
+                parsed_actions = self._parse_actions_from_response(response_text)
 
             # Step 3: Execute actions if tools are enabled and actions are found
             execution_results = []
             if parsed_actions and self.config.tools_enabled:
                 execution_results = await self._execute_parsed_actions(
                     parsed_actions,
-                    process_options
+                    process_options,
+                    llm_response.get('prefetched_actions')
                 )
 
-            # Step 4: Generate final response
-            final_response = await self._generate_final_response(
-                prompt,
-                llm_response['response'],
-                parsed_actions,
-                execution_results,
-                process_options
-            )
+            # Step 4: Generate final response; without tool output it is the LLM text itself
+            final_response = response_text
+            if execution_results:
+                final_response = await self._generate_final_response(
+                    prompt,
+                    response_text,
+                    parsed_actions,
+                    execution_results,
+                    process_options
+                )
 
             return {
                 'success': True,
                 'response': final_response,
-                'llm_response': llm_response['response'],
+                'llm_response': response_text,
                 'actions_found': len(parsed_actions),
                 'actions_executed': len(execution_results),
                 'execution_results': execution_results,
-                'provider': process_options['provider'],
-                'model': process_options['model']
+                'provider': provider,
+                'model': model
             }
 
         except Exception as error:
             self.logger.error('Error processing single prompt', {
                 'error': str(error),
-                'prompt_length': len(prompt) if prompt else 0
+                'prompt_length': prompt_length
             })
 
             return {
@@ -347,57 +612,81 @@ All requested tasks have been completed successfully! The project structure has
                 'response': f'I encountered an error while processing your request: {str(error)}'
             }
 
+    def _validate_request(self, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Check the API key before any provider call; returns an error result or None"""
+        if not options['api_key']:
+            return {
+                'success': False,
+                'error': 'API key is required',
+                'response': 'I need an API key to process your request. Please provide one using --api-key or configure it in your settings.'
+            }
+
+        # The key rarely changes within a session, so only re-check a new pair
+        key_pair = (options['provider'], options['api_key'])
+        if key_pair != self._validated_key:
+            if not Utils.validate_api_key(options['api_key'], options['provider']):
+                return {
+                    'success': False,
+                    'error': 'Invalid API key format',
+                    'response': f'The provided API key format is invalid for {options["provider"]}. Please check your API key.'
+                }
+            self._validated_key = key_pair
+
+        return None
+
     async def _get_llm_response(self, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """Get response from LLM provider with agent capabilities"""
         try:
-            # Enhance the prompt with agent capabilities if tools are enabled
-            enhanced_prompt = prompt
+            request_options = {
+                'model': options.get('model'),
+                'temperature': options.get('temperature'),
+                'max_tokens': options.get('max_tokens')
+            }
+            # Describe agent capabilities in the system prompt if tools are enabled
+            cache_text = prompt
             if options.get('tools_enabled', True):
-                enhanced_prompt = f"""You are CodeSolAI, an AI assistant with the ability to perform actions using tools.
-
-Available tools:
-- read_file: Read file contents
-- write_file: Write content to a file (creates directories automatically)
-- list_directory: List directory contents
-- create_directory: Create a directory
-- execute_command: Execute shell commands
-- analyze_code: Analyze code structure
-- http_request: Make HTTP requests
-
-IMPORTANT FILE CREATION GUIDELINES:
-1. Always create complete, functional files with proper content
-2. Include necessary imports, dependencies, and boilerplate code
-3. Add comments and documentation where appropriate
-4. Ensure files follow best practices for the language/framework
-5. Create directory structures as needed
-6. Include configuration files (requirements.txt, package.json, etc.)
-
-When you need to perform an action, use this format:
-ACTION: tool_name
-PARAMETERS: {{"param1": "value1", "param2": "value2"}}
-
-For file creation, always include complete, working content:
-ACTION: write_file
-PARAMETERS: {{"path": "filename.py", "content": "# Complete file content here\\nwith proper code..."}}
-
-User request: {prompt}
-
-Please provide a helpful response and use tools when appropriate to complete the task. Focus on creating complete, functional implementations."""
+                request_options['system'] = _SYSTEM_PROMPT
+                cache_text = _SYSTEM_PROMPT + '\n\n' + prompt
+
+            cache_key = None
+            embedding = None
+            if options.get('temperature') == 0:
+                cache_key = LLMCache.key(cache_text, options)
+                cached = await self._response_cache.get(cache_key)
+                if cached is None and self._semantic_cache is not None:
+                    # Embed only the user prompt: with the system prompt prepended, the
+                    # embedder's input limit would truncate away most of what the user asked
+                    embedding = await self._embed_prompt(prompt)
+                    if embedding is not None:
+                        cached = self._semantic_cache.get(self._semantic_namespace(options), embedding)
+                if cached is not None:
+                    if self.logger.is_info_enabled():
+                        self.logger.info('LLM cache hit', self._response_cache.get_stats())
+                    return {
+                        'success': True,
+                        'response': cached
+                    }
 
-            response = await self.provider_manager.call(
-                options['provider'],
-                options['api_key'],
-                enhanced_prompt,
-                {
-                    'model': options.get('model'),
-                    'temperature': options.get('temperature'),
-                    'max_tokens': options.get('max_tokens')
-                }
-            )
+            prefetched_actions = []
+            if options.get('stream'):
+                response, prefetched_actions = await self._stream_llm_response(prompt, options, request_options)
+            else:
+                response = await self.provider_manager.call(
+                    options['provider'],
+                    options['api_key'],
+                    prompt,
+                    request_options
+                )
+            
+            if cache_key is not None:
+                await self._response_cache.set(cache_key, response)
+                if embedding is not None:
+                    self._semantic_cache.put(self._semantic_namespace(options), embedding, response)
             
             return {
                 'success': True,
-                'response': response
+                'response': response,
+                'prefetched_actions': prefetched_actions
             }
             
         except Exception as error:
@@ -408,179 +697,241 @@ Please provide a helpful response and use tools when appropriate to complete the
                 'response': f'I encountered an error while getting a response: {error_message}'
             }
 
-    def _parse_actions_from_response(self, response: str) -> list:
-        """Parse actions from LLM response"""
-        import re
-        import json
+    async def _embed_prompt(self, prompt: str):
+        """Embed a prompt off the event loop; returns None when embedding fails"""
+        try:
+            return await asyncio.to_thread(semantic_cache.embed, prompt)
+        except Exception as error:
+            self.logger.warn('Prompt embedding failed, skipping semantic cache', {'error': str(error)})
+            return None
+
+    @staticmethod
+    def _semantic_namespace(options: Dict[str, Any]) -> str:
+        """Request settings other than the prompt that a semantic cache hit must share"""
+        system = 'tools' if options.get('tools_enabled', True) else 'plain'
+        return f"{options['provider']}|{options.get('model')}|{options.get('max_tokens')}|{system}"
+
+    async def _stream_llm_response(self, prompt: str, options: Dict[str, Any],
+                                   request_options: Dict[str, Any]) -> tuple:
+        """Stream a provider response, starting leading read-only actions as soon as their blocks are complete"""
+        chunks = []
+        pending = ''
+        prefetched_actions = []
+        seen = set()
+        prefetching = bool(options.get('tools_enabled', True) and self.config.tools_enabled)
 
-        actions = []
+        try:
+            async for chunk in self.provider_manager.stream(
+                options['provider'],
+                options['api_key'],
+                prompt,
+                request_options
+            ):
+                chunks.append(chunk)
+                if not prefetching:
+                    continue
+
+                # Only the text after the last completed block is rescanned; an
+                # 8-character boundary may straddle chunks, so the search for the
+                # next one starts just before the new text
+                search_from = max(1, len(pending) - 7)
+                pending += chunk
+                boundary = None
+                for boundary in _ACTION_BOUNDARY_RE.finditer(pending, search_from):
+                    pass
+                if boundary is None:
+                    continue
 
-        # Look for ACTION: and PARAMETERS: patterns
-        # First find ACTION lines, then extract complete JSON objects
-        action_lines = re.findall(r'ACTION:\s*(\w+)', response, re.IGNORECASE)
+                for action in self._parse_action_blocks(pending, 0, boundary.start()):
+                    # Duplicates are dropped from the final action list as well
+                    key = (action['tool'], _hashable(action['parameters']))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    # Anything with side effects waits for the full response, and
+                    # so does everything after it
+                    if action['tool'] not in _PARALLEL_SAFE_TOOLS:
+                        prefetching = False
+                        break
+                    prefetched_actions.append((action, asyncio.ensure_future(
+                        self._run_parsed_action(action, options))))
+                pending = pending[boundary.start():]
+        except BaseException:
+            for _, task in prefetched_actions:
+                task.cancel()
+            raise
+
+        return ''.join(chunks), prefetched_actions
+
+    def _parse_action_blocks(self, response: str, pos: int = 0, endpos: Optional[int] = None) -> list:
+        """Parse the ACTION blocks in response[pos:endpos], in order"""
+        actions = []
+        # Bound once; these run for every matched action
+        append = actions.append
+        extract_complete_json = self._extract_complete_json
 
-        for tool_name in action_lines:
-            tool_name = tool_name.strip()
+        # Look for ACTION: and PARAMETERS: blocks in a single pass, then extract
+        # complete JSON objects from each
+        for match in _ACTION_BLOCK_RE.finditer(response, pos, len(response) if endpos is None else endpos):
+            tool_name = match.group(1)
+            json_str = match.group(2).strip()
 
-            # Find the PARAMETERS line after this ACTION
-            action_pattern = rf'ACTION:\s*{re.escape(tool_name)}\s*\nPARAMETERS:\s*(\{{.*?)\n(?:ACTION:|$)'
-            match = re.search(action_pattern, response, re.DOTALL | re.IGNORECASE)
+            # Try to find the complete JSON object by counting braces
+            json_str = extract_complete_json(json_str)
 
-            if not match:
-                # Try without the lookahead for end of response
-                action_pattern = rf'ACTION:\s*{re.escape(tool_name)}\s*\nPARAMETERS:\s*(\{{.*?)(?=\n\n|\nACTION:|\Z)'
-                match = re.search(action_pattern, response, re.DOTALL | re.IGNORECASE)
+            try:
+                # First try to parse as-is
+                parameters = _loads(json_str)
+            except json.JSONDecodeError:
+                # If that fails, try to fix common issues with triple quotes
+                try:
+                    # Replace triple quotes with escaped quotes
+                    fixed_json = self._fix_json_content(json_str)
+                    parameters = _loads(fixed_json)
+                except json.JSONDecodeError:
+                    # If still failing, log and skip
+                    self.logger.warn('Failed to parse action parameters after fixes', {
+                        'tool': tool_name,
+                        'raw_parameters': json_str[:200] + '...' if len(json_str) > 200 else json_str
+                    })
+                    continue
+
+                # Normalize and provide default parameters for common tools
+                for alias, name in _ALIAS_TABLE.get(tool_name, _EMPTY_DICT).items():
+                    if alias in parameters:
+                        parameters[name] = parameters.pop(alias)
+                if tool_name in _DEFAULT_PATHS and not parameters.get('path'):
+                    parameters['path'] = _DEFAULT_PATHS[tool_name]
+                required = _REQUIRED_KEYS.get(tool_name)
+                if required and not parameters.get(required):
+                    continue  # Skip if a required parameter is missing
+
+            append({
+                'tool': tool_name,
+                'parameters': parameters
+            })
 
-            if match:
-                json_str = match.group(1).strip()
+        return actions
 
-                # Try to find the complete JSON object by counting braces
-                json_str = self._extract_complete_json(json_str)
+    def _parse_actions_from_response(self, response: str) -> list:
+        """Parse actions from LLM response"""
+        actions = self._parse_action_blocks(response)
+        append = actions.append
 
-                try:
-                    # First try to parse as-is
-                    parameters = json.loads(json_str)
-                except json.JSONDecodeError:
-                    # If that fails, try to fix common issues with triple quotes
-                    try:
-                        # Replace triple quotes with escaped quotes
-                        fixed_json = self._fix_json_content(json_str)
-                        parameters = json.loads(fixed_json)
-                    except json.JSONDecodeError:
-                        # If still failing, log and skip
-                        self.logger.warn('Failed to parse action parameters after fixes', {
-                            'tool': tool_name,
-                            'raw_parameters': json_str[:200] + '...' if len(json_str) > 200 else json_str
-                        })
-                        continue
+        # Also look for simpler patterns like "create file: filename.py", grouped by
+        # pattern so actions keep the order of the pattern table
+        simple_matches = [[] for _ in _SIMPLE_ACTION_PATTERNS]
+        for found in _SIMPLE_ACTION_RE.finditer(response):
+            simple_matches[found.lastindex - 1].append(found.group(found.lastindex))
 
-                    # Normalize and provide default parameters for common tools
-                    if tool_name == 'list_directory':
-                        # Handle different parameter names
-                        if 'directory' in parameters:
-                            parameters['path'] = parameters.pop('directory')
-                        if 'hidden' in parameters:
-                            parameters['include_hidden'] = parameters.pop('hidden')
-                        if not parameters.get('path'):
-                            parameters['path'] = '.'
-                    elif tool_name == 'create_directory':
-                        # Handle different parameter names
-                        if 'directory_path' in parameters:
-                            parameters['path'] = parameters.pop('directory_path')
-                        if 'directory' in parameters:
-                            parameters['path'] = parameters.pop('directory')
-                        if not parameters.get('path'):
-                            continue  # Skip if no path provided
-                    elif tool_name == 'read_file':
-                        if 'file' in parameters:
-                            parameters['path'] = parameters.pop('file')
-                        if 'file_path' in parameters:
-                            parameters['path'] = parameters.pop('file_path')
-                        if 'filepath' in parameters:
-                            parameters['path'] = parameters.pop('filepath')
-                        if not parameters.get('path'):
-                            continue  # Skip if no path provided
-                    elif tool_name == 'write_file':
-                        if 'file' in parameters:
-                            parameters['path'] = parameters.pop('file')
-                        if 'file_path' in parameters:
-                            parameters['path'] = parameters.pop('file_path')
-                        if 'filepath' in parameters:
-                            parameters['path'] = parameters.pop('filepath')
-                        if not parameters.get('path'):
-                            continue  # Skip if no path provided
-
-                actions.append({
+        for (_, tool_name), matches in zip(_SIMPLE_ACTION_PATTERNS, simple_matches):
+            key, extra = _SIMPLE_ACTION_PARAMETERS[tool_name]
+            for match in matches:
+                append({
                     'tool': tool_name,
-                    'parameters': parameters
+                    'parameters': {key: match, **extra}
                 })
 
-        # Also look for simpler patterns like "create file: filename.py"
-        simple_patterns = [
-            (r'create file[:\s]+([^\s\n]+)', 'write_file'),
-            (r'read file[:\s]+([^\s\n]+)', 'read_file'),
-            (r'list directory[:\s]+([^\s\n]+)', 'list_directory'),
-            (r'run command[:\s]+([^\n]+)', 'execute_command'),
-            (r'execute[:\s]+([^\n]+)', 'execute_command')
-        ]
-
-        for pattern, tool_name in simple_patterns:
-            matches = re.findall(pattern, response, re.IGNORECASE)
-            for match in matches:
-                if tool_name == 'write_file':
-                    actions.append({
-                        'tool': 'write_file',
-                        'parameters': {'path': match, 'content': '# Generated file\n'}
-                    })
-                elif tool_name == 'read_file':
-                    actions.append({
-                        'tool': 'read_file',
-                        'parameters': {'path': match}
-                    })
-                elif tool_name == 'list_directory':
-                    actions.append({
-                        'tool': 'list_directory',
-                        'parameters': {'path': match}
-                    })
-                elif tool_name == 'execute_command':
-                    actions.append({
-                        'tool': 'execute_command',
-                        'parameters': {'command': match}
-                    })
+        # Models often state the same action both structurally and in prose; keep the first
+        unique_actions = []
+        seen = set()
+        for action in actions:
+            key = (action['tool'], _hashable(action['parameters']))
+            if key not in seen:
+                seen.add(key)
+                unique_actions.append(action)
 
-        return actions
+        return unique_actions
 
-    async def _execute_parsed_actions(self, actions: list, options: Dict[str, Any]) -> list:
+    async def _execute_parsed_actions(self, actions: list, options: Dict[str, Any],
+                                      prefetched_actions: Optional[list] = None) -> list:
         """Execute parsed actions using the tool registry"""
+        # Reuse actions already started while the response streamed, as long as
+        # they line up with the start of the fully parsed action list
+        started = {}
+        for index, (action, task) in enumerate(prefetched_actions or ()):
+            if index < len(actions) and actions[index] == action and len(started) == index:
+                started[index] = task
+            else:
+                task.cancel()
+
         if not actions:
             return []
 
-        results = []
-        conversation_id = f"agent-{self.config.id}"
+        started_get = started.get
+        run_action = self._run_parsed_action
 
-        for action in actions:
-            try:
-                tool_name = action.get('tool')
-                parameters = action.get('parameters', {})
+        def start(index: int, action: Dict[str, Any]):
+            return started_get(index) or run_action(action, options)
+
+        async def run_after(prerequisites: list, index: int, action: Dict[str, Any]) -> Dict[str, Any]:
+            if prerequisites:
+                await asyncio.wait(prerequisites)
+            return await start(index, action)
+
+        # Every action starts as soon as the earlier actions it conflicts with have
+        # finished; the registry semaphore caps how many tools run at once
+        tasks = []
+        for index, (action, dependencies) in enumerate(zip(actions, _action_dependencies(actions))):
+            tasks.append(asyncio.ensure_future(run_after([tasks[earlier] for earlier in dependencies], index, action)))
 
+        return list(await asyncio.gather(*tasks))
+
+    async def _run_parsed_action(self, action: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one parsed action, converting failures into an error result"""
+        try:
+            tool_name = action.get('tool')
+            parameters = action.get('parameters', {})
+
+            # Skip building log payloads when info messages are suppressed
+            log_info = self.logger.is_info_enabled()
+            if log_info:
                 self.logger.info('Executing action', {
                     'tool': tool_name,
                     'parameters': parameters
                 })
 
-                # Check if user approval is needed
-                if not options.get('auto_approve', True) and options.get('confirmation_required', False):
-                    # In a real implementation, this would prompt the user
-                    # For now, we'll assume approval
-                    pass
-
-                # Execute the tool
-                result = await self.tool_registry.execute_tool(
-                    tool_name,
-                    parameters,
-                    conversation_id
-                )
-
-                results.append(result)
+            # Check if user approval is needed
+            if not options.get('auto_approve', True) and options.get('confirmation_required', False):
+                # In a real implementation, this would prompt the user
+                # For now, we'll assume approval
+                pass
+
+            # An explicit timeout parameter may extend the backstop up to the
+            # ceiling, never shorten it
+            timeout = _TOOL_TIMEOUTS.get(tool_name, _DEFAULT_TOOL_TIMEOUT)
+            requested_timeout = parameters.get('timeout')
+            if isinstance(requested_timeout, (int, float)) and requested_timeout > timeout:
+                timeout = min(float(requested_timeout), _MAX_TOOL_TIMEOUT)
+
+            # Execute the tool; the registry semaphore bounds concurrency and
+            # the timeout only covers the tool's own run time
+            result = await self.tool_registry.execute_tool(
+                tool_name,
+                parameters,
+                f"agent-{self.config.id}",
+                timeout=timeout
+            )
 
+            if log_info:
                 self.logger.info('Action executed', {
                     'tool': tool_name,
                     'success': result.get('success', False)
                 })
 
-            except Exception as error:
-                self.logger.error('Action execution failed', {
-                    'action': action,
-                    'error': str(error)
-                })
-                results.append({
-                    'success': False,
-                    'error': str(error),
-                    'tool': action.get('tool', 'unknown'),
-                    'parameters': action.get('parameters', {})
-                })
+            return result
 
-        return results
+        except Exception as error:
+            self.logger.error('Action execution failed', {
+                'action': action,
+                'error': str(error)
+            })
+            return {
+                'success': False,
+                'error': str(error),
+                'tool': action.get('tool', 'unknown'),
+                'parameters': action.get('parameters', {})
+            }
 
     async def _generate_final_response(self, original_prompt: str, llm_response: str,
                                      actions: list, execution_results: list,
@@ -590,62 +941,49 @@ Please provide a helpful response and use tools when appropriate to complete the
         if not execution_results:
             return llm_response
 
-        # Build enhanced response with action results
-        enhanced_response = llm_response + "\n\n"
+        # Build enhanced response with action results, joining the parts once at the end
+        parts = [llm_response, "\n\n"]
 
         # Add results from executed actions
-        for i, result in enumerate(execution_results, 1):
+        for result in execution_results:
+            tool_name = result.get('tool', 'Unknown')
             if result.get('success'):
-                tool_name = result.get('tool', 'Unknown')
                 # Handle nested result structure from tool registry
                 tool_result = result.get('result', {})
                 if isinstance(tool_result, dict) and 'result' in tool_result:
                     tool_result = tool_result['result']
 
-                if tool_name == 'list_directory':
-                    items = tool_result.get('items', [])
-                    enhanced_response += f"📁 **Directory listing for {tool_result.get('path', '.')}:**\n"
-                    if items:
-                        for item in items[:20]:  # Limit to first 20 items
-                            icon = "📁" if item['type'] == 'directory' else "📄"
-                            enhanced_response += f"  {icon} {item['name']}\n"
-                        if len(items) > 20:
-                            enhanced_response += f"  ... and {len(items) - 20} more items\n"
-                    else:
-                        enhanced_response += "  (empty directory)\n"
-
-                elif tool_name == 'read_file':
-                    content = tool_result.get('content', '')
-                    path = tool_result.get('path', 'file')
-                    enhanced_response += f"📄 **Contents of {path}:**\n```\n{content[:1000]}\n```\n"
-                    if len(content) > 1000:
-                        enhanced_response += "... (content truncated)\n"
-
-                elif tool_name == 'execute_command':
-                    command = tool_result.get('command', '')
-                    stdout = tool_result.get('stdout', '')
-                    stderr = tool_result.get('stderr', '')
-                    return_code = tool_result.get('return_code', 0)
-
-                    enhanced_response += f"💻 **Command executed:** `{command}`\n"
-                    enhanced_response += f"**Exit code:** {return_code}\n"
-                    if stdout:
-                        enhanced_response += f"**Output:**\n```\n{stdout[:1000]}\n```\n"
-                    if stderr:
-                        enhanced_response += f"**Errors:**\n```\n{stderr[:500]}\n```\n"
+                _RESULT_FORMATTERS.get(tool_name, _format_generic_result)(tool_name, tool_result, parts)
 
-                else:
-                    # Generic result display
-                    enhanced_response += f"🔧 **{tool_name} result:**\n{str(tool_result)[:500]}\n"
+                # Release large tool payloads before the next result is formatted
+                del tool_result
             else:
                 # Show failed actions
-                error = result.get('error', 'Unknown error')
-                tool_name = result.get('tool', 'Unknown')
-                enhanced_response += f"❌ **{tool_name} failed:** {error}\n"
-
-        return enhanced_response
+                parts.append(f"❌ **{tool_name} failed:** {result.get('error', 'Unknown error')}\n")
+
+        return "".join(parts)
+
+    async def _print_status(self, message: str):
+        """Print a status line from a worker thread"""
+        await asyncio.to_thread(self.task_manager.console.print, message)
+
+    async def _write_console(self, output: str):
+        """Write already-rendered console output from a worker thread"""
+        if output:
+            await asyncio.to_thread(_write_to_file, self.task_manager.console.file, output)
+
+    def _record_task_result(self, task, task_result: TaskResult, files_created: list,
+                            files_modified: list, commands_executed: list):
+        """Complete or fail a finished autonomous task and collect its outputs"""
+        if task_result.success:
+            files_created.extend(task_result.files_created)
+            files_modified.extend(task_result.files_modified)
+            commands_executed.extend(task_result.commands_executed)
+            self.task_manager.complete_task(task.id, task_result)
+        else:
+            self.task_manager.fail_task(task.id, task_result.error or 'Unknown error')
 
-    async def _execute_single_task(self, task, options: Dict[str, Any]) -> Dict[str, Any]:
+    async def _execute_single_task(self, task, options: Dict[str, Any]) -> TaskResult:
         """Execute a single task with enhanced prompting and result tracking"""
         try:
             # Check if this is a template-based task with predefined content
@@ -653,48 +991,15 @@ Please provide a helpful response and use tools when appropriate to complete the
                 return await self._execute_template_task(task, options)
 
             # Create task-specific prompt with enhanced file creation guidance
-            task_prompt = f"""
-You are executing a specific task as part of a larger autonomous workflow.
-
-**Current Task:** {task.name}
-**Task Description:** {task.description}
-
-EXECUTION REQUIREMENTS:
-1. Create complete, functional files with proper content
-2. Include all necessary imports, dependencies, and configurations
-3. Follow best practices for the language/framework being used
-4. Add appropriate comments and documentation
-5. Ensure files are production-ready, not just placeholders
-6. Create directory structures as needed
-7. Include error handling where appropriate
-
-IMPORTANT: Do not create empty files or files with just comments. Every file should contain complete, working implementation.
-
-For web applications, include:
-- Complete HTML templates with proper structure
-- CSS styling (inline or separate files)
-- JavaScript functionality where needed
-- Configuration files (requirements.txt, package.json, etc.)
-- Environment setup files
-- Database models and migrations if applicable
-
-For Python projects, include:
-- Proper imports and dependencies
-- Complete class and function implementations
-- Error handling and logging
-- Configuration management
-- Requirements.txt with all dependencies
-
-Focus only on this specific task. Be thorough and create complete, functional implementations.
-"""
+            task_prompt = _build_task_prompt(task.name, task.description)
 
             # Execute the task using single prompt processing
             result = await self.process_single_prompt(task_prompt, options)
 
             # Extract file operations from execution results
-            files_created = []
-            files_modified = []
-            commands_executed = []
+            task_result = TaskResult(success=result.get('success', False), error=result.get('error'), details=result)
+            files_created = task_result.files_created
+            commands_executed = task_result.commands_executed
 
             if result.get('execution_results'):
                 for exec_result in result['execution_results']:
@@ -711,12 +1016,7 @@ Focus only on this specific task. Be thorough and create complete, functional im
                             if command:
                                 commands_executed.append(command)
 
-            # Add file tracking to result
-            result['files_created'] = files_created
-            result['files_modified'] = files_modified
-            result['commands_executed'] = commands_executed
-
-            return result
+            return task_result
 
         except Exception as error:
             self.logger.error(f'Task execution failed: {task.name}', {
@@ -724,21 +1024,11 @@ Focus only on this specific task. Be thorough and create complete, functional im
                 'error': str(error)
             })
 
-            return {
-                'success': False,
-                'error': str(error),
-                'files_created': [],
-                'files_modified': [],
-                'commands_executed': []
-            }
+            return TaskResult(success=False, error=str(error))
 
-    async def _execute_template_task(self, task, options: Dict[str, Any]) -> Dict[str, Any]:
+    async def _execute_template_task(self, task, options: Dict[str, Any]) -> TaskResult:
         """Execute a template-based task with predefined content"""
         try:
-            files_created = []
-            files_modified = []
-            commands_executed = []
-
             # Handle directory creation task
             if 'directory structure' in task.name.lower():
                 # Create necessary directories
@@ -760,14 +1050,10 @@ Focus only on this specific task. Be thorough and create complete, functional im
                     except Exception as dir_error:
                         self.logger.error(f"Exception creating directory {directory}: {dir_error}")
 
-                return {
-                    'success': True,
+                return TaskResult(success=True, details={
                     'response': f"Created project directory structure ({len(directories_created)} directories)",
-                    'files_created': [],
-                    'files_modified': [],
-                    'commands_executed': [],
                     'directories_created': directories_created
-                }
+                })
 
             # Handle file creation with predefined content
             elif task.metadata.get('file_path') and task.metadata.get('file_content'):
@@ -785,24 +1071,13 @@ Focus only on this specific task. Be thorough and create complete, functional im
                 )
 
                 if result.get('success'):
-                    files_created.append(file_path)
                     self.logger.info(f"Created file with template content: {file_path}")
 
-                    return {
-                        'success': True,
-                        'response': f"Created {file_path} with complete implementation",
-                        'files_created': files_created,
-                        'files_modified': files_modified,
-                        'commands_executed': commands_executed
-                    }
+                    return TaskResult(success=True, files_created=[file_path], details={
+                        'response': f"Created {file_path} with complete implementation"
+                    })
                 else:
-                    return {
-                        'success': False,
-                        'error': f"Failed to create file: {file_path}",
-                        'files_created': [],
-                        'files_modified': [],
-                        'commands_executed': []
-                    }
+                    return TaskResult(success=False, error=f"Failed to create file: {file_path}")
 
             # Handle setup/initialization tasks
             elif 'initialize' in task.name.lower() or 'test' in task.name.lower():
@@ -819,29 +1094,18 @@ Focus only on this specific task. Be thorough and create complete, functional im
                     )
 
                     if result.get('success'):
-                        commands_executed.append(init_command)
+                        return TaskResult(success=True, commands_executed=[init_command], details={
+                            'response': "Application initialized successfully. Database created and ready to use."
+                        })
 
-                        return {
-                            'success': True,
-                            'response': "Application initialized successfully. Database created and ready to use.",
-                            'files_created': [],
-                            'files_modified': [],
-                            'commands_executed': commands_executed
-                        }
-
-                return {
-                    'success': True,
-                    'response': "Setup task completed",
-                    'files_created': [],
-                    'files_modified': [],
-                    'commands_executed': []
-                }
+                return TaskResult(success=True, details={'response': "Setup task completed"})
 
             # Fallback to regular task execution
-            return await self.process_single_prompt(
+            result = await self.process_single_prompt(
                 f"Complete this task: {task.name}\nDescription: {task.description}",
                 options
             )
+            return TaskResult(success=result.get('success', False), error=result.get('error'), details=result)
 
         except Exception as error:
             self.logger.error(f'Template task execution failed: {task.name}', {
@@ -849,13 +1113,7 @@ Focus only on this specific task. Be thorough and create complete, functional im
                 'error': str(error)
             })
 
-            return {
-                'success': False,
-                'error': str(error),
-                'files_created': [],
-                'files_modified': [],
-                'commands_executed': []
-            }
+            return TaskResult(success=False, error=str(error))
 
     def _on_task_start(self, task):
         """Callback when a task starts"""
@@ -892,6 +1150,18 @@ Focus only on this specific task. Be thorough and create complete, functional im
                 'message': f'Failed to test {provider.upper()} API key: {str(error)}'
             }
 
+    async def shutdown(self):
+        """Shutdown the agent, closing provider connections once no other agent uses them"""
+        if self._holds_provider_manager:
+            self._holds_provider_manager = False
+            EnhancedAgent._shared_provider_manager_users -= 1
+            if (EnhancedAgent._shared_provider_manager_users == 0
+                    and EnhancedAgent._shared_provider_manager is self.provider_manager):
+                EnhancedAgent._shared_provider_manager = None
+                await self.provider_manager.aclose()
+        await self._response_cache.aclose()
+        await super().shutdown()
+
     def get_supported_providers(self) -> list:
         """Get list of supported providers"""
         return self.provider_manager.get_supported_providers()
@@ -909,64 +1179,50 @@ Focus only on this specific task. Be thorough and create complete, functional im
             'provider': self.provider_config['provider'],
             'model': self.provider_config['model'],
             'tools_enabled': self.config.tools_enabled,
-            'uptime': (datetime.now() - self.start_time).total_seconds(),
-            'metrics': self.metrics.__dict__
+            'uptime': self.uptime,
+            'metrics': self.metrics_snapshot,
+            'llm_cache': self._response_cache.get_stats()
         }
 
     def _extract_complete_json(self, json_str: str) -> str:
         """Extract complete JSON object by counting braces"""
-        if not json_str.strip().startswith('{'):
+        if not json_str.lstrip().startswith('{'):
             return json_str
 
+        # Jump between significant characters with C-level searches instead of
+        # stepping through every character; string bodies only stop at quotes and escapes
         brace_count = 0
         in_string = False
         in_triple_quote = False
-        escape_next = False
-        end_pos = 0
-        i = 0
-
-        while i < len(json_str):
-            char = json_str[i]
+        pos = 0
 
-            if escape_next:
-                escape_next = False
-                i += 1
-                continue
-
-            if char == '\\' and (in_string or in_triple_quote):
-                escape_next = True
-                i += 1
-                continue
+        while True:
+            token_re = _JSON_STRING_TOKEN_RE if in_string or in_triple_quote else _JSON_STRUCTURE_TOKEN_RE
+            match = token_re.search(json_str, pos)
+            if not match:
+                break
+            token = match.group()
+            pos = match.end()
 
-            # Check for triple quotes
-            if i + 2 < len(json_str) and json_str[i:i+3] == '"""':
+            if token == '\\':
+                pos += 1  # Skip the escaped character
+            elif token == '"""':
                 if not in_string:
                     in_triple_quote = not in_triple_quote
-                i += 3
-                continue
-
-            if char == '"' and not in_triple_quote:
-                in_string = not in_string
-                i += 1
-                continue
-
-            if not in_string and not in_triple_quote:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_pos = i + 1
-                        break
-
-            i += 1
+            elif token == '"':
+                if not in_triple_quote:
+                    in_string = not in_string
+            elif token == '{':
+                brace_count += 1
+            else:
+                brace_count -= 1
+                if brace_count == 0:
+                    return json_str[:pos]
 
-        return json_str[:end_pos] if end_pos > 0 else json_str
+        return json_str
 
     def _fix_json_content(self, json_str: str) -> str:
         """Fix common JSON issues like triple quotes"""
-        import re
-
         # Replace triple quotes with escaped quotes in content values
         # This regex finds "content": """...""" patterns and fixes them
         def replace_triple_quotes(match):
@@ -976,8 +1232,7 @@ Focus only on this specific task. Be thorough and create complete, functional im
             escaped_content = content.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
             return f'"{key}": "{escaped_content}"'
 
-        # Pattern to match "key": """content"""
-        pattern = r'"([^"]+)":\s*"""(.*?)"""'
-        fixed_json = re.sub(pattern, replace_triple_quotes, json_str, flags=re.DOTALL)
+        # Pattern matches "key": """content"""
+        fixed_json = _TRIPLE_QUOTED_VALUE_RE.sub(replace_triple_quotes, json_str)
 
         return fixed_json
@@ -0,0 +1,131 @@
+"""
+Exact-match cache for deterministic LLM responses with pluggable storage
+"""
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None when it is missing or expired"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float):
+        """Store a value for ttl seconds"""
+        pass
+
+    async def aclose(self):
+        """Release backend resources"""
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached value that has not expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        """Store a value, evicting the least recently used beyond the size limit"""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class RedisBackend(CacheBackend):
+    """Redis-backed cache, shared between processes"""
+
+    def __init__(self, url: str, prefix: str = 'codesolai:llm:'):
+        if redis_asyncio is None:
+            raise ImportError('The redis package is required for the Redis LLM cache backend')
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value; Redis handles expiry"""
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        """Store a value with a Redis expiry"""
+        await self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def aclose(self):
+        """Close the Redis connection pool"""
+        await self._client.aclose()
+
+
+class LLMCache:
+    """Responses keyed by a SHA-256 of the request, with hit/miss counters"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = 3600.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt: str, options: Dict[str, Any]) -> str:
+        """Cache key covering every request setting that changes the response"""
+        material = json.dumps({
+            'provider': options['provider'],
+            'model': options.get('model'),
+            'temperature': options.get('temperature'),
+            'max_tokens': options.get('max_tokens'),
+            'prompt': prompt
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response, counting the hit or miss; backend errors count as misses"""
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store a response for the configured TTL; a failed write only loses the entry"""
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit and miss counts"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    async def aclose(self):
+        """Release the backend"""
+        await self.backend.aclose()
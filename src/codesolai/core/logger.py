@@ -11,6 +11,9 @@ from rich.logging import RichHandler
 
 console = Console()
 
+# Logger method names mapped to their numeric levels
+_LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
 
 class Logger:
     """Enhanced logger for agent system"""
@@ -46,14 +49,15 @@ class Logger:
         if self.enable_metrics:
             self.metrics['log_counts'][level] += 1
         
-        # Format message with context
-        if context:
-            formatted_message = f"[{self.agent_id}] {message} | {json.dumps(context, default=str)}"
-        else:
-            formatted_message = f"[{self.agent_id}] {message}"
-        
-        # Log to Python logger
-        getattr(self.logger, level)(formatted_message)
+        # Only pay for formatting the context when the message will be emitted
+        if self.logger.isEnabledFor(_LEVELS[level]):
+            if context:
+                formatted_message = f"[{self.agent_id}] {message} | {json.dumps(context, default=str)}"
+            else:
+                formatted_message = f"[{self.agent_id}] {message}"
+            
+            # Log to Python logger
+            getattr(self.logger, level)(formatted_message)
         
         # Store for tracing if enabled
         if self.enable_tracing:
@@ -64,6 +68,14 @@ class Logger:
                 'context': context
             })
 
+    def is_debug_enabled(self) -> bool:
+        """Check whether debug messages would be emitted"""
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def is_info_enabled(self) -> bool:
+        """Check whether info messages would be emitted"""
+        return self.logger.isEnabledFor(logging.INFO)
+
     def debug(self, message: str, context: Optional[Dict[str, Any]] = None):
         """Log debug message"""
         self._log_with_context('debug', message, context)
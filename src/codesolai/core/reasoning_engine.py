@@ -316,6 +316,40 @@ Provide a brief reflection.
             self.logger.error('Reflection failed', {'error': str(error)})
             return {'error': str(error)}
 
+    async def summarize_history(self, inputs: List[str], options: Dict[str, Any], previous_summary: str = '') -> str:
+        """Summarize older conversation inputs into a compact digest"""
+        history_text = '\n'.join(f'- {text}' for text in inputs)
+        summary_prompt = f"""
+Summarize the following earlier conversation for use as background context.
+Keep facts, decisions, file names and open tasks; drop pleasantries.
+
+Previous Summary: {previous_summary or 'None'}
+
+Earlier User Inputs:
+{history_text}
+
+Respond with a concise summary of at most a few short paragraphs.
+"""
+        
+        try:
+            provider = options.get('provider', 'claude')
+            api_key = options.get('api_key')
+            
+            if not api_key:
+                return ''
+            
+            summary = await self.provider_manager.call(
+                provider, api_key, summary_prompt, {
+                    'temperature': 0.2,
+                    'max_tokens': 500
+                }
+            )
+            return summary.strip()
+            
+        except Exception as error:
+            self.logger.error('History summarization failed', {'error': str(error)})
+            return ''
+
     def _extract_intent(self, analysis: str) -> str:
         """Extract intent from analysis"""
         # Simple pattern matching for intent
@@ -342,3 +376,4 @@ Provide a brief reflection.
     async def shutdown(self):
         """Shutdown the reasoning engine"""
         self.logger.info('Shutting down reasoning engine')
+        await self.provider_manager.aclose()
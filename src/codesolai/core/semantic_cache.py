@@ -0,0 +1,82 @@
+"""
+Embedding-based cache that serves near-duplicate prompts from earlier responses
+"""
+
+import threading
+import time
+from functools import lru_cache
+from typing import Any, List, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+# Small general-purpose sentence encoder (384 dimensions)
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def is_available() -> bool:
+    """Check whether the optional embedding dependencies are installed"""
+    return SentenceTransformer is not None
+
+
+def _get_model():
+    """Load the embedding model on first use; loading takes seconds, so it is shared"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+@lru_cache(maxsize=1024)
+def embed(text: str) -> Any:
+    """Unit-length embedding of a prompt; exact repeats are served from the LRU cache"""
+    return _get_model().encode(text, normalize_embeddings=True)
+
+
+class SemanticCache:
+    """Responses keyed by prompt embedding, matched by cosine similarity"""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256, ttl_seconds: float = 3600.0):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # (expires_at, namespace, embedding, response), oldest first
+        self._entries: List[tuple] = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, embedding: Any) -> Optional[str]:
+        """Return the response of the most similar live prompt in the namespace, if close enough"""
+        now = time.monotonic()
+        self._entries = [entry for entry in self._entries if entry[0] > now]
+
+        candidates = [entry for entry in self._entries if entry[1] == namespace]
+        if candidates:
+            # Embeddings are normalized, so the dot product is the cosine similarity;
+            # a brute-force scan over a few hundred rows is well under a millisecond
+            scores = np.stack([entry[2] for entry in candidates]) @ embedding
+            best = int(scores.argmax())
+            if scores[best] >= self.threshold:
+                self.hits += 1
+                return candidates[best][3]
+
+        self.misses += 1
+        return None
+
+    def put(self, namespace: str, embedding: Any, response: str):
+        """Store a response, evicting the oldest entries beyond the size limit"""
+        self._entries.append((time.monotonic() + self.ttl_seconds, namespace, embedding, response))
+        if len(self._entries) > self.max_entries:
+            del self._entries[:len(self._entries) - self.max_entries]
+
+    def clear(self):
+        """Drop every cached response"""
+        self._entries = []
@@ -5,6 +5,10 @@ Provides task decomposition, tracking, and progress management similar to Augmen
 
 import uuid
 import asyncio
+import json
+import re
+import sys
+import traceback
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional, Any, Callable
@@ -16,6 +20,14 @@ from rich.panel import Panel
 from rich.text import Text
 
 from .logger import Logger
+from .file_creation_helper import FileCreationHelper
+from ..providers.provider_manager import ProviderManager
+
+# First JSON array in a decomposition response
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# Slotted dataclasses where supported (Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
 class TaskState(Enum):
@@ -43,6 +55,7 @@ class Task:
     result: Optional[Dict[str, Any]] = None
     progress: float = 0.0  # 0.0 to 1.0
     metadata: Dict[str, Any] = field(default_factory=dict)
+    dependencies: List[str] = field(default_factory=list)  # Task IDs that must finish first
     
     def duration(self) -> Optional[float]:
         """Get task duration in seconds"""
@@ -73,6 +86,36 @@ class TaskExecutionContext:
     callbacks: Dict[str, Callable] = field(default_factory=dict)
 
 
+@dataclass(**_DATACLASS_OPTIONS)
+class TaskResult:
+    """Outcome of executing a single task"""
+    success: bool
+    files_created: List[str] = field(default_factory=list)
+    files_modified: List[str] = field(default_factory=list)
+    commands_executed: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)  # Raw result of the underlying agent call
+
+    def outputs(self) -> Dict[str, List[str]]:
+        """File and command outputs, as stored on the completed task"""
+        return {
+            'files_created': self.files_created,
+            'files_modified': self.files_modified,
+            'commands_executed': self.commands_executed
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dictionary form used in agent responses"""
+        result = {**self.details, 'success': self.success, **self.outputs()}
+        if self.error is not None:
+            result['error'] = self.error
+        return result
+
+
+# States after which a task no longer blocks the tasks that depend on it
+_FINISHED_STATES = frozenset((TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED))
+
+
 class TaskManager:
     """Manages task decomposition, execution, and progress tracking"""
     
@@ -94,13 +137,15 @@ class TaskManager:
         self.logger.debug("Task manager initialized")
     
     def create_task(self, name: str, description: str, parent_id: Optional[str] = None, 
-                   metadata: Optional[Dict[str, Any]] = None) -> str:
+                   metadata: Optional[Dict[str, Any]] = None,
+                   dependencies: Optional[List[str]] = None) -> str:
         """Create a new task"""
         task = Task(
             name=name,
             description=description,
             parent_id=parent_id,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            dependencies=list(dependencies or [])
         )
         
         self.tasks[task.id] = task
@@ -146,6 +191,18 @@ class TaskManager:
                 return task
         return None
     
+    def get_ready_tasks(self) -> List[Task]:
+        """Get unstarted tasks whose dependencies have all finished, in execution order"""
+        ready = []
+        for task_id in self.execution_order:
+            task = self.tasks.get(task_id)
+            if not task or task.state != TaskState.NOT_STARTED:
+                continue
+            # A failed dependency still unblocks its dependents, as sequential execution did
+            if all(self.tasks[dep].state in _FINISHED_STATES for dep in task.dependencies if dep in self.tasks):
+                ready.append(task)
+        return ready
+
     def start_task(self, task_id: str) -> bool:
         """Start executing a task"""
         task = self.tasks.get(task_id)
@@ -166,12 +223,15 @@ class TaskManager:
         
         return True
     
-    def complete_task(self, task_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+    def complete_task(self, task_id: str, result: Optional[Any] = None) -> bool:
         """Mark a task as completed"""
         task = self.tasks.get(task_id)
         if not task:
             return False
         
+        if isinstance(result, TaskResult):
+            result = result.outputs()
+        
         task.state = TaskState.COMPLETED
         task.completed_at = datetime.now()
         task.result = result
@@ -504,9 +564,6 @@ class TaskManager:
 
     async def decompose_task(self, main_request: str, agent_config: Dict[str, Any]) -> List[str]:
         """Decompose a complex request into subtasks using AI with enhanced file creation support"""
-        from ..providers.provider_manager import ProviderManager
-        from .file_creation_helper import FileCreationHelper
-
         # Initialize provider manager with empty config (it will use defaults)
         provider_manager = ProviderManager({})
         file_helper = FileCreationHelper()
@@ -541,7 +598,10 @@ Please provide a detailed breakdown with:
 - Logical order of execution
 - Focus on creating COMPLETE, WORKING implementations
 
-Format your response as a JSON array of objects with 'name' and 'description' fields:
+Format your response as a JSON array of objects with 'name' and 'description' fields.
+Tasks run in order by default; a task may instead include a 'depends_on' field listing the
+0-based indices of the earlier tasks it needs (use [] when it needs none), so independent
+tasks can run at the same time:
 [
   {{"name": "Create project directory structure", "description": "Set up the basic directory structure for the project"}},
   {{"name": "Create main application file", "description": "Create the main application file with complete implementation"}},
@@ -570,12 +630,8 @@ Focus on creating comprehensive, executable tasks that will fully complete the r
 
             self.logger.info(f"Received response from {provider}: {len(response)} characters")
 
-            # Parse the JSON response
-            import json
-            import re
-
             # Extract JSON from response
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
+            json_match = _JSON_ARRAY_RE.search(response)
             if json_match:
                 json_str = json_match.group()
                 self.logger.info(f"Found JSON in response: {json_str[:200]}...")
@@ -590,7 +646,8 @@ Focus on creating comprehensive, executable tasks that will fully complete the r
                         task_id = self.create_task(
                             name=task_data.get('name', f'Task {i+1}'),
                             description=task_data.get('description', 'No description'),
-                            metadata={'auto_generated': True}
+                            metadata={'auto_generated': True},
+                            dependencies=self._resolve_dependencies(task_data.get('depends_on'), task_ids)
                         )
                         task_ids.append(task_id)
 
@@ -608,9 +665,18 @@ Focus on creating comprehensive, executable tasks that will fully complete the r
 
         except Exception as error:
             self.logger.error(f"Task decomposition failed: {error}")
-            import traceback
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return []
+        finally:
+            await provider_manager.aclose()
+
+    @staticmethod
+    def _resolve_dependencies(depends_on: Any, earlier_ids: List[str]) -> List[str]:
+        """Map a decomposed task's 'depends_on' indices to task IDs; without it, follow the previous task"""
+        if not isinstance(depends_on, list):
+            return earlier_ids[-1:]
+        return [earlier_ids[index] for index in depends_on
+                if isinstance(index, int) and 0 <= index < len(earlier_ids)]
 
     def _detect_project_type(self, request: str) -> Optional[str]:
         """Detect project type from the request"""
@@ -640,7 +706,7 @@ Focus on creating comprehensive, executable tasks that will fully complete the r
         )
         task_ids.append(dir_task_id)
 
-        # Create file creation tasks
+        # Create file creation tasks; each file only needs the directory structure
         for file_task in file_tasks:
             task_id = self.create_task(
                 name=file_task['name'],
@@ -650,15 +716,17 @@ Focus on creating comprehensive, executable tasks that will fully complete the r
                     'project_type': project_type,
                     'file_path': file_task['file_path'],
                     'file_content': file_task['content']
-                }
+                },
+                dependencies=[dir_task_id]
             )
             task_ids.append(task_id)
 
-        # Add final setup task
+        # Add final setup task once every file exists
         setup_task_id = self.create_task(
             name="Initialize and test the application",
             description="Run initial setup commands and verify the application works correctly",
-            metadata={'template_based': True, 'project_type': project_type}
+            metadata={'template_based': True, 'project_type': project_type},
+            dependencies=list(task_ids)
         )
         task_ids.append(setup_task_id)
 
@@ -92,8 +92,9 @@ class ToolRegistry:
             'security_level': getattr(tool, 'security_level', 'medium')
         }
 
-    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], conversation_id: str) -> Dict[str, Any]:
-        """Execute a tool with the given parameters"""
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], conversation_id: str,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Execute a tool with the given parameters, failing it once it runs longer than timeout"""
         if tool_name not in self.tools:
             error_msg = f"Tool '{tool_name}' not found"
             self.logger.error(error_msg, {'available_tools': list(self.tools.keys())})
@@ -123,8 +124,9 @@ class ToolRegistry:
                 # Validate security constraints
                 self._validate_security(tool_name, parameters)
                 
-                # Execute the tool
-                result = await tool.execute(parameters)
+                # Execute the tool; the timeout starts only once a slot is held, so
+                # time spent queued behind other tools never counts against it
+                result = await self._execute_within(tool, parameters, timeout)
                 
                 end_time = datetime.now()
                 duration = (end_time - start_time).total_seconds()
@@ -178,6 +180,22 @@ class ToolRegistry:
                 
                 return execution_result
 
+    @staticmethod
+    async def _execute_within(tool, parameters: Dict[str, Any], timeout: Optional[float]) -> Any:
+        """Run a tool, cancelling it when the timeout expires"""
+        if timeout is None:
+            return await tool.execute(parameters)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            return await asyncio.wait_for(tool.execute(parameters), timeout)
+        except asyncio.TimeoutError:
+            # A TimeoutError raised by the tool itself before the deadline is its own error
+            if loop.time() < deadline:
+                raise
+            raise TimeoutError(f'tool timeout after {timeout:g} seconds') from None
+
     def _validate_security(self, tool_name: str, parameters: Dict[str, Any]):
         """Validate security constraints for tool execution"""
         tool = self.tools[tool_name]
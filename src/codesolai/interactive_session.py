@@ -363,6 +363,7 @@ class InteractiveSession:
         console.print()
         Utils.log_info('Thanks for using CodeSolAI! 👋')
         self.is_running = False
+        await self.provider_manager.aclose()
         
         # Cleanup agent (when implemented)
         if self.agent:
@@ -374,6 +375,7 @@ class InteractiveSession:
     async def stop(self):
         """Stop the session"""
         self.is_running = False
+        await self.provider_manager.aclose()
         
         # Cleanup agent (when implemented)
         if self.agent:
@@ -3,44 +3,95 @@ Base provider class for LLM providers
 """
 
 import asyncio
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import httpx
 from ..utils import Utils
 
 
+# Connection pool limits for the shared per-provider HTTP client
+_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
 class BaseProvider(ABC):
     """Base class for all LLM providers"""
 
     def __init__(self, timeout: float = 30.0, max_retries: int = 3):
         self.timeout = timeout
         self.max_retries = max_retries
+        # One pooled client per event loop; connections are bound to the loop they were opened on
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
 
     @abstractmethod
     async def call(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
         """Make API call to the provider"""
         pass
 
+    async def stream(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream the response text in chunks; providers without streaming yield it whole"""
+        yield await self.call(api_key, prompt, options)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client of the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            # Clients of loops that have since closed can no longer be closed gracefully;
+            # dropping them lets their sockets be reclaimed
+            for stale_loop in [stale_loop for stale_loop in self._clients if stale_loop.is_closed()]:
+                del self._clients[stale_loop]
+            client = self._clients[loop] = httpx.AsyncClient(timeout=self.timeout, limits=_CLIENT_LIMITS)
+        return client
+
     async def make_request(self, url: str, headers: Dict[str, str], data: Dict[str, Any], retry_count: int = 0) -> Dict[str, Any]:
         """Make HTTP request with retry logic"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url, headers=headers, json=data)
+        client = self._get_client()
+        try:
+            response = await client.post(url, headers=headers, json=data)
+            response.raise_for_status()
+            return response.json()
+        
+        except (httpx.RequestError, httpx.HTTPStatusError) as error:
+            # Determine if we should retry
+            should_retry = retry_count < self.max_retries and self._should_retry_error(error)
+
+            if should_retry:
+                delay = (2 ** retry_count) * 1.0  # Exponential backoff in seconds
+                Utils.log_warning(f"Request failed, retrying in {delay}s... ({retry_count + 1}/{self.max_retries})")
+                
+                await asyncio.sleep(delay)
+                return await self.make_request(url, headers, data, retry_count + 1)
+
+            raise error
+
+    async def stream_request(self, url: str, headers: Dict[str, str], data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Make a streaming HTTP request and yield each server-sent event payload"""
+        # No retries here: a retry after partial output would duplicate text already shown
+        client = self._get_client()
+        async with client.stream('POST', url, headers=headers, json=data) as response:
+            if response.is_error:
+                await response.aread()
                 response.raise_for_status()
-                return response.json()
-            
-            except (httpx.RequestError, httpx.HTTPStatusError) as error:
-                # Determine if we should retry
-                should_retry = retry_count < self.max_retries and self._should_retry_error(error)
-
-                if should_retry:
-                    delay = (2 ** retry_count) * 1.0  # Exponential backoff in seconds
-                    Utils.log_warning(f"Request failed, retrying in {delay}s... ({retry_count + 1}/{self.max_retries})")
-                    
-                    await asyncio.sleep(delay)
-                    return await self.make_request(url, headers, data, retry_count + 1)
-
-                raise error
+
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                payload = line[5:].strip()
+                if not payload or payload == '[DONE]':
+                    continue
+                yield json.loads(payload)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients and their keep-alive connections"""
+        running_loop = asyncio.get_running_loop()
+        clients, self._clients = self._clients, {}
+        for loop, client in clients.items():
+            if loop is running_loop:
+                await client.aclose()
+            elif loop.is_running():
+                # Connections must be closed on the loop that opened them
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
 
     def _should_retry_error(self, error: Exception) -> bool:
         """Determine if an error should trigger a retry"""
@@ -3,7 +3,7 @@ Claude (Anthropic) provider implementation
 """
 
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import httpx
 from .base_provider import BaseProvider
 
@@ -17,7 +17,42 @@ class ClaudeProvider(BaseProvider):
 
     async def call(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
         """Make API call to Claude (Anthropic)"""
-        options = options or {}
+        url, headers, data = self._build_request(api_key, prompt, options or {})
+
+        try:
+            response_data = await self.make_request(url, headers, data)
+
+            # Extract content from Claude's response format
+            if (response_data and 
+                'content' in response_data and 
+                response_data['content'] and 
+                len(response_data['content']) > 0):
+                return response_data['content'][0]['text']
+            else:
+                raise Exception('Unexpected response format from Claude API')
+
+        except Exception as error:
+            raise self.handle_provider_error(error, 'Claude')
+
+    async def stream(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream response text from Claude (Anthropic) as it is generated"""
+        url, headers, data = self._build_request(api_key, prompt, options or {})
+        data['stream'] = True
+
+        try:
+            async for event in self.stream_request(url, headers, data):
+                event_type = event.get('type')
+                if event_type == 'content_block_delta':
+                    text = event.get('delta', {}).get('text')
+                    if text:
+                        yield text
+                elif event_type == 'error':
+                    raise Exception(event.get('error', {}).get('message', 'Claude API stream error'))
+        except Exception as error:
+            raise self.handle_provider_error(error, 'Claude')
+
+    def _build_request(self, api_key: str, prompt: str, options: Dict[str, Any]) -> tuple:
+        """Build the URL, headers and payload for a messages request"""
         url = f"{self.base_url}/messages"
         
         headers = {
@@ -38,24 +73,21 @@ class ClaudeProvider(BaseProvider):
             ]
         }
 
+        # Mark the static system prompt cacheable so repeat calls skip its input tokens
+        if options.get('system'):
+            data['system'] = [
+                {
+                    'type': 'text',
+                    'text': options['system'],
+                    'cache_control': {'type': 'ephemeral'}
+                }
+            ]
+
         # Add temperature if specified
         if 'temperature' in options:
             data['temperature'] = options['temperature']
 
-        try:
-            response_data = await self.make_request(url, headers, data)
-
-            # Extract content from Claude's response format
-            if (response_data and 
-                'content' in response_data and 
-                response_data['content'] and 
-                len(response_data['content']) > 0):
-                return response_data['content'][0]['text']
-            else:
-                raise Exception('Unexpected response format from Claude API')
-
-        except Exception as error:
-            raise self.handle_provider_error(error, 'Claude')
+        return url, headers, data
 
     def _get_model_for_provider(self, requested_model: Optional[str], provider: str) -> str:
         """Get the appropriate model for Claude"""
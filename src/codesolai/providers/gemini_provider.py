@@ -3,7 +3,7 @@ Gemini (Google) provider implementation
 """
 
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import httpx
 from .base_provider import BaseProvider
 
@@ -20,7 +20,46 @@ class GeminiProvider(BaseProvider):
         options = options or {}
         model = self._get_model_for_provider(options.get('model'), 'gemini')
         url = f"{self.base_url}/models/{model}:generateContent?key={api_key}"
-        
+        headers, data = self._build_request(prompt, options)
+
+        try:
+            response_data = await self.make_request(url, headers, data)
+
+            # Extract content from Gemini's response format
+            if (response_data and 
+                'candidates' in response_data and 
+                response_data['candidates'] and 
+                len(response_data['candidates']) > 0):
+                
+                candidate = response_data['candidates'][0]
+                if (candidate.get('content') and 
+                    candidate['content'].get('parts') and 
+                    len(candidate['content']['parts']) > 0):
+                    return candidate['content']['parts'][0]['text']
+            
+            raise Exception('Unexpected response format from Gemini API')
+
+        except Exception as error:
+            raise self.handle_provider_error(error, 'Gemini')
+
+    async def stream(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream response text from Gemini (Google) as it is generated"""
+        options = options or {}
+        model = self._get_model_for_provider(options.get('model'), 'gemini')
+        url = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+        headers, data = self._build_request(prompt, options)
+
+        try:
+            async for event in self.stream_request(url, headers, data):
+                for candidate in event.get('candidates') or []:
+                    for part in (candidate.get('content') or {}).get('parts') or []:
+                        if part.get('text'):
+                            yield part['text']
+        except Exception as error:
+            raise self.handle_provider_error(error, 'Gemini')
+
+    def _build_request(self, prompt: str, options: Dict[str, Any]) -> tuple:
+        """Build the headers and payload for a content generation request"""
         headers = {
             'Content-Type': 'application/json'
         }
@@ -43,25 +82,10 @@ class GeminiProvider(BaseProvider):
             }
         }
 
-        try:
-            response_data = await self.make_request(url, headers, data)
+        if options.get('system'):
+            data['systemInstruction'] = {'parts': [{'text': options['system']}]}
 
-            # Extract content from Gemini's response format
-            if (response_data and 
-                'candidates' in response_data and 
-                response_data['candidates'] and 
-                len(response_data['candidates']) > 0):
-                
-                candidate = response_data['candidates'][0]
-                if (candidate.get('content') and 
-                    candidate['content'].get('parts') and 
-                    len(candidate['content']['parts']) > 0):
-                    return candidate['content']['parts'][0]['text']
-            
-            raise Exception('Unexpected response format from Gemini API')
-
-        except Exception as error:
-            raise self.handle_provider_error(error, 'Gemini')
+        return headers, data
 
     def _get_model_for_provider(self, requested_model: Optional[str], provider: str) -> str:
         """Get the appropriate model for Gemini"""
@@ -3,7 +3,7 @@ GPT (OpenAI) provider implementation
 """
 
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import httpx
 from .base_provider import BaseProvider
 
@@ -17,7 +17,40 @@ class GPTProvider(BaseProvider):
 
     async def call(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
         """Make API call to GPT (OpenAI)"""
-        options = options or {}
+        url, headers, data = self._build_request(api_key, prompt, options or {})
+
+        try:
+            response_data = await self.make_request(url, headers, data)
+
+            # Extract content from OpenAI's response format
+            if (response_data and 
+                'choices' in response_data and 
+                response_data['choices'] and 
+                len(response_data['choices']) > 0):
+                return response_data['choices'][0]['message']['content']
+            else:
+                raise Exception('Unexpected response format from OpenAI API')
+
+        except Exception as error:
+            raise self.handle_provider_error(error, 'GPT')
+
+    async def stream(self, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream response text from GPT (OpenAI) as it is generated"""
+        url, headers, data = self._build_request(api_key, prompt, options or {})
+        data['stream'] = True
+
+        try:
+            async for event in self.stream_request(url, headers, data):
+                choices = event.get('choices')
+                if choices:
+                    text = (choices[0].get('delta') or {}).get('content')
+                    if text:
+                        yield text
+        except Exception as error:
+            raise self.handle_provider_error(error, 'GPT')
+
+    def _build_request(self, api_key: str, prompt: str, options: Dict[str, Any]) -> tuple:
+        """Build the URL, headers and payload for a chat completions request"""
         url = f"{self.base_url}/chat/completions"
         
         headers = {
@@ -38,20 +71,11 @@ class GPTProvider(BaseProvider):
             'temperature': options.get('temperature', 0.7)
         }
 
-        try:
-            response_data = await self.make_request(url, headers, data)
+        # OpenAI caches repeated prompt prefixes automatically, so the system prompt goes first
+        if options.get('system'):
+            data['messages'].insert(0, {'role': 'system', 'content': options['system']})
 
-            # Extract content from OpenAI's response format
-            if (response_data and 
-                'choices' in response_data and 
-                response_data['choices'] and 
-                len(response_data['choices']) > 0):
-                return response_data['choices'][0]['message']['content']
-            else:
-                raise Exception('Unexpected response format from OpenAI API')
-
-        except Exception as error:
-            raise self.handle_provider_error(error, 'GPT')
+        return url, headers, data
 
     def _get_model_for_provider(self, requested_model: Optional[str], provider: str) -> str:
         """Get the appropriate model for GPT"""
@@ -3,7 +3,7 @@ LLM Provider implementations for Claude, Gemini, and GPT
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator
 from .claude_provider import ClaudeProvider
 from .gemini_provider import GeminiProvider
 from .gpt_provider import GPTProvider
@@ -27,8 +27,18 @@ class ProviderManager:
 
     async def call(self, provider: str, api_key: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
         """Generic method to call any provider"""
-        options = options or {}
-        
+        provider_instance, trimmed_prompt = self._resolve(provider, api_key, prompt)
+        return await provider_instance.call(api_key, trimmed_prompt, options or {})
+
+    async def stream(self, provider: str, api_key: str, prompt: str,
+                     options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Generic method to stream a response from any provider as text chunks"""
+        provider_instance, trimmed_prompt = self._resolve(provider, api_key, prompt)
+        async for chunk in provider_instance.stream(api_key, trimmed_prompt, options or {}):
+            yield chunk
+
+    def _resolve(self, provider: str, api_key: str, prompt: str) -> tuple:
+        """Validate a request and return the provider instance with the trimmed prompt"""
         # Validate inputs
         if not provider or not api_key or not prompt:
             raise ValueError('Provider, API key, and prompt are required')
@@ -46,9 +56,12 @@ class ProviderManager:
             supported = ', '.join(self.providers.keys())
             raise ValueError(f'Unsupported provider: {provider}. Supported providers: {supported}')
 
-        # Call the appropriate provider
-        provider_instance = self.providers[provider_lower]
-        return await provider_instance.call(api_key, trimmed_prompt, options)
+        return self.providers[provider_lower], trimmed_prompt
+
+    async def aclose(self) -> None:
+        """Release pooled HTTP connections held by the providers"""
+        for provider_instance in self.providers.values():
+            await provider_instance.aclose()
 
     def get_available_models(self, provider: str) -> List[str]:
         """Get available models for each provider"""
@@ -132,6 +145,6 @@ class ProviderManager:
             'name': provider,
             'models': self.get_available_models(provider),
             'default_model': self.get_default_model(provider),
-            'supports_streaming': False,  # Can be extended later
+            'supports_streaming': True,
             'supports_function_calling': provider in ['gpt', 'claude']  # Basic info
         }
@@ -153,6 +153,8 @@ class Setup:
             except Exception as error:
                 Utils.log_error(f'Failed to test API key: {error}')
                 is_valid = False
+            finally:
+                await provider_manager.aclose()
 
         Utils.log_success('API key validated successfully!')
         return api_key
@@ -51,6 +51,10 @@ class SpinnerManager:
         self.start_time = time.time()
         self.is_active = True
 
+        # Animation only makes sense on a terminal; piped output would capture the frames
+        if not console.is_terminal:
+            return self
+
         # Create the spinner with modern styling
         spinner = Spinner("dots", text=self._format_message(0), style="green")
         self.live = Live(spinner, console=console, refresh_per_second=10)
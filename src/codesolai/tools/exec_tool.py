@@ -3,6 +3,9 @@ Execution tool for running commands with security controls
 """
 
 import asyncio
+import os
+import re
+import signal
 import shlex
 import subprocess
 from typing import Dict, Any, List, Optional
@@ -12,20 +15,45 @@ from .base_tool import BaseTool, ToolMetadata, ToolValidation
 from ..core.logger import Logger
 
 
+_DEFAULT_ALLOWED_COMMANDS = frozenset((
+    'npm', 'node', 'git', 'ls', 'pwd', 'cat', 'echo', 'mkdir', 'touch',
+    'grep', 'find', 'curl', 'wget', 'which', 'whereis', 'ps', 'sleep',
+    'python', 'python3', 'pip', 'pip3', 'uv'
+))
+_DEFAULT_BLOCKED_COMMANDS = (
+    'rm', 'rmdir', 'del', 'format', 'fdisk', 'mkfs', 'dd', 'sudo', 'su',
+    'chmod', 'chown', 'passwd', 'shutdown', 'reboot', 'halt', 'init'
+)
+
+# Shell commands get their own process group so a kill reaches the commands the
+# shell forked, not just the shell; Windows has no process groups to kill
+_NEW_PROCESS_GROUP = os.name == 'posix'
+
+
+def _kill_process(process: asyncio.subprocess.Process):
+    """Kill a shell process together with the commands it started"""
+    if process.returncode is not None:
+        return
+    try:
+        if _NEW_PROCESS_GROUP:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
 class ExecTool(BaseTool):
     """Enhanced execution tool with security controls and comprehensive command handling"""
 
     def __init__(self, operation: str, logger: Logger, security_config: Dict[str, Any]):
         self.operation = operation
-        self.allowed_commands = security_config.get('allowed_commands', [
-            'npm', 'node', 'git', 'ls', 'pwd', 'cat', 'echo', 'mkdir', 'touch',
-            'grep', 'find', 'curl', 'wget', 'which', 'whereis', 'ps', 'sleep',
-            'python', 'python3', 'pip', 'pip3', 'uv'
-        ])
-        self.blocked_commands = security_config.get('blocked_commands', [
-            'rm', 'rmdir', 'del', 'format', 'fdisk', 'mkfs', 'dd', 'sudo', 'su',
-            'chmod', 'chown', 'passwd', 'shutdown', 'reboot', 'halt', 'init'
-        ])
+        # Set for O(1) base-command lookups
+        self.allowed_commands = frozenset(security_config.get('allowed_commands', _DEFAULT_ALLOWED_COMMANDS) or ())
+        self.blocked_commands = tuple(security_config.get('blocked_commands', _DEFAULT_BLOCKED_COMMANDS) or ())
+        # All blocked terms folded into one alternation so each check is a single scan
+        self._blocked_re = (re.compile('|'.join(map(re.escape, self.blocked_commands)))
+                            if self.blocked_commands else None)
         self.max_execution_time = security_config.get('max_execution_time', 30)  # 30 seconds
         self.max_output_size = security_config.get('max_output_size', 1048576)  # 1MB
         self.working_directory = Path.cwd()
@@ -96,19 +124,16 @@ class ExecTool(BaseTool):
             base_command = parts[0]
             
             # Check against blocked commands
-            for blocked in self.blocked_commands:
-                if blocked in command.lower():
-                    result['safe'] = False
-                    result['reason'] = f'Command contains blocked term: {blocked}'
-                    return result
+            blocked_match = self._blocked_re.search(command.lower()) if self._blocked_re else None
+            if blocked_match:
+                result['safe'] = False
+                result['reason'] = f'Command contains blocked term: {blocked_match.group(0)}'
+                return result
             
             # Check if command is in allowed list (if specified)
             if self.allowed_commands:
-                command_allowed = False
-                for allowed in self.allowed_commands:
-                    if base_command == allowed or base_command.endswith(f'/{allowed}'):
-                        command_allowed = True
-                        break
+                command_allowed = (base_command in self.allowed_commands or
+                                   base_command.rsplit('/', 1)[-1] in self.allowed_commands)
                 
                 if not command_allowed:
                     result['safe'] = False
@@ -163,7 +188,8 @@ class ExecTool(BaseTool):
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
-                env=env
+                env=env,
+                start_new_session=_NEW_PROCESS_GROUP
             )
             
             # Wait for completion with timeout
@@ -173,9 +199,14 @@ class ExecTool(BaseTool):
                     timeout=timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
+                _kill_process(process)
                 await process.wait()
                 raise TimeoutError(f"Command timed out after {timeout} seconds")
+            except BaseException:
+                # Cancelled from outside (e.g. the registry timeout): don't leave the command running
+                _kill_process(process)
+                await process.wait()
+                raise
             
             # Decode output
             stdout_text = stdout.decode('utf-8', errors='replace')
@@ -19,6 +19,16 @@ colorama.init()
 
 console = Console()
 
+# Per-provider key formats, compiled once; unknown providers only need a minimum length
+_API_KEY_PATTERNS = {
+    # Anthropic API keys typically start with 'sk-ant-'
+    'claude': re.compile(r'sk-ant-.{14,}', re.DOTALL),
+    # OpenAI API keys typically start with 'sk-'
+    'gpt': re.compile(r'sk-.{18,}', re.DOTALL),
+    # Google API keys are typically 39 characters long
+    'gemini': re.compile(r'[^ ]{30,}', re.DOTALL),
+}
+
 
 class Utils:
     """Utility functions for formatting, logging, and user feedback"""
@@ -96,17 +106,10 @@ class Utils:
 
         trimmed_key = api_key.strip()
 
-        if provider == 'claude':
-            # Anthropic API keys typically start with 'sk-ant-'
-            return trimmed_key.startswith('sk-ant-') and len(trimmed_key) > 20
-        elif provider == 'gpt':
-            # OpenAI API keys typically start with 'sk-'
-            return trimmed_key.startswith('sk-') and len(trimmed_key) > 20
-        elif provider == 'gemini':
-            # Google API keys are typically 39 characters long
-            return len(trimmed_key) >= 30 and ' ' not in trimmed_key
-        else:
+        pattern = _API_KEY_PATTERNS.get(provider)
+        if pattern is None:
             return len(trimmed_key) > 10
+        return pattern.fullmatch(trimmed_key) is not None
 
     @staticmethod
     def sanitize_for_log(text: str, max_length: int = 100) -> str:
@@ -124,20 +127,24 @@ class Utils:
         """Check if input is coming from stdin (piped input)"""
         return not sys.stdin.isatty()
 
+    @staticmethod
+    def _read_stdin_all() -> str:
+        """Read all of stdin, preferring the raw byte stream over text decoding"""
+        stream = getattr(sys.stdin, 'buffer', None)
+        if stream is None:
+            return sys.stdin.read()
+        return stream.read().decode('utf-8', errors='replace')
+
     @staticmethod
     async def read_stdin() -> str:
         """Read input from stdin asynchronously"""
         if Utils.is_stdin_input():
-            loop = asyncio.get_event_loop()
-            # Read from stdin in a thread to avoid blocking
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = loop.run_in_executor(executor, sys.stdin.read)
-                try:
-                    content = await asyncio.wait_for(future, timeout=5.0)
-                    return content.strip()
-                except asyncio.TimeoutError:
-                    raise Exception("No input received from stdin")
+            # Read the whole payload in one go on a worker thread to avoid blocking
+            try:
+                content = await asyncio.wait_for(asyncio.to_thread(Utils._read_stdin_all), timeout=5.0)
+                return content.strip()
+            except asyncio.TimeoutError:
+                raise Exception("No input received from stdin")
         else:
             raise Exception("No piped input available")
 
@@ -0,0 +1,204 @@
+"""
+Tests for the core Agent
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from codesolai.core.agent import Agent, AgentConfig, AgentState
+
+
+class TestAgentPool:
+    """Test cases for the Agent instance pool"""
+
+    def setup_method(self):
+        """Start every test with an empty pool"""
+        Agent._pool.clear()
+
+    def teardown_method(self):
+        """Leave no pooled agents behind"""
+        Agent._pool.clear()
+
+    @pytest.mark.asyncio
+    async def test_acquire_reuses_released_agent(self):
+        """Test a released agent is handed out again for an equivalent config"""
+        agent = await Agent.acquire(AgentConfig())
+        await agent.release()
+
+        assert await Agent.acquire(AgentConfig()) is agent
+
+    @pytest.mark.asyncio
+    async def test_acquire_different_config_creates_new_agent(self):
+        """Test agents are only reused for equivalent configs"""
+        agent = await Agent.acquire(AgentConfig())
+        await agent.release()
+
+        assert await Agent.acquire(AgentConfig(max_tokens=123)) is not agent
+
+    @pytest.mark.asyncio
+    async def test_release_clears_session_state(self):
+        """Test nothing from one session is visible after release and re-acquire"""
+        agent = await Agent.acquire(AgentConfig())
+        conversation = await agent.conversation_manager.start_conversation({'id': 'c1', 'input': 'secret plan'})
+        await agent.conversation_manager.end_conversation(conversation.id)
+        await agent.context_manager.add_to_history({'id': 'c1', 'input': 'secret plan'})
+        agent.metrics.conversations = 5
+        agent.state = AgentState.ERROR
+
+        await agent.release()
+        reused = await Agent.acquire(AgentConfig())
+
+        assert reused is agent
+        assert reused.conversation_manager.get_conversation('c1') is None
+        assert reused.conversation_manager.get_conversation_stats()['total_conversations'] == 0
+        assert len(reused.context_manager.context_data.conversation_history) == 0
+        assert await reused.context_manager._get_relevant_history('secret plan') == []
+        assert reused.metrics.conversations == 0
+        assert reused.state == AgentState.IDLE
+
+    @pytest.mark.asyncio
+    async def test_release_clears_archived_conversations(self, tmp_path):
+        """Test a pooled agent's next session cannot see or clean up archived conversations"""
+        config = AgentConfig(conversation_archive_path=str(tmp_path / 'conversations.db'))
+        agent = await Agent.acquire(config)
+        await agent.conversation_manager.start_conversation({'id': 'c1', 'input': 'secret plan'})
+        await agent.conversation_manager.add_message('c1', 'assistant', 'secret answer')
+        await agent.conversation_manager.end_conversation('c1')
+
+        await agent.release()
+        reused = await Agent.acquire(config)
+        with patch('codesolai.core.conversation_manager.time.time', return_value=10 ** 12):
+            await reused.conversation_manager.cleanup_old_conversations(max_age_hours=1)
+
+        assert reused is agent
+        assert reused.conversation_manager.get_conversation('c1') is None
+        assert reused.conversation_manager.get_conversation_stats()['total_messages'] == 0
+        archive = reused.conversation_manager._archive
+        assert archive._connection.execute('SELECT COUNT(*) FROM conversations').fetchone()[0] == 0
+        await reused.conversation_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_release_rewires_event_handlers(self):
+        """Test the fresh session components still report to the agent"""
+        agent = await Agent.acquire(AgentConfig())
+        await agent.release()
+
+        await agent.conversation_manager.start_conversation({'id': 'c2', 'input': 'hello'})
+
+        assert agent.metrics.conversations == 1
+        assert agent.context_manager.summarizer == agent.reasoning_engine.summarize_history
+
+    @pytest.mark.asyncio
+    async def test_release_of_unpooled_agent_is_noop(self):
+        """Test agents created directly are not added to the pool"""
+        agent = Agent(AgentConfig())
+        await agent.release()
+
+        assert not Agent._pool
+
+    @pytest.mark.asyncio
+    async def test_evicted_agents_are_shut_down(self):
+        """Test agents dropped beyond the pool size are shut down"""
+        first = await Agent.acquire(AgentConfig())
+        second = await Agent.acquire(AgentConfig())
+
+        with patch.object(Agent, 'POOL_MAX_SIZE', 1), \
+             patch.object(first, 'shutdown', new_callable=AsyncMock) as first_shutdown, \
+             patch.object(second, 'shutdown', new_callable=AsyncMock) as second_shutdown:
+            await first.release()
+            await second.release()
+
+            first_shutdown.assert_awaited_once()
+            second_shutdown.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_idle_agents_expire(self):
+        """Test agents idle past the limit are shut down instead of reused"""
+        agent = await Agent.acquire(AgentConfig())
+        await agent.release()
+
+        with patch.object(Agent, 'POOL_MAX_IDLE_SECONDS', -1.0), \
+             patch.object(agent, 'shutdown', new_callable=AsyncMock) as shutdown:
+            reused = await Agent.acquire(AgentConfig())
+
+            shutdown.assert_awaited_once()
+            assert reused is not agent
+
+    @pytest.mark.asyncio
+    async def test_drain_pool_shuts_down_idle_agents(self):
+        """Test draining empties the pool and shuts every agent down"""
+        agent = await Agent.acquire(AgentConfig())
+        await agent.release()
+
+        with patch.object(agent, 'shutdown', new_callable=AsyncMock) as shutdown:
+            await Agent.drain_pool()
+
+            shutdown.assert_awaited_once()
+        assert not Agent._pool
+
+
+class TestAgentExecuteActions:
+    """Test cases for ordering of planned actions"""
+
+    def setup_method(self):
+        """Set up an agent whose tool calls are recorded instead of executed"""
+        self.agent = Agent(AgentConfig())
+        self.events = []
+
+        async def execute_tool(tool_name, parameters, conversation_id):
+            label = f"{tool_name}:{parameters.get('path') or parameters.get('command')}"
+            self.events.append(('start', label))
+            await asyncio.sleep(0.01 if tool_name == 'write_file' else 0)
+            self.events.append(('end', label))
+            return {'success': True, 'tool': tool_name}
+
+        self.agent.tool_registry.execute_tool = execute_tool
+
+    def _ended_before_started(self, first: str, second: str) -> bool:
+        """Check that one action finished before another started"""
+        return self.events.index(('end', first)) < self.events.index(('start', second))
+
+    @pytest.mark.asyncio
+    async def test_read_waits_for_write_to_same_path(self):
+        """Test a read of a file never overtakes the earlier write to it"""
+        await self.agent._execute_actions([
+            {'tool': 'write_file', 'parameters': {'path': 'out.txt', 'content': 'x'}},
+            {'tool': 'read_file', 'parameters': {'path': 'out.txt'}}
+        ], 'conv', {})
+
+        assert self._ended_before_started('write_file:out.txt', 'read_file:out.txt')
+
+    @pytest.mark.asyncio
+    async def test_command_waits_for_earlier_writes(self):
+        """Test a command runs only after every earlier action has finished"""
+        await self.agent._execute_actions([
+            {'tool': 'write_file', 'parameters': {'path': 'a.py', 'content': 'x'}},
+            {'tool': 'write_file', 'parameters': {'path': 'b.py', 'content': 'x'}},
+            {'tool': 'execute_command', 'parameters': {'command': 'python a.py'}}
+        ], 'conv', {})
+
+        assert self._ended_before_started('write_file:a.py', 'execute_command:python a.py')
+        assert self._ended_before_started('write_file:b.py', 'execute_command:python a.py')
+
+    @pytest.mark.asyncio
+    async def test_independent_actions_run_concurrently(self):
+        """Test actions on unrelated paths overlap"""
+        await self.agent._execute_actions([
+            {'tool': 'write_file', 'parameters': {'path': 'a.py', 'content': 'x'}},
+            {'tool': 'write_file', 'parameters': {'path': 'b.py', 'content': 'x'}}
+        ], 'conv', {})
+
+        assert self.events.index(('start', 'write_file:b.py')) < self.events.index(('end', 'write_file:a.py'))
+
+    @pytest.mark.asyncio
+    async def test_results_keep_action_order(self):
+        """Test results line up with the planned actions"""
+        results = await self.agent._execute_actions([
+            {'tool': 'write_file', 'parameters': {'path': 'a.py', 'content': 'x'}},
+            {'tool': 'read_file', 'parameters': {'path': 'c.py'}},
+            {'tool': 'execute_command', 'parameters': {'command': 'ls'}}
+        ], 'conv', {})
+
+        assert [result['tool'] for result in results] == ['write_file', 'read_file', 'execute_command']
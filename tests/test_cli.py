@@ -105,7 +105,7 @@ class TestCLI:
                 else:
                     spinner.fail('CLAUDE API key test failed')
         
-        mock_asyncio_run.side_effect = lambda coro: None  # Just run without error
+        mock_asyncio_run.side_effect = lambda coro: coro.close()  # Discard the coroutine without running it
         
         result = self.runner.invoke(main, ['--provider', 'claude', '--api-key', 'sk-ant-test', '--test-key'])
         
@@ -149,7 +149,7 @@ class TestCLI:
                 session = mock_interactive_session_class({}, 'claude', 'sk-ant-test', kwargs)
                 await session.start()
         
-        mock_asyncio_run.side_effect = lambda coro: None
+        mock_asyncio_run.side_effect = lambda coro: coro.close()
         
         result = self.runner.invoke(main, ['--interactive', '--provider', 'claude', '--api-key', 'sk-ant-test'])
         
@@ -173,7 +173,7 @@ class TestCLI:
             if kwargs.get('prompt') and not kwargs.get('interactive'):
                 await mock_handle_simple_prompt('claude', 'sk-ant-test', ' '.join(kwargs['prompt']), kwargs, {})
         
-        mock_asyncio_run.side_effect = lambda coro: None
+        mock_asyncio_run.side_effect = lambda coro: coro.close()
         
         result = self.runner.invoke(main, ['--provider', 'claude', '--api-key', 'sk-ant-test', 'Hello world'])
         
@@ -193,6 +193,24 @@ class TestCLI:
             with pytest.raises(SystemExit):
                 cli()
 
+    @patch('codesolai.cli.asyncio.run')
+    @patch('codesolai.cli.signal.signal')
+    def test_main_installs_sigint_handler(self, mock_signal, mock_asyncio_run):
+        """Test main installs a plain SIGINT handler before starting the event loop"""
+        import signal
+        from codesolai.cli import handle_sigint
+
+        mock_asyncio_run.side_effect = lambda coro: coro.close()
+
+        self.runner.invoke(main, ['--version'])
+        mock_signal.assert_not_called()
+
+        result = self.runner.invoke(main, ['--config'])
+
+        assert result.exit_code == 0
+        mock_signal.assert_called_once_with(signal.SIGINT, handle_sigint)
+        mock_asyncio_run.assert_called_once()
+
     def test_cli_unexpected_error(self):
         """Test CLI handling of unexpected error"""
         with patch('codesolai.cli.main') as mock_main:
@@ -262,3 +280,114 @@ class TestCLI:
         
         # Should show help due to --help, not error on invalid choice when help is present
         assert result.exit_code == 0
+
+    @pytest.mark.asyncio
+    @patch('codesolai.cli.ProviderManager')
+    async def test_handle_batch_prompts_preserves_order(self, mock_provider_manager_class, capsys):
+        """Test batch prompts run concurrently within the limit and print in order"""
+        import asyncio
+        from codesolai.cli import handle_batch_prompts
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_call(provider, api_key, prompt, options):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 if prompt == 'first' else 0)
+            in_flight -= 1
+            return f'answer to {prompt}'
+
+        mock_provider_manager = MagicMock()
+        mock_provider_manager.call = AsyncMock(side_effect=fake_call)
+        mock_provider_manager.aclose = AsyncMock()
+        mock_provider_manager_class.return_value = mock_provider_manager
+
+        await handle_batch_prompts('claude', 'sk-ant-test', ['first', 'second', 'third'],
+                                   {'concurrency': 2}, {})
+
+        output = capsys.readouterr().out
+        assert output.index('answer to first') < output.index('answer to second') < output.index('answer to third')
+        assert peak == 2
+        mock_provider_manager.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('codesolai.cli.SpinnerManager')
+    @patch('codesolai.cli.ProviderManager')
+    async def test_handle_simple_prompt_calls_provider_without_delay(self, mock_provider_manager_class,
+                                                                     mock_spinner_class):
+        """Test the provider call is not held back by spinner message updates"""
+        import time
+        from codesolai.cli import handle_simple_prompt
+
+        async def fake_stream(provider, api_key, prompt, options):
+            yield 'Hi there'
+
+        mock_provider_manager = MagicMock()
+        mock_provider_manager.stream = MagicMock(side_effect=fake_stream)
+        mock_provider_manager.aclose = AsyncMock()
+        mock_provider_manager_class.return_value = mock_provider_manager
+
+        started = time.monotonic()
+        await handle_simple_prompt('claude', 'sk-ant-test', 'Hello', {}, {})
+
+        assert time.monotonic() - started < 0.5
+        mock_provider_manager.stream.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch('codesolai.cli.SpinnerManager')
+    @patch('codesolai.cli.ProviderManager')
+    async def test_handle_simple_prompt_streams_chunks(self, mock_provider_manager_class,
+                                                       mock_spinner_class, capsys):
+        """Test simple prompts write response chunks as they arrive"""
+        from codesolai.cli import handle_simple_prompt
+
+        async def fake_stream(provider, api_key, prompt, options):
+            yield 'Hello, '
+            yield 'world'
+
+        mock_provider_manager = MagicMock()
+        mock_provider_manager.stream = MagicMock(side_effect=fake_stream)
+        mock_provider_manager.aclose = AsyncMock()
+        mock_provider_manager_class.return_value = mock_provider_manager
+
+        await handle_simple_prompt('claude', 'sk-ant-test', 'Hello', {}, {})
+
+        assert 'Hello, world' in capsys.readouterr().out
+        mock_provider_manager.aclose.assert_awaited_once()
+
+    @patch('codesolai.cli._IS_TTY', False)
+    def test_out_writes_plain_text_when_piped(self, capsys):
+        """Test piped output bypasses Rich markup rendering"""
+        from codesolai.cli import _out
+
+        _out('[bold]literal brackets[/bold]')
+
+        assert capsys.readouterr().out == '[bold]literal brackets[/bold]\n'
+
+    @pytest.mark.asyncio
+    @patch('codesolai.cli._IS_TTY', False)
+    @patch('codesolai.cli.SpinnerManager')
+    @patch('codesolai.cli.EnhancedAgent')
+    async def test_agent_actions_are_plain_text_when_piped(self, mock_agent_class, mock_spinner_class, capsys):
+        """Test the executed actions list is written without markup or emoji when piped"""
+        from codesolai.cli import handle_agent_prompt
+
+        mock_agent = MagicMock()
+        mock_agent.process_prompt = AsyncMock(return_value={
+            'success': True,
+            'response': 'done',
+            'actions_executed': 2,
+            'execution_results': [
+                {'success': True, 'tool': 'read_file'},
+                {'success': False, 'tool': 'write_file', 'error': 'denied'}
+            ]
+        })
+        mock_agent_class.return_value = mock_agent
+
+        await handle_agent_prompt('claude', 'sk-ant-test', 'Hello', {}, {}, 'medium', 5, False)
+
+        output = capsys.readouterr().out
+        assert 'Agent Actions Executed:\n  1. ok read_file\n  2. failed write_file: denied\n' in output
+        assert '[bold' not in output and '✅' not in output
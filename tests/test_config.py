@@ -317,3 +317,49 @@ class TestConfig:
         assert result['b']['f'] == 6   # Added
         assert result['e'] == 4
         assert result['g'] == 7
+
+    def test_load_uses_cache_when_file_unchanged(self):
+        """Test repeated loads do not re-read an unchanged config file"""
+        self.config.save({'defaultProvider': 'claude'})
+        self.config.load()
+
+        with patch('builtins.open', side_effect=AssertionError('config re-read')):
+            loaded_config = self.config.load()
+
+        assert loaded_config['defaultProvider'] == 'claude'
+
+    def test_load_cache_returns_independent_copies(self):
+        """Test mutating a loaded config does not leak into later loads"""
+        self.config.save({'defaultProvider': 'claude'})
+
+        first = self.config.load()
+        first['agent']['enabled'] = True
+
+        assert self.config.load()['agent']['enabled'] is False
+
+    def test_load_cache_invalidated_on_file_change(self):
+        """Test the cache is refreshed when the file changes on disk"""
+        self.config.save({'defaultProvider': 'claude'})
+        self.config.load()
+
+        with open(self.test_config_path, 'w') as f:
+            json.dump({'defaultProvider': 'gemini', 'timeout': 45000}, f)
+
+        assert self.config.load()['defaultProvider'] == 'gemini'
+
+    def test_default_config_not_mutated_by_callers(self):
+        """Test mutating a default load leaves the shared template intact"""
+        loaded_config = self.config.load()
+        loaded_config['agent']['toolSecurity']['allowedCommands'].append('make')
+
+        other = Config()
+        assert 'make' not in other.default_config['agent']['toolSecurity']['allowedCommands']
+
+    def test_get_api_key_from_loaded_config(self):
+        """Test getting API key from an already loaded config without re-reading"""
+        app_config = {'apiKeys': {'gpt': 'loaded-key-789'}}
+
+        with patch.object(self.config, 'load', side_effect=AssertionError('config re-read')):
+            key = self.config.get_api_key('gpt', app_config)
+
+        assert key == 'loaded-key-789'
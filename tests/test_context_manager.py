@@ -0,0 +1,254 @@
+"""
+Tests for the ContextManager
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from codesolai.core.context_manager import ContextManager, MAX_HISTORY_ITEMS, RETENTION_STRATEGIES, _SIZED_SECTIONS
+from codesolai.core.logger import Logger
+
+
+class TestRetentionStrategy:
+    """Test cases for conversation history retention"""
+
+    def test_unsupported_strategy_warns_and_falls_back(self):
+        """Test an unknown strategy is reported instead of silently ignored"""
+        logger = MagicMock()
+
+        manager = ContextManager(logger, retention_strategy='lottery')
+
+        assert manager.retention_strategy == 'fifo'
+        logger.warn.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('strategy', RETENTION_STRATEGIES)
+    async def test_supported_strategies_keep_most_recent(self, strategy):
+        """Test every supported strategy keeps the newest history items"""
+        manager = ContextManager(Logger('test', 'warning'), retention_strategy=strategy)
+
+        for index in range(MAX_HISTORY_ITEMS + 5):
+            await manager.add_to_history({'id': f'c{index}', 'input': f'question {index}'})
+
+        history = manager.context_data.conversation_history
+        assert manager.retention_strategy == strategy
+        assert len(history) == MAX_HISTORY_ITEMS
+        assert history[0].conversation_id == 'c5'
+        assert history[-1].conversation_id == f'c{MAX_HISTORY_ITEMS + 4}'
+
+
+class TestHistorySummary:
+    """Test cases for folding old history into a background summary"""
+
+    async def _filled_manager(self, summarize_history=True, summarizer=None):
+        """Build a manager over its compression threshold with four history items"""
+        manager = ContextManager(Logger('test', 'warning'), max_size=10, summarize_history=summarize_history)
+        manager.summarizer = summarizer or AsyncMock(return_value='folded summary')
+        for index in range(4):
+            await manager.add_to_history({'id': f'c{index}', 'input': f'topic{index} shared'})
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_summary_is_opt_in(self):
+        """Test no provider call is made unless summarizing is enabled"""
+        manager = await self._filled_manager(summarize_history=False)
+
+        await manager.build_context({'input': 'topic0'})
+
+        assert manager._summary_task is None
+        manager.summarizer.assert_not_called()
+        assert len(manager.context_data.conversation_history) == 4
+
+    @pytest.mark.asyncio
+    async def test_oldest_half_is_folded(self):
+        """Test the oldest half of history is replaced by the summary"""
+        manager = await self._filled_manager()
+
+        await manager.build_context({'input': 'topic0'})
+        await manager._summary_task
+
+        manager.summarizer.assert_awaited_once()
+        assert manager.summarizer.await_args.args[0] == ['topic0 shared', 'topic1 shared']
+        assert [item.conversation_id for item in manager.context_data.conversation_history] == ['c2', 'c3']
+        assert (await manager.build_context({'input': 'next'}))['compressed_context'] == 'folded summary'
+
+    @pytest.mark.asyncio
+    async def test_folded_items_leave_the_index(self):
+        """Test summarized items are pruned from the inverted index and size bookkeeping"""
+        manager = await self._filled_manager()
+
+        await manager.build_context({'input': 'topic0'})
+        await manager._summary_task
+
+        remaining = {item.seq for item in manager.context_data.conversation_history}
+        assert set(manager._history_by_seq) == remaining
+        assert set().union(*manager._postings.values()) == remaining
+        assert 'topic0' not in manager._postings or not manager._postings['topic0']
+        assert {item['conversation_id'] for item in await manager._get_relevant_history('shared')} == {'c2', 'c3'}
+
+        tracked = manager._section_sizes['conversation_history']
+        manager._refresh_section_size('conversation_history')
+        assert manager._section_sizes['conversation_history'] == tracked
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_running_summary(self):
+        """Test shutting down cancels a summary still waiting on the provider"""
+        started = asyncio.Event()
+
+        async def summarizer(inputs, options, previous_summary):
+            started.set()
+            await asyncio.sleep(3600)
+
+        manager = await self._filled_manager(summarizer=summarizer)
+
+        await manager.build_context({'input': 'topic0'})
+        await started.wait()
+        await manager.shutdown()
+
+        with pytest.raises(asyncio.CancelledError):
+            await manager._summary_task
+        assert len(manager.context_data.conversation_history) == 4
+
+
+class TestSectionSizes:
+    """Test cases for incrementally tracked context section sizes"""
+
+    def setup_method(self):
+        """Set up a manager whose sizes are already measured, so updates are incremental"""
+        self.manager = ContextManager(Logger('test', 'warning'))
+        self.manager._calculate_context_size()
+
+    def _assert_matches_recompute(self):
+        """Check the tracked sizes equal a full re-serialization of every section"""
+        tracked_total = self.manager._calculate_context_size()
+        tracked = dict(self.manager._section_sizes)
+        for section in _SIZED_SECTIONS:
+            self.manager._refresh_section_size(section)
+        assert self.manager._section_sizes == tracked
+        assert tracked_total == sum(tracked.values())
+
+    @pytest.mark.asyncio
+    async def test_history_appends_and_evictions(self):
+        """Test history sizes stay exact from the first item through deque eviction"""
+        await self.manager.add_to_history({'id': 'c0', 'input': 'first'})
+        self._assert_matches_recompute()
+
+        for index in range(1, MAX_HISTORY_ITEMS + 3):
+            await self.manager.add_to_history({'id': f'c{index}', 'input': f'input {index}', 'metadata': {'n': index}})
+        self._assert_matches_recompute()
+
+    @pytest.mark.asyncio
+    async def test_knowledge_adds_and_replacements(self):
+        """Test knowledge sizes stay exact when entries are added and replaced"""
+        await self.manager.add_knowledge({'id': 'k1', 'content': 'alpha'})
+        self._assert_matches_recompute()
+
+        await self.manager.add_knowledge({'id': 'k2', 'content': 'beta', 'metadata': {'source': 'x'}})
+        await self.manager.add_knowledge({'id': 'k1', 'content': 'a much longer replacement'})
+        self._assert_matches_recompute()
+
+    @pytest.mark.asyncio
+    async def test_clear_and_restart_sequences(self):
+        """Test sizes stay exact across clears followed by new traffic"""
+        await self.manager.update_user_preferences({'style': 'terse'})
+        await self.manager.update_system_state({'cwd': '/tmp'})
+        await self.manager.build_context({'input': 'hello there', 'conversation': {'id': 'c1'}})
+        await self.manager.add_to_history({'id': 'c1', 'input': 'hello there'})
+        self._assert_matches_recompute()
+
+        await self.manager.clear_history()
+        await self.manager.clear_session()
+        self._assert_matches_recompute()
+
+        await self.manager.add_to_history({'id': 'c2', 'input': 'again'})
+        await self.manager.add_knowledge({'id': 'k', 'content': 'fact'})
+        await self.manager.build_context({'input': 'again', 'conversation': {'id': 'c2'}})
+        self._assert_matches_recompute()
+
+    @pytest.mark.asyncio
+    async def test_summary_fold(self):
+        """Test sizes stay exact after summarized history is dropped"""
+        self.manager.summarize_history = True
+        self.manager.summarizer = AsyncMock(return_value='summary')
+        for index in range(4):
+            await self.manager.add_to_history({'id': f'c{index}', 'input': f'input {index}'})
+
+        await self.manager._summarize_old_history({})
+
+        assert len(self.manager.context_data.conversation_history) == 2
+        self._assert_matches_recompute()
+
+
+class TestHistoryIndex:
+    """Test cases for the inverted index over history tokens"""
+
+    def setup_method(self):
+        """Set up an empty manager"""
+        self.manager = ContextManager(Logger('test', 'warning'))
+
+    def _assert_matches_recompute(self):
+        """Check the index equals one rebuilt from the current history"""
+        history = self.manager.context_data.conversation_history
+        expected = {}
+        for item in history:
+            for word in item.tokens:
+                expected.setdefault(word, set()).add(item.seq)
+
+        assert {word: seqs for word, seqs in self.manager._postings.items() if seqs} == expected
+        assert self.manager._history_by_seq == {item.seq: item for item in history}
+
+    async def _full_scan(self, input_text, max_items=5):
+        """Relevant history by scoring every item, as before the index existed"""
+        input_words = set(input_text.lower().split())
+        scored = []
+        for item in self.manager.context_data.conversation_history:
+            item_words = set(item.input.lower().split())
+            score = len(input_words & item_words) / len(input_words | item_words) if input_words | item_words else 0
+            if score > 0.1:
+                scored.append((score, item))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [item.to_dict() for _, item in scored[:max_items]]
+
+    @pytest.mark.asyncio
+    async def test_index_tracks_appends_and_evictions(self):
+        """Test the index follows history through deque eviction"""
+        for index in range(MAX_HISTORY_ITEMS + 10):
+            await self.manager.add_to_history({'id': f'c{index}', 'input': f'task{index % 7} about topic{index}'})
+
+        self._assert_matches_recompute()
+        assert 'topic0' not in self.manager._postings or not self.manager._postings['topic0']
+
+    @pytest.mark.asyncio
+    async def test_index_resets_on_clear(self):
+        """Test clearing history empties the index and new items index from scratch"""
+        await self.manager.add_to_history({'id': 'c1', 'input': 'old words here'})
+        await self.manager.clear_history()
+        self._assert_matches_recompute()
+
+        await self.manager.add_to_history({'id': 'c2', 'input': 'new words'})
+        self._assert_matches_recompute()
+        assert await self.manager._get_relevant_history('old') == []
+
+    @pytest.mark.asyncio
+    async def test_index_tracks_summary_fold(self):
+        """Test items folded into the summary leave the index"""
+        self.manager.summarizer = AsyncMock(return_value='summary')
+        for index in range(6):
+            await self.manager.add_to_history({'id': f'c{index}', 'input': f'shared word{index}'})
+
+        await self.manager._summarize_old_history({})
+
+        self._assert_matches_recompute()
+
+    @pytest.mark.asyncio
+    async def test_relevance_matches_full_scan(self):
+        """Test indexed lookups rank history exactly like scoring every item"""
+        inputs = ['fix the login bug', 'add a login page', 'write unit tests', 'fix flaky unit tests',
+                  'deploy the app', 'the login page is slow', 'refactor the app config', 'fix the bug']
+        for index in range(MAX_HISTORY_ITEMS + 4):
+            await self.manager.add_to_history({'id': f'c{index}', 'input': inputs[index % len(inputs)]})
+
+        for query in ('fix the login bug', 'unit tests', 'app', 'nothing matches', 'THE Login'):
+            assert await self.manager._get_relevant_history(query) == await self._full_scan(query)
@@ -0,0 +1,287 @@
+"""
+Tests for the ConversationManager
+"""
+
+import pytest
+from unittest.mock import patch
+
+from codesolai.core.conversation_manager import ConversationManager
+from codesolai.core.logger import Logger
+
+
+class TestConversationMessages:
+    """Test cases for messages handed out by the manager"""
+
+    def setup_method(self):
+        """Set up a manager without an archive"""
+        self.manager = ConversationManager(Logger('test', 'warning'), 'test-agent')
+
+    @pytest.mark.asyncio
+    async def test_messages_survive_cleanup(self):
+        """Test messages held by a caller are not reused after their conversation is cleaned up"""
+        await self.manager.start_conversation({'id': 'old', 'input': 'first question'})
+        await self.manager.add_message('old', 'assistant', 'first answer')
+        await self.manager.end_conversation('old')
+        held = self.manager.get_conversation_messages('old')
+        snapshot = [message.to_dict() for message in held]
+
+        with patch('codesolai.core.conversation_manager.time.time', return_value=10 ** 12):
+            await self.manager.cleanup_old_conversations(max_age_hours=1)
+        await self.manager.start_conversation({'id': 'new', 'input': 'second question'})
+        await self.manager.add_message('new', 'assistant', 'second answer')
+
+        assert self.manager.get_conversation('old') is None
+        assert [message.to_dict() for message in held] == snapshot
+
+
+class TestConversationArchive:
+    """Test cases for the SQLite archive of completed conversations"""
+
+    def _archived_manager(self, tmp_path):
+        """Set up a manager that archives completed conversations"""
+        return ConversationManager(Logger('test', 'warning'), 'test-agent',
+                                   archive_path=str(tmp_path / 'conversations.db'))
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        """Test an archived conversation reads back exactly as it was ended"""
+        manager = self._archived_manager(tmp_path)
+        await manager.start_conversation({'id': 'c1', 'input': 'question', 'options': {'mode': 'x'}})
+        await manager.add_message('c1', 'assistant', 'answer', {'tokens': 3})
+        await manager.end_conversation('c1', {'result': 'done'})
+        expected = manager.get_conversation('c1').to_dict()
+
+        manager._archive_cache.clear()
+        loaded = manager.get_conversation('c1')
+
+        assert 'c1' not in manager.conversations
+        assert loaded.to_dict() == expected
+        assert manager._archive.load('c1') == expected
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_deletes_expired_rows(self, tmp_path):
+        """Test cleanup removes expired rows and their message counts"""
+        manager = self._archived_manager(tmp_path)
+        for conv_id in ('old', 'new'):
+            await manager.start_conversation({'id': conv_id, 'input': 'question'})
+            await manager.add_message(conv_id, 'assistant', 'answer')
+        await manager.end_conversation('old')
+        await manager.end_conversation('new')
+        manager._archive.save({**manager._archive.load('old'), 'end_time': 0.0})
+
+        await manager.cleanup_old_conversations(max_age_hours=1)
+
+        assert manager._archive.load('old') is None
+        assert manager.get_conversation('old') is None
+        assert manager._archive.load('new') is not None
+        assert manager.get_conversation_stats()['total_messages'] == 2
+        assert manager.get_conversation_stats()['completed_conversations'] == 1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_restart_replaces_archived_row(self, tmp_path):
+        """Test restarting an archived id drops the old row and its messages"""
+        manager = self._archived_manager(tmp_path)
+        await manager.start_conversation({'id': 'c1', 'input': 'first'})
+        await manager.add_message('c1', 'assistant', 'first answer')
+        await manager.end_conversation('c1')
+
+        await manager.start_conversation({'id': 'c1', 'input': 'second'})
+
+        assert manager._archive.load('c1') is None
+        assert manager.get_conversation('c1').input == 'second'
+        assert manager.get_conversation_stats()['total_messages'] == 1
+
+        await manager.end_conversation('c1')
+        manager._archive_cache.clear()
+
+        assert manager.get_conversation('c1').input == 'second'
+        assert manager._archive.load('c1')['messages'][0]['content'] == 'second'
+        assert manager.get_conversation_stats()['total_messages'] == 1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_managers_sharing_a_file_are_isolated(self, tmp_path):
+        """Test a second manager on the same archive neither reads nor deletes the first one's rows"""
+        first = self._archived_manager(tmp_path)
+        second = self._archived_manager(tmp_path)
+        await first.start_conversation({'id': 'c1', 'input': 'question'})
+        await first.add_message('c1', 'assistant', 'answer')
+        await first.end_conversation('c1')
+        first._archive.save({**first._archive.load('c1'), 'end_time': 0.0})
+
+        assert second.get_conversation('c1') is None
+        await second.cleanup_old_conversations(max_age_hours=1)
+
+        assert second.get_conversation_stats()['total_messages'] == 0
+        assert first._archive.load('c1') is not None
+        await second.shutdown()
+        await first.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_removes_own_rows(self, tmp_path):
+        """Test shutting down deletes the manager's archived rows and leaves others alone"""
+        kept = self._archived_manager(tmp_path)
+        closed = self._archived_manager(tmp_path)
+        for manager in (kept, closed):
+            await manager.start_conversation({'id': 'c1', 'input': 'question'})
+            await manager.end_conversation('c1')
+
+        await closed.shutdown()
+
+        owners = {row[0] for row in kept._archive._connection.execute('SELECT owner FROM conversations')}
+        assert owners == {kept._archive.owner}
+        await kept.shutdown()
+
+class _Clock:
+    """Controllable stand-in for time.time"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestConversationBookkeeping:
+    """Test cases for status indexes and counters against a full recomputation"""
+
+    def setup_method(self):
+        """Set up a manager without an archive on a controllable clock"""
+        self.clock = _Clock()
+        self._time_patch = patch('codesolai.core.conversation_manager.time.time', self.clock)
+        self._time_patch.start()
+        self.manager = ConversationManager(Logger('test', 'warning'), 'test-agent')
+
+    def teardown_method(self):
+        """Restore the real clock"""
+        self._time_patch.stop()
+
+    def _assert_status_sets_match(self):
+        """Check the status id sets equal a scan of every conversation"""
+        conversations = self.manager.conversations.values()
+        assert self.manager._active_ids == {c.id for c in conversations if c.status == 'active'}
+        assert self.manager._completed_ids == {c.id for c in conversations if c.status == 'completed'}
+        stats = self.manager.get_conversation_stats()
+        assert stats['total_conversations'] == len(self.manager.conversations)
+        assert sorted(self.manager.get_active_conversations()) == sorted(self.manager._active_ids)
+
+    async def _run_sequence(self):
+        """Start, extend, end, restart and clean up a mix of conversations"""
+        manager = self.manager
+        for conv_id in ('a', 'b', 'c', 'd'):
+            await manager.start_conversation({'id': conv_id, 'input': f'{conv_id} question'})
+            self.clock.now += 10
+        await manager.add_message('a', 'assistant', 'answer')
+        await manager.add_messages('b', [('assistant', 'one', None), ('user', 'two', {'k': 1})])
+        await manager.end_conversation('a')
+        await manager.end_conversation('b')
+        self.clock.now += 10
+        await manager.start_conversation({'id': 'a', 'input': 'a again'})
+        await manager.start_conversation({'id': 'c', 'input': 'c again'})
+        await manager.end_conversation('b')
+        await manager.end_conversation('d')
+        self.clock.now += 3601
+        await manager.end_conversation('c')
+        await manager.cleanup_old_conversations(max_age_hours=1)
+
+    @pytest.mark.asyncio
+    async def test_status_sets_match_recompute(self):
+        """Test active and completed id sets stay equal to a full scan"""
+        manager = self.manager
+        await manager.start_conversation({'id': 'a', 'input': 'q'})
+        await manager.start_conversation({'id': 'b', 'input': 'q'})
+        self._assert_status_sets_match()
+
+        await manager.end_conversation('a')
+        self._assert_status_sets_match()
+
+        await manager.start_conversation({'id': 'a', 'input': 'restarted'})
+        self._assert_status_sets_match()
+
+        await self._run_sequence()
+        self._assert_status_sets_match()
+        assert set(manager.conversations) == {'a', 'c'}
+
+    @pytest.mark.asyncio
+    async def test_status_sets_match_recompute_with_archive(self, tmp_path):
+        """Test completed ids track the archive when conversations move to disk"""
+        self.manager = ConversationManager(Logger('test', 'warning'), 'test-agent',
+                                           archive_path=str(tmp_path / 'conversations.db'))
+
+        await self._run_sequence()
+
+        archived = {row[0] for row in self.manager._archive._connection.execute('SELECT id FROM conversations')}
+        assert self.manager._active_ids == {c.id for c in self.manager.conversations.values()}
+        assert self.manager._completed_ids == archived == {'c'}
+        await self.manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_message_total_matches_recompute(self):
+        """Test the running message total equals a count over every conversation"""
+        def counted():
+            return sum(len(c.messages) for c in self.manager.conversations.values())
+
+        await self.manager.start_conversation({'id': 'a', 'input': 'q'})
+        await self.manager.add_message('a', 'assistant', 'answer')
+        await self.manager.add_messages('a', [('user', 'more', None), ('assistant', 'done', None)])
+        assert self.manager.get_conversation_stats()['total_messages'] == counted() == 4
+
+        await self.manager.add_message('missing', 'user', 'dropped')
+        await self.manager.start_conversation({'id': 'a', 'input': 'restarted'})
+        assert self.manager.get_conversation_stats()['total_messages'] == counted() == 1
+
+        await self._run_sequence()
+        assert self.manager.get_conversation_stats()['total_messages'] == counted()
+
+    @pytest.mark.asyncio
+    async def test_message_total_matches_recompute_with_archive(self, tmp_path):
+        """Test archived conversations keep counting until they are deleted"""
+        self.manager = ConversationManager(Logger('test', 'warning'), 'test-agent',
+                                           archive_path=str(tmp_path / 'conversations.db'))
+
+        await self._run_sequence()
+
+        archived = sum(row[0] for row in self.manager._archive._connection.execute(
+            'SELECT message_count FROM conversations'))
+        in_memory = sum(len(c.messages) for c in self.manager.conversations.values())
+        assert self.manager.get_conversation_stats()['total_messages'] == archived + in_memory
+        await self.manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_completion_heap_covers_every_completed_conversation(self):
+        """Test each completed conversation has a live heap entry for its end time"""
+        await self._run_sequence()
+        await self.manager.end_conversation('a')
+
+        live = set(self.manager._completion_heap)
+        for conversation in self.manager.conversations.values():
+            if conversation.status == 'completed':
+                assert (conversation.end_time, conversation.id) in live
+
+    @pytest.mark.asyncio
+    async def test_heap_cleanup_matches_full_scan(self):
+        """Test cleanup removes exactly the conversations a full scan would"""
+        manager = self.manager
+        for index in range(12):
+            await manager.start_conversation({'id': f'c{index}', 'input': 'q'})
+            if index % 4 != 3:
+                await manager.end_conversation(f'c{index}')
+            self.clock.now += 600
+        # Restarted and re-ended conversations leave stale heap entries behind
+        await manager.start_conversation({'id': 'c0', 'input': 'restarted'})
+        await manager.end_conversation('c1')
+        self.clock.now += 1800
+
+        cutoff = self.clock.now - 3600
+        expected = {c.id for c in manager.conversations.values()
+                    if c.status == 'completed' and c.end_time < cutoff}
+        before = set(manager.conversations)
+
+        await manager.cleanup_old_conversations(max_age_hours=1)
+
+        assert before - set(manager.conversations) == expected
+        assert expected
+        assert 'c0' in manager.conversations and 'c1' in manager.conversations
+        self._assert_status_sets_match()
@@ -0,0 +1,419 @@
+"""
+Tests for the EnhancedAgent
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from codesolai.core.agent import _action_dependencies
+from codesolai.core.enhanced_agent import EnhancedAgent
+from codesolai.core.task_manager import TaskResult
+
+
+class TestSharedProviderManager:
+    """Test cases for the provider manager shared between agents"""
+
+    def setup_method(self):
+        """Start without a shared provider manager"""
+        self._saved = (EnhancedAgent._shared_provider_manager, EnhancedAgent._shared_provider_manager_users)
+        EnhancedAgent._shared_provider_manager = None
+        EnhancedAgent._shared_provider_manager_users = 0
+
+    def teardown_method(self):
+        """Restore the shared provider manager seen by other tests"""
+        EnhancedAgent._shared_provider_manager, EnhancedAgent._shared_provider_manager_users = self._saved
+
+    @pytest.mark.asyncio
+    async def test_manager_closed_only_by_last_agent(self):
+        """Test shutting down one agent leaves the manager open for the others"""
+        first = EnhancedAgent({})
+        second = EnhancedAgent({})
+        assert first.provider_manager is second.provider_manager
+
+        with patch.object(first.provider_manager, 'aclose', new_callable=AsyncMock) as aclose:
+            await first.shutdown()
+            aclose.assert_not_awaited()
+
+            await second.shutdown()
+            aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_repeated_shutdown_counts_once(self):
+        """Test an agent shut down twice does not close the manager under another agent"""
+        first = EnhancedAgent({})
+        second = EnhancedAgent({})
+
+        with patch.object(first.provider_manager, 'aclose', new_callable=AsyncMock) as aclose:
+            await first.shutdown()
+            await first.shutdown()
+
+            aclose.assert_not_awaited()
+            await second.shutdown()
+            aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_new_agent_after_close_gets_fresh_manager(self):
+        """Test a closed manager is never handed to a new agent"""
+        first = EnhancedAgent({})
+        with patch.object(first.provider_manager, 'aclose', new_callable=AsyncMock):
+            await first.shutdown()
+
+        assert EnhancedAgent({}).provider_manager is not first.provider_manager
+
+
+_STREAMED_RESPONSE = (
+    'I will look around first.\n'
+    'ACTION: read_file\nPARAMETERS: {"path": "a.py"}\n'
+    'ACTION: list_directory\nPARAMETERS: {"path": "src"}\n'
+    'ACTION: write_file\nPARAMETERS: {"path": "b.py", "content": "x = {}"}\n'
+    'ACTION: read_file\nPARAMETERS: {"path": "c.py"}\n'
+    'ACTION: execute_command\nPARAMETERS: {"command": "python b.py"}\n'
+)
+
+
+class TestStreamedActions:
+    """Test cases for actions started while a response streams"""
+
+    def setup_method(self):
+        """Set up an agent whose tool runs are recorded instead of executed"""
+        self.agent = EnhancedAgent({})
+        self.started = []
+
+        async def run_parsed_action(action, options):
+            self.started.append(action)
+            return {'success': True, 'tool': action['tool']}
+
+        self.agent._run_parsed_action = run_parsed_action
+
+    def _stream(self, chunks):
+        """Make the provider manager stream the given chunks"""
+        async def stream(provider, api_key, prompt, request_options):
+            for chunk in chunks:
+                yield chunk
+
+        self.agent.provider_manager.stream = stream
+
+    async def _streamed_actions(self, chunks):
+        """Stream the chunks and return the actions started early"""
+        self._stream(chunks)
+        response, prefetched = await self.agent._stream_llm_response('prompt', {'provider': 'claude', 'api_key': 'k'}, {})
+        await asyncio.gather(*(task for _, task in prefetched))
+        assert response == ''.join(chunks)
+        return [action for action, _ in prefetched]
+
+    @pytest.mark.asyncio
+    async def test_streamed_actions_are_prefix_of_final_parse(self):
+        """Test actions started early always match the start of the full parse"""
+        final = self.agent._parse_actions_from_response(_STREAMED_RESPONSE)
+
+        for size in (1, 3, 7, 8, 9, 40, len(_STREAMED_RESPONSE)):
+            chunks = [_STREAMED_RESPONSE[i:i + size] for i in range(0, len(_STREAMED_RESPONSE), size)]
+            streamed = await self._streamed_actions(chunks)
+
+            assert streamed == final[:len(streamed)]
+
+    @pytest.mark.asyncio
+    async def test_side_effecting_actions_wait_for_full_response(self):
+        """Test nothing from the first write onwards starts while streaming"""
+        streamed = await self._streamed_actions([_STREAMED_RESPONSE[i:i + 5] for i in range(0, len(_STREAMED_RESPONSE), 5)])
+
+        assert [action['tool'] for action in streamed] == ['read_file', 'list_directory']
+        assert [action['tool'] for action in self.started] == ['read_file', 'list_directory']
+
+    @pytest.mark.asyncio
+    async def test_mismatched_prefetch_is_cancelled(self):
+        """Test a started action missing from the final parse is cancelled, not reused"""
+        never_finishes = asyncio.ensure_future(asyncio.sleep(60))
+        stale = {'tool': 'read_file', 'parameters': {'path': 'stale.py'}}
+        actions = [{'tool': 'read_file', 'parameters': {'path': 'a.py'}}]
+
+        results = await self.agent._execute_parsed_actions(actions, {}, [(stale, never_finishes)])
+        await asyncio.sleep(0)
+
+        assert never_finishes.cancelled()
+        assert results == [{'success': True, 'tool': 'read_file'}]
+        assert self.started == actions
+
+
+class TestActionTimeouts:
+    """Test cases for the backstop timeout on parsed actions"""
+
+    def setup_method(self):
+        """Set up an agent whose read_file tool never finishes"""
+        self.agent = EnhancedAgent({})
+        self.agent.tool_registry.tools['read_file'] = _HungTool()
+
+    @pytest.mark.asyncio
+    async def test_hung_tool_becomes_failure(self):
+        """Test a tool that never returns yields a timeout failure result"""
+        action = {'tool': 'read_file', 'parameters': {'path': 'a.py'}}
+
+        with patch.dict('codesolai.core.enhanced_agent._TOOL_TIMEOUTS', {'read_file': 0.01}):
+            result = await self.agent._run_parsed_action(action, {})
+
+        assert result['success'] is False
+        assert 'timeout' in result['error']
+        assert result['tool'] == 'read_file'
+
+    @pytest.mark.asyncio
+    async def test_requested_timeout_is_clamped(self):
+        """Test a huge timeout parameter cannot lift the backstop past the ceiling"""
+        self.agent.tool_registry.tools['execute_command'] = _HungTool()
+        action = {'tool': 'execute_command', 'parameters': {'command': 'sleep 1', 'timeout': 10 ** 9}}
+
+        with patch('codesolai.core.enhanced_agent._MAX_TOOL_TIMEOUT', 0.01), \
+             patch.dict('codesolai.core.enhanced_agent._TOOL_TIMEOUTS', {'execute_command': 0.005}):
+            result = await asyncio.wait_for(self.agent._run_parsed_action(action, {}), timeout=5)
+
+        assert result['success'] is False
+        assert result['error'] == 'tool timeout after 0.01 seconds'
+
+    @pytest.mark.asyncio
+    async def test_time_queued_for_a_slot_does_not_count(self):
+        """Test waiting behind max_concurrent_tools does not use up a tool's timeout"""
+        release = asyncio.Event()
+        self.agent.tool_registry.semaphore = asyncio.Semaphore(1)
+        self.agent.tool_registry.tools['http_request'] = _HungTool(release)
+        self.agent.tool_registry.tools['read_file'] = _HungTool(delay=0.01)
+        slow = asyncio.ensure_future(self.agent._run_parsed_action(
+            {'tool': 'http_request', 'parameters': {'url': 'http://example.com'}}, {}))
+        await asyncio.sleep(0)
+
+        with patch.dict('codesolai.core.enhanced_agent._TOOL_TIMEOUTS', {'read_file': 0.1}):
+            quick = asyncio.ensure_future(self.agent._run_parsed_action(
+                {'tool': 'read_file', 'parameters': {'path': 'a.py'}}, {}))
+            await asyncio.sleep(0.2)
+            release.set()
+            result = await quick
+
+        assert result['success'] is True
+        assert (await slow)['success'] is True
+
+    @pytest.mark.asyncio
+    async def test_timed_out_command_is_killed(self):
+        """Test a timed-out execute_command kills the shell and the command it forked"""
+        processes = []
+        create = asyncio.create_subprocess_shell
+
+        async def recording_create(*args, **kwargs):
+            process = await create(*args, **kwargs)
+            processes.append(process)
+            return process
+
+        action = {'tool': 'execute_command', 'parameters': {'command': 'sleep 30'}}
+        with patch.dict('codesolai.core.enhanced_agent._TOOL_TIMEOUTS', {'execute_command': 0.5}), \
+             patch('codesolai.tools.exec_tool.asyncio.create_subprocess_shell', recording_create):
+            # A surviving sleep keeps the pipes open, so this only returns early once it is dead
+            result = await asyncio.wait_for(self.agent._run_parsed_action(action, {}), timeout=10)
+
+        assert result['error'] == 'tool timeout after 0.5 seconds'
+        assert len(processes) == 1
+        assert processes[0].returncode is not None
+
+
+class _HungTool:
+    """Tool stub that sleeps for a delay, or until released when no delay is given"""
+
+    def __init__(self, release=None, delay=None):
+        self.release = release or asyncio.Event()
+        self.delay = delay
+
+    async def execute(self, parameters):
+        if self.delay is not None:
+            await asyncio.sleep(self.delay)
+        else:
+            await self.release.wait()
+        return {'done': True}
+
+
+def _write(path):
+    """Parsed write_file action"""
+    return {'tool': 'write_file', 'parameters': {'path': path, 'content': 'x'}}
+
+
+def _read(path):
+    """Parsed read_file action"""
+    return {'tool': 'read_file', 'parameters': {'path': path}}
+
+
+def _run(command):
+    """Parsed execute_command action"""
+    return {'tool': 'execute_command', 'parameters': {'command': command}}
+
+
+def _mkdir(path):
+    """Parsed create_directory action"""
+    return {'tool': 'create_directory', 'parameters': {'path': path}}
+
+
+class TestActionDependencies:
+    """Test cases for ordering constraints between parsed actions"""
+
+    def test_read_after_write_waits(self):
+        """Test a read waits for an earlier write to the same path"""
+        assert _action_dependencies([_write('a.py'), _read('a.py')]) == [[], [0]]
+
+    def test_write_after_read_waits(self):
+        """Test a write waits for an earlier read of the same path"""
+        assert _action_dependencies([_read('a.py'), _write('a.py')]) == [[], [0]]
+
+    def test_reads_do_not_wait_for_each_other(self):
+        """Test reads of the same path run concurrently"""
+        assert _action_dependencies([_read('a.py'), _read('a.py')]) == [[], []]
+
+    def test_unrelated_paths_are_independent(self):
+        """Test actions on different paths have no dependencies"""
+        assert _action_dependencies([_write('a.py'), _write('b.py'), _read('c.py')]) == [[], [], []]
+
+    def test_write_inside_new_directory_waits(self):
+        """Test writing into a directory waits for its creation"""
+        assert _action_dependencies([_mkdir('src'), _write('src/app.py'), _write('srcx.py')]) == [[], [0], []]
+
+    def test_listing_defaults_to_working_directory(self):
+        """Test a listing without a path conflicts with writes below the working directory"""
+        listing = {'tool': 'list_directory', 'parameters': {}}
+        assert _action_dependencies([_write('a.py'), listing]) == [[], [0]]
+
+    def test_command_is_a_barrier(self):
+        """Test a command waits for everything before it and everything after waits for it"""
+        actions = [_write('a.py'), _read('b.py'), _run('python a.py'), _read('c.py'), _write('d.py')]
+        assert _action_dependencies(actions) == [[], [], [0, 1], [2], [2]]
+
+    def test_consecutive_commands_chain(self):
+        """Test a second command only needs to wait for the previous barrier"""
+        actions = [_run('make'), _write('a.py'), _run('make test')]
+        assert _action_dependencies(actions) == [[], [0], [0, 1]]
+
+    def test_path_free_tools_only_wait_for_barriers(self):
+        """Test tools without filesystem effects only order against commands"""
+        request = {'tool': 'http_request', 'parameters': {'url': 'https://example.com'}}
+        assert _action_dependencies([_write('a.py'), request, _run('ls'), request]) == [[], [], [0, 1], [2]]
+
+    def test_copy_reads_source_and_writes_destination(self):
+        """Test a copy orders against writes of its source and reads of its destination"""
+        copy = {'tool': 'copy_file', 'parameters': {'source': 'a.py', 'destination': 'b.py'}}
+        assert _action_dependencies([_write('a.py'), copy, _read('b.py'), _read('a.py')]) == [[], [0], [1], [0]]
+
+
+class TestParsedActionResults:
+    """Test cases for results of concurrently executed parsed actions"""
+
+    @pytest.mark.asyncio
+    async def test_results_follow_action_order(self):
+        """Test results line up with the actions even when later ones finish first"""
+        agent = EnhancedAgent({})
+        delays = {'a.py': 0.03, 'b.py': 0.02, 'c.py': 0.0}
+
+        async def execute_tool(tool_name, parameters, conversation_id, timeout=None):
+            await asyncio.sleep(delays.get(parameters.get('path'), 0))
+            return {'success': True, 'tool': tool_name, 'path': parameters.get('path')}
+
+        agent.tool_registry.execute_tool = execute_tool
+
+        results = await agent._execute_parsed_actions(
+            [_write('a.py'), _read('b.py'), _read('c.py'), _run('ls'), _read('a.py')], {})
+
+        assert [(result['tool'], result['path']) for result in results] == [
+            ('write_file', 'a.py'), ('read_file', 'b.py'), ('read_file', 'c.py'),
+            ('execute_command', None), ('read_file', 'a.py')
+        ]
+
+
+class TestAutonomousExecution:
+    """Test cases for running decomposed tasks as a dependency graph"""
+
+    def setup_method(self):
+        """Set up an agent with a fixed task graph and recorded task runs"""
+        self.agent = EnhancedAgent({'api_key': 'sk-ant-' + 'a' * 40})
+        self.events = []
+        manager = self.agent.task_manager
+        manager.display_progress = lambda **kwargs: None
+        manager.display_completion_summary = lambda: None
+
+        async def decompose_task(prompt, options):
+            directory = manager.create_task('dir', 'd')
+            files = [manager.create_task(f'file{i}', 'd', dependencies=[directory]) for i in range(3)]
+            setup = manager.create_task('setup', 'd', dependencies=[directory] + files)
+            return [directory] + files + [setup]
+
+        async def execute_single_task(task, options):
+            self.events.append(('start', task.name))
+            await asyncio.sleep(0.01)
+            self.events.append(('end', task.name))
+            if task.name == 'file1':
+                return TaskResult(success=False, error='write failed')
+            return TaskResult(success=True, files_created=[f'{task.name}.py'])
+
+        manager.decompose_task = decompose_task
+        self.agent._execute_single_task = execute_single_task
+
+    @pytest.mark.asyncio
+    async def test_tasks_wait_for_their_dependencies(self):
+        """Test no task starts before the tasks it depends on have finished"""
+        await self.agent.process_autonomous('build an app', {})
+
+        position = {event: index for index, event in enumerate(self.events)}
+        for name in ('file0', 'file1', 'file2'):
+            assert position[('end', 'dir')] < position[('start', name)]
+            assert position[('end', name)] < position[('start', 'setup')]
+
+    @pytest.mark.asyncio
+    async def test_independent_tasks_overlap(self):
+        """Test tasks sharing only a finished dependency run concurrently"""
+        await self.agent.process_autonomous('build an app', {})
+
+        file_events = [event for event in self.events if event[1].startswith('file')]
+        assert [kind for kind, _ in file_events[:3]] == ['start', 'start', 'start']
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_does_not_block_dependents(self):
+        """Test a failed task still lets its dependents run and is reported"""
+        result = await self.agent.process_autonomous('build an app', {})
+
+        assert ('start', 'setup') in self.events
+        assert result['tasks_completed'] == 4
+        assert result['tasks_failed'] == 1
+        assert sorted(result['files_created']) == ['dir.py', 'file0.py', 'file2.py', 'setup.py']
+
+
+class TestExtractCompleteJson:
+    """Test cases for cutting one JSON object off the front of action parameters"""
+
+    def setup_method(self):
+        """Set up an agent to parse with"""
+        self.extract = EnhancedAgent({})._extract_complete_json
+
+    @pytest.mark.parametrize('text, expected', [
+        ('{"a": 1}\nSome prose', '{"a": 1}'),
+        ('  {"a": {"b": [1, {"c": 2}]}} tail', '  {"a": {"b": [1, {"c": 2}]}}'),
+        ('{"a": "} and {"} tail', '{"a": "} and {"}'),
+        ('{"a": "say \\"}\\" now"} tail', '{"a": "say \\"}\\" now"}'),
+        ('{"path": "C:\\\\"} tail', '{"path": "C:\\\\"}'),
+    ])
+    def test_stops_after_matching_brace(self, text, expected):
+        """Test the object ends at its matching brace, ignoring braces inside strings"""
+        assert self.extract(text) == expected
+
+    def test_triple_quoted_content(self):
+        """Test braces and quotes inside triple-quoted content do not end the object"""
+        text = '{"path": "a.py", "content": """def f():\n    return {"k": "}"}\n"""}\nACTION: next'
+
+        assert self.extract(text) == text[:text.index('\nACTION')]
+
+    @pytest.mark.parametrize('text', [
+        '{"a": {"b": 1}',
+        '{"a": "unterminated } string',
+        '{"content": """never closed }',
+        '{"a": "ends with escape \\',
+        '{',
+        ''
+    ])
+    def test_unbalanced_or_truncated_input_is_returned_whole(self, text):
+        """Test input without a complete object comes back unchanged"""
+        assert self.extract(text) == text
+
+    def test_non_object_is_returned_whole(self):
+        """Test text that does not start with an object is left alone"""
+        assert self.extract('["a", "b"] tail') == '["a", "b"] tail'
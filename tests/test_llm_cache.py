@@ -0,0 +1,112 @@
+"""
+Tests for the exact-match LLM response cache
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from codesolai.core.llm_cache import LLMCache, MemoryBackend, RedisBackend
+
+
+class TestMemoryBackend:
+    """Test cases for the in-process cache backend"""
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self):
+        """Test an entry is served until its TTL passes and then dropped"""
+        backend = MemoryBackend()
+
+        with patch('codesolai.core.llm_cache.time.monotonic', return_value=100.0):
+            await backend.set('k', 'value', ttl=10)
+        with patch('codesolai.core.llm_cache.time.monotonic', return_value=109.0):
+            assert await backend.get('k') == 'value'
+        with patch('codesolai.core.llm_cache.time.monotonic', return_value=111.0):
+            assert await backend.get('k') is None
+
+        assert 'k' not in backend._entries
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entry_is_evicted(self):
+        """Test the size limit evicts the entry read least recently"""
+        backend = MemoryBackend(max_size=2)
+        await backend.set('a', '1', ttl=60)
+        await backend.set('b', '2', ttl=60)
+
+        assert await backend.get('a') == '1'
+        await backend.set('c', '3', ttl=60)
+
+        assert await backend.get('b') is None
+        assert await backend.get('a') == '1'
+        assert await backend.get('c') == '3'
+
+
+class TestLLMCacheKey:
+    """Test cases for cache key derivation"""
+
+    def setup_method(self):
+        """Set up base request options"""
+        self.options = {'provider': 'claude', 'model': 'm1', 'temperature': 0, 'max_tokens': 100}
+
+    def test_same_request_same_key(self):
+        """Test identical requests share a key regardless of option order or extras"""
+        reordered = dict(reversed(list(self.options.items())), api_key='ignored')
+        assert LLMCache.key('prompt', self.options) == LLMCache.key('prompt', reordered)
+
+    @pytest.mark.parametrize('name, value', [
+        ('provider', 'gpt'), ('model', 'm2'), ('max_tokens', 200), ('temperature', 0.5)
+    ])
+    def test_request_settings_separate_keys(self, name, value):
+        """Test every response-changing setting gets its own key"""
+        assert LLMCache.key('prompt', self.options) != LLMCache.key('prompt', {**self.options, name: value})
+
+    def test_prompt_separates_keys(self):
+        """Test different prompts get different keys"""
+        assert LLMCache.key('prompt', self.options) != LLMCache.key('other prompt', self.options)
+
+
+class TestLLMCache:
+    """Test cases for hit/miss accounting and backend failures"""
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_counted(self):
+        """Test lookups are counted as hits or misses"""
+        cache = LLMCache()
+
+        assert await cache.get('k') is None
+        await cache.set('k', 'response')
+        assert await cache.get('k') == 'response'
+
+        assert cache.get_stats() == {'hits': 1, 'misses': 1}
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_count_as_misses(self):
+        """Test a failing Redis client degrades to cache misses instead of errors"""
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=ConnectionError('redis down'))
+        client.set = AsyncMock(side_effect=ConnectionError('redis down'))
+        redis_module = MagicMock()
+        redis_module.from_url.return_value = client
+
+        with patch('codesolai.core.llm_cache.redis_asyncio', redis_module):
+            cache = LLMCache(RedisBackend('redis://localhost:6379/0'))
+
+        await cache.set('k', 'response')
+        assert await cache.get('k') is None
+
+        assert cache.get_stats() == {'hits': 0, 'misses': 1}
+        client.get.assert_awaited_once_with('codesolai:llm:k')
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_sets_expiry(self):
+        """Test Redis entries are written with the cache TTL in milliseconds"""
+        client = MagicMock()
+        client.set = AsyncMock()
+        redis_module = MagicMock()
+        redis_module.from_url.return_value = client
+
+        with patch('codesolai.core.llm_cache.redis_asyncio', redis_module):
+            cache = LLMCache(RedisBackend('redis://localhost:6379/0'), ttl=1.5)
+
+        await cache.set('k', 'response')
+
+        client.set.assert_awaited_once_with('codesolai:llm:k', 'response', px=1500)
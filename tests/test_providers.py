@@ -2,6 +2,9 @@
 Tests for provider modules
 """
 
+import asyncio
+import threading
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
@@ -283,3 +286,133 @@ class TestGeminiProvider:
         """Test getting default Gemini model"""
         model = self.provider._get_model_for_provider(None, 'gemini')
         assert model == 'gemini-1.5-flash'
+
+
+class TestBaseProviderClient:
+    """Test cases for the pooled HTTP client shared by providers"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_requests(self):
+        """Test the same pooled client is used for consecutive requests"""
+        provider = ClaudeProvider()
+
+        first = provider._get_client()
+        second = provider._get_client()
+
+        assert first is second
+        await provider.aclose()
+        assert first.is_closed
+        assert not provider._clients
+
+    def test_each_event_loop_gets_its_own_client(self):
+        """Test a new event loop gets a fresh client and clients of closed loops are dropped"""
+        provider = ClaudeProvider()
+
+        async def get_client():
+            return provider._get_client()
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        assert first is not second
+        assert list(provider._clients.values()) == [second]
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_clients_on_their_own_loops(self):
+        """Test a client opened on a loop in another thread is closed on that loop"""
+        provider = ClaudeProvider()
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            async def get_client():
+                return provider._get_client()
+
+            other_client = asyncio.run_coroutine_threadsafe(get_client(), other_loop).result()
+            own_client = provider._get_client()
+
+            await provider.aclose()
+
+            assert own_client is not other_client
+            assert own_client.is_closed and other_client.is_closed
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+    @pytest.mark.asyncio
+    async def test_manager_aclose_closes_provider_clients(self):
+        """Test ProviderManager.aclose closes every provider's client"""
+        manager = ProviderManager()
+        client = manager.providers['gpt']._get_client()
+
+        await manager.aclose()
+
+        assert client.is_closed
+
+
+class TestProviderStreaming:
+    """Test cases for streamed provider responses"""
+
+    @pytest.mark.asyncio
+    async def test_claude_stream_yields_text_deltas(self):
+        """Test Claude streaming yields only text deltas"""
+        provider = ClaudeProvider()
+        events = [
+            {'type': 'message_start'},
+            {'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': 'Hello'}},
+            {'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': ' there'}},
+            {'type': 'message_stop'},
+        ]
+
+        async def fake_stream_request(url, headers, data):
+            assert data['stream'] is True
+            for event in events:
+                yield event
+
+        with patch.object(provider, 'stream_request', side_effect=fake_stream_request):
+            chunks = [chunk async for chunk in provider.stream('sk-ant-test', 'Hi')]
+
+        assert chunks == ['Hello', ' there']
+
+    @pytest.mark.asyncio
+    async def test_gpt_stream_yields_delta_content(self):
+        """Test GPT streaming yields delta content and skips empty deltas"""
+        provider = GPTProvider()
+        events = [
+            {'choices': [{'delta': {'role': 'assistant'}}]},
+            {'choices': [{'delta': {'content': 'Hi'}}]},
+            {'choices': [{'delta': {}, 'finish_reason': 'stop'}]},
+        ]
+
+        async def fake_stream_request(url, headers, data):
+            for event in events:
+                yield event
+
+        with patch.object(provider, 'stream_request', side_effect=fake_stream_request):
+            chunks = [chunk async for chunk in provider.stream('sk-test', 'Hi')]
+
+        assert chunks == ['Hi']
+
+    @pytest.mark.asyncio
+    async def test_manager_stream_validates_inputs(self):
+        """Test manager streaming applies the same validation as call"""
+        manager = ProviderManager()
+
+        with pytest.raises(ValueError, match='Unsupported provider'):
+            async for _ in manager.stream('invalid', 'some-long-api-key-here', 'Hi'):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_stream_request_parses_server_sent_events(self):
+        """Test SSE data lines are decoded and the [DONE] sentinel is skipped"""
+        provider = GPTProvider()
+        body = b'event: ping\ndata: {"n": 1}\n\n: comment\ndata: {"n": 2}\n\ndata: [DONE]\n\n'
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        client = httpx.AsyncClient(transport=transport)
+
+        with patch.object(provider, '_get_client', return_value=client):
+            events = [event async for event in provider.stream_request('https://example.test', {}, {})]
+
+        assert events == [{'n': 1}, {'n': 2}]
+        await client.aclose()
@@ -0,0 +1,118 @@
+"""
+Tests for the embedding-based semantic cache
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+np = pytest.importorskip('numpy')
+
+from codesolai.core import semantic_cache
+from codesolai.core.enhanced_agent import EnhancedAgent
+from codesolai.core.semantic_cache import SemanticCache
+
+# Stand-in embeddings: unit vectors whose dot products are easy to reason about
+_VECTORS = {
+    'list the files': (1.0, 0.0, 0.0),
+    'list all the files': (0.96, 0.28, 0.0),
+    'delete the files': (0.6, 0.8, 0.0),
+    'write a poem': (0.0, 0.0, 1.0)
+}
+
+
+def _embed(text):
+    """Stub embedder returning a fixed unit vector per known text; any other text is an error"""
+    return np.array(_VECTORS[text])
+
+
+class TestSemanticCache:
+    """Test cases for similarity lookups"""
+
+    def setup_method(self):
+        """Use numpy even without the sentence-transformers dependency"""
+        self._np_patch = patch.object(semantic_cache, 'np', np)
+        self._np_patch.start()
+        self.cache = SemanticCache(threshold=0.92)
+        self.cache.put('claude|m|100', _embed('list the files'), 'files response')
+
+    def teardown_method(self):
+        """Restore the module's numpy binding"""
+        self._np_patch.stop()
+
+    def test_near_duplicate_above_threshold_hits(self):
+        """Test a prompt at or above the similarity threshold is served from the cache"""
+        assert self.cache.get('claude|m|100', _embed('list all the files')) == 'files response'
+        assert self.cache.hits == 1
+
+    def test_dissimilar_prompt_below_threshold_misses(self):
+        """Test a prompt below the similarity threshold is a miss"""
+        assert self.cache.get('claude|m|100', _embed('delete the files')) is None
+        assert self.cache.get('claude|m|100', _embed('write a poem')) is None
+        assert self.cache.misses == 2
+
+    def test_threshold_is_configurable(self):
+        """Test a lower threshold accepts less similar prompts"""
+        self.cache.threshold = 0.5
+
+        assert self.cache.get('claude|m|100', _embed('delete the files')) == 'files response'
+
+    def test_namespaces_are_separate(self):
+        """Test a hit requires the same provider, model and token settings"""
+        assert self.cache.get('gpt|m|100', _embed('list the files')) is None
+
+    def test_entries_expire(self):
+        """Test entries past their TTL are dropped and no longer served"""
+        with patch('codesolai.core.semantic_cache.time.monotonic', return_value=10 ** 9):
+            assert self.cache.get('claude|m|100', _embed('list the files')) is None
+
+        assert self.cache._entries == []
+
+    def test_oldest_entries_evicted_beyond_limit(self):
+        """Test the cache keeps only the newest max_entries responses"""
+        self.cache.max_entries = 1
+        self.cache.put('claude|m|100', _embed('write a poem'), 'poem response')
+
+        assert self.cache.get('claude|m|100', _embed('list the files')) is None
+        assert self.cache.get('claude|m|100', _embed('write a poem')) == 'poem response'
+
+
+class TestAgentSemanticCache:
+    """Test cases for the semantic cache in the agent's LLM call path"""
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_prompt_skips_provider_call(self):
+        """Test a near-duplicate deterministic prompt is answered without a provider call"""
+        agent = EnhancedAgent({})
+        agent._semantic_cache = SemanticCache(threshold=0.92)
+        agent.provider_manager.call = AsyncMock(return_value='files response')
+        options = {'provider': 'claude', 'api_key': 'k', 'model': 'm', 'temperature': 0, 'max_tokens': 100}
+
+        with patch.object(semantic_cache, 'np', np), patch.object(semantic_cache, 'embed', _embed):
+            first = await agent._get_llm_response('list the files', options)
+            second = await agent._get_llm_response('list all the files', options)
+
+        assert first['response'] == second['response'] == 'files response'
+        agent.provider_manager.call.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_only_the_user_prompt_is_embedded(self):
+        """Test the system prompt is kept out of the embedding and in the namespace instead"""
+        agent = EnhancedAgent({})
+        agent._semantic_cache = SemanticCache(threshold=0.92)
+        agent.provider_manager.call = AsyncMock(side_effect=['files response', 'poem response', 'plain response'])
+        options = {'provider': 'claude', 'api_key': 'k', 'model': 'm', 'temperature': 0, 'max_tokens': 100}
+        embedded = []
+
+        def recording_embed(text):
+            embedded.append(text)
+            return _embed(text)
+
+        with patch.object(semantic_cache, 'np', np), patch.object(semantic_cache, 'embed', recording_embed):
+            await agent._get_llm_response('list the files', options)
+            poem = await agent._get_llm_response('write a poem', options)
+            plain = await agent._get_llm_response('list the files', {**options, 'tools_enabled': False})
+
+        assert embedded == ['list the files', 'write a poem', 'list the files']
+        assert poem['response'] == 'poem response'
+        assert plain['response'] == 'plain response'
+        assert agent.provider_manager.call.await_count == 3
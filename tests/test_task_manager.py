@@ -0,0 +1,90 @@
+"""
+Tests for the TaskManager dependency graph
+"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from codesolai.core.file_creation_helper import FileCreationHelper
+from codesolai.core.logger import Logger
+from codesolai.core.task_manager import TaskManager, TaskState
+
+
+class TestTaskDependencies:
+    """Test cases for task dependencies and readiness"""
+
+    def setup_method(self):
+        """Set up an empty task manager"""
+        self.manager = TaskManager(Logger('test', 'warning'), MagicMock())
+
+    def _ready_names(self):
+        """Names of the tasks that may start now"""
+        return [task.name for task in self.manager.get_ready_tasks()]
+
+    def test_template_tasks_run_directory_then_files_then_setup(self):
+        """Test template tasks wait for the directory, and setup waits for every file"""
+        task_ids = self.manager._create_template_based_tasks('flask_web_app', 'flask app', FileCreationHelper())
+        directory_id, file_ids, setup_id = task_ids[0], task_ids[1:-1], task_ids[-1]
+
+        assert file_ids
+        assert self.manager.get_task(directory_id).dependencies == []
+        assert all(self.manager.get_task(task_id).dependencies == [directory_id] for task_id in file_ids)
+        assert self.manager.get_task(setup_id).dependencies == [directory_id] + file_ids
+
+        assert [task.id for task in self.manager.get_ready_tasks()] == [directory_id]
+        self.manager.complete_task(directory_id)
+        assert [task.id for task in self.manager.get_ready_tasks()] == file_ids
+        for task_id in file_ids[:-1]:
+            self.manager.complete_task(task_id)
+        assert setup_id not in [task.id for task in self.manager.get_ready_tasks()]
+        self.manager.complete_task(file_ids[-1])
+        assert [task.id for task in self.manager.get_ready_tasks()] == [setup_id]
+
+    def test_resolve_dependencies_defaults_to_previous_task(self):
+        """Test a task without depends_on follows the previous task"""
+        assert TaskManager._resolve_dependencies(None, []) == []
+        assert TaskManager._resolve_dependencies(None, ['a', 'b']) == ['b']
+        assert TaskManager._resolve_dependencies('0', ['a', 'b']) == ['b']
+
+    def test_resolve_dependencies_uses_valid_indices(self):
+        """Test explicit depends_on indices map to earlier tasks, dropping invalid ones"""
+        assert TaskManager._resolve_dependencies([], ['a', 'b']) == []
+        assert TaskManager._resolve_dependencies([0, 1], ['a', 'b']) == ['a', 'b']
+        assert TaskManager._resolve_dependencies([1, 2, -1, 'x'], ['a', 'b']) == ['b']
+
+    @pytest.mark.asyncio
+    async def test_decomposed_tasks_chain_without_depends_on(self):
+        """Test decomposed tasks run one after another unless depends_on says otherwise"""
+        tasks = [
+            {'name': 'first', 'description': 'd'},
+            {'name': 'second', 'description': 'd'},
+            {'name': 'third', 'description': 'd', 'depends_on': [0]},
+            {'name': 'fourth', 'description': 'd', 'depends_on': []}
+        ]
+        provider_manager = MagicMock()
+        provider_manager.call = AsyncMock(return_value=json.dumps(tasks))
+        provider_manager.aclose = AsyncMock()
+
+        with patch('codesolai.core.task_manager.ProviderManager', return_value=provider_manager):
+            first, second, third, fourth = await self.manager.decompose_task(
+                'write a report', {'provider': 'claude', 'api_key': 'k'})
+
+        assert self.manager.get_task(second).dependencies == [first]
+        assert self.manager.get_task(third).dependencies == [first]
+        assert self.manager.get_task(fourth).dependencies == []
+        assert self._ready_names() == ['first', 'fourth']
+
+    def test_failed_dependency_unblocks_dependents(self):
+        """Test a failed task still lets the tasks that depend on it run"""
+        first = self.manager.create_task('first', 'd')
+        self.manager.create_task('second', 'd', dependencies=[first])
+
+        assert self._ready_names() == ['first']
+        self.manager.start_task(first)
+        assert self._ready_names() == []
+        self.manager.fail_task(first, 'boom')
+
+        assert self._ready_names() == ['second']
+        assert self.manager.get_task(first).state == TaskState.FAILED
@@ -141,16 +141,25 @@ class TestUtils:
         assert Utils.is_stdin_input() is True
 
     @pytest.mark.asyncio
-    @patch('sys.stdin.isatty')
-    @patch('sys.stdin.read')
-    async def test_read_stdin_success(self, mock_read, mock_isatty):
+    @patch('sys.stdin')
+    async def test_read_stdin_success(self, mock_stdin):
         """Test successful stdin reading"""
-        mock_isatty.return_value = False
-        mock_read.return_value = 'test input\n'
+        mock_stdin.isatty.return_value = False
+        mock_stdin.buffer.read.return_value = 'test input\n'.encode('utf-8')
         
         result = await Utils.read_stdin()
         assert result == 'test input'
 
+    @pytest.mark.asyncio
+    @patch('sys.stdin')
+    async def test_read_stdin_replaces_invalid_utf8(self, mock_stdin):
+        """Test stdin reading tolerates bytes that are not valid UTF-8"""
+        mock_stdin.isatty.return_value = False
+        mock_stdin.buffer.read.return_value = b'caf\xe9 input\n'
+        
+        result = await Utils.read_stdin()
+        assert result == 'caf\ufffd input'
+
     @pytest.mark.asyncio
     @patch('sys.stdin.isatty')
     async def test_read_stdin_no_pipe(self, mock_isatty):